@@ -0,0 +1,39 @@
+"""
+HTTP client infrastructure shared by the API clients and the tools.
+
+The public names below are loaded on first access (PEP 562 module
+__getattr__), so importing one of them does not pull in the others:
+
+    from infra import BaseApi       # imports infra.base_api only
+"""
+import importlib
+
+# Public name -> module defining it
+_EXPORTS = {
+    "BaseApi": "infra.base_api",
+    "add_request_listener": "infra.base_api",
+    "create_pooled_client": "infra.base_api",
+    "default_base_url": "infra.base_api",
+    "remove_request_listener": "infra.base_api",
+    "SingleFlight": "infra.coalescing",
+    "DeadlineExceeded": "infra.deadline",
+    "HedgingPolicy": "infra.hedging",
+    "LatencyHistogram": "infra.stats",
+    "percentile": "infra.stats",
+    "summarize_latencies": "infra.stats"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
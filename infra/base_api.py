@@ -1,14 +1,150 @@
 
 
-import httpx
 import json
 import logging
+import os
+import re
+import time
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+from infra import templates
+from infra.deadline import DeadlineExceeded, current_deadline, current_step
+
+# No logging configuration here: importing a library must not install
+# handlers. The tools call tools.cli.configure_logging, pytest uses log_level.
 logger = logging.getLogger(__name__)
 
+# Base URL used when none is passed and BASE_URL_ENV is not set
+DEFAULT_BASE_URL = "https://restful-booker.herokuapp.com"
+
+# Environment variable overriding DEFAULT_BASE_URL (e.g. to target staging)
+BASE_URL_ENV = "BOOKER_BASE_URL"
+
+# Timeout in seconds for endpoints without an entry in ENDPOINT_TIMEOUTS
+DEFAULT_TIMEOUT_S = 5.0
+
+# Per-endpoint timeouts in seconds, keyed by "METHOD /route"
+ENDPOINT_TIMEOUTS = {
+    "POST /auth": 5.0,
+    "GET /ping": 5.0,
+    "GET /booking": 15.0,
+    "GET /booking/{id}": 5.0,
+    "POST /booking": 10.0,
+    "PUT /booking/{id}": 10.0,
+    "PATCH /booking/{id}": 10.0,
+    "DELETE /booking/{id}": 10.0
+}
+
+# Headers of requests sent without explicit headers
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+}
+
+# Path segments that identify a single resource (booking IDs)
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+# Callables notified after every request, see add_request_listener
+_request_listeners = []
+
+
+def default_base_url():
+    """
+    Get the base URL API clients use when none is given.
+
+    Returns:
+        The BOOKER_BASE_URL environment variable if set, else DEFAULT_BASE_URL
+    """
+    return os.environ.get(BASE_URL_ENV) or DEFAULT_BASE_URL
+
+
+def endpoint_template(endpoint):
+    """
+    Collapse resource IDs so all requests to one route share a key.
+
+    Args:
+        endpoint: Request path, e.g. /booking/123?checkin=2024-01-01
+
+    Returns:
+        Route template, e.g. /booking/{id}
+    """
+    path = endpoint.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.match(part) else part for part in path.split("/"))
+
+
+def add_request_listener(listener):
+    """
+    Register a callable notified after every request sent by any BaseApi.
+
+    The listener runs on the requesting thread and must be cheap; it is
+    called as listener(method, endpoint, status, latency_ms, size) where
+    status is the HTTP status code as a string, or the exception class
+    name if the request failed, and size is the response body size in
+    bytes (0 if the request failed).
+
+    Args:
+        listener: Callable taking (method, endpoint, status, latency_ms, size)
+    """
+    _request_listeners.append(listener)
+
+
+def remove_request_listener(listener):
+    """
+    Unregister a listener added with add_request_listener.
+
+    Args:
+        listener: The callable to remove
+    """
+    if listener in _request_listeners:
+        _request_listeners.remove(listener)
+
+
+def _notify_listeners(method, endpoint, status, start, size=0):
+    latency_ms = (time.perf_counter() - start) * 1000
+    for listener in list(_request_listeners):
+        listener(method, endpoint, status, latency_ms, size)
+
+
+def _deadline_checked(stream, check):
+    """
+    Wrap an httpx response stream so that check() runs after every chunk.
+
+    Args:
+        stream: httpx.SyncByteStream of a streamed response
+        check: Callable raising to abort the read
+
+    Returns:
+        httpx.SyncByteStream yielding the same chunks
+    """
+    import httpx
+
+    class DeadlineCheckedStream(httpx.SyncByteStream):
+        def __iter__(self):
+            for chunk in stream:
+                check()
+                yield chunk
+
+        def close(self):
+            stream.close()
+
+    return DeadlineCheckedStream()
+
+
+def create_pooled_client(max_connections=100):
+    """
+    Create an httpx.Client whose connections can be shared by many threads.
+
+    Args:
+        max_connections: Maximum number of open (and kept-alive) connections
+
+    Returns:
+        httpx.Client to pass as BaseApi(client=...)
+    """
+    import httpx
+
+    limits = httpx.Limits(max_connections=max_connections,
+                          max_keepalive_connections=max_connections)
+    return httpx.Client(limits=limits)
+
 
 class BaseApi:
     """
@@ -16,15 +152,91 @@ class BaseApi:
     This class handles the core HTTP communication.
     """
 
-    def __init__(self, base_url="https://restful-booker.herokuapp.com"):
+    def __init__(self, base_url=None, client=None, timeouts=None, hedging=None, coalescing=None,
+                 transport=None):
         """
         Initialize the API client with a base URL.
 
         Args:
-            base_url: The base URL of the API (default: Restful Booker URL)
+            base_url: The base URL of the API (default: default_base_url(),
+                      the Restful Booker URL unless BOOKER_BASE_URL is set)
+            client: Shared httpx.Client to reuse pooled connections
+                    (default: a new client is created for every request)
+            timeouts: Per-endpoint timeout overrides in seconds, keyed like
+                      ENDPOINT_TIMEOUTS (e.g. {"GET /booking": 60})
+            hedging: HedgingPolicy for idempotent GETs (default: no hedging)
+            coalescing: SingleFlight merging identical concurrent reads and
+                        POST /auth calls (default: every request is sent)
+            transport: httpx transport for the per-request clients, e.g. an
+                       in-memory httpx.MockTransport (default: network). It
+                       is mounted for all URLs, so each client still builds
+                       its default transport and SSL context as in production
+        """
+        self.base_url = (base_url or default_base_url()).rstrip("/")
+        self.client = client
+        self.timeouts = timeouts or {}
+        self.hedging = hedging
+        self.coalescing = coalescing
+        self.transport = transport
+        logger.info(f"Initialized API client with base URL: {self.base_url}")
+
+    def request_timeout(self, method, endpoint):
+        """
+        Get the timeout for a request, capped by the active deadline.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint (e.g., /booking/12)
+
+        Returns:
+            Tuple (timeout_s, deadline) where deadline is the active Deadline
+            if it, rather than the endpoint timeout, limits the request
+
+        Raises:
+            DeadlineExceeded: If the active deadline has already expired
+        """
+        route = f"{method.upper()} {endpoint_template(endpoint)}"
+        timeout_s = self.timeouts.get(route, ENDPOINT_TIMEOUTS.get(route, DEFAULT_TIMEOUT_S))
+        deadline = current_deadline()
+        if deadline is None:
+            return timeout_s, None
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(self._step_name(method, endpoint), deadline)
+        if remaining < timeout_s:
+            return remaining, deadline
+        return timeout_s, None
+
+    def _fetch(self, client, method, endpoint, url, request_kwargs):
+        """
+        Send a request and read its body.
+
+        httpx applies its timeout to each phase and each read, not to the
+        whole request, so a slowly dripped body can outlast it. Under a
+        deadline the body is streamed and the budget is checked after
+        every chunk received.
+
+        Raises:
+            DeadlineExceeded: If the active deadline expires during the read
         """
-        self.base_url = base_url
-        logger.info(f"Initialized API client with base URL: {base_url}")
+        deadline = current_deadline()
+        if deadline is None:
+            return client.request(method, url, **request_kwargs)
+
+        def check():
+            if deadline.remaining() <= 0:
+                raise DeadlineExceeded(self._step_name(method, endpoint), deadline)
+
+        with client.stream(method, url, **request_kwargs) as response:
+            response.stream = _deadline_checked(response.stream, check)
+            response.read()
+        return response
+
+    @staticmethod
+    def _step_name(method, endpoint):
+        label = current_step()
+        request = f"{method.upper()} {endpoint}"
+        return f"{label} ({request})" if label else request
 
     def send_request(self, method, endpoint, payload=None, headers=None, cookies=None):
         """
@@ -33,54 +245,143 @@ class BaseApi:
         Args:
             method: HTTP method (GET, POST, PUT, DELETE, etc.)
             endpoint: API endpoint (e.g., /booking)
-            payload: Request body data (dictionary)
+            payload: Request body data: a dictionary (sent as JSON), encoded
+                     bytes or text, or an iterable of bytes chunks that is
+                     streamed without being materialized (with
+                     Content-Length if its len() counts bytes, chunked
+                     otherwise)
             headers: HTTP headers (dictionary)
             cookies: Request cookies (dictionary)
 
         Returns:
             Response object from the httpx library
         """
+        if self.hedging is None and self.coalescing is None:
+            return self._send_request(method, endpoint, payload, headers, cookies)
+
+        route = f"{method.upper()} {endpoint_template(endpoint)}"
+        if self.coalescing is not None:
+            key = self.coalescing.request_key(route, f"{self.base_url}{endpoint}", payload,
+                                              headers, cookies)
+            if key is not None:
+                return self.coalescing.execute(key, self._send_hedged, route, method, endpoint,
+                                               payload, headers, cookies)
+        return self._send_hedged(route, method, endpoint, payload, headers, cookies)
+
+    def _send_hedged(self, route, method, endpoint, payload, headers, cookies):
+        """Send a request, hedged if the hedging policy covers its route."""
+        if self.hedging is not None and self.hedging.applies_to(route):
+            return self.hedging.execute(route, self._send_request, method, endpoint,
+                                        payload, headers, cookies)
+        return self._send_request(method, endpoint, payload, headers, cookies)
+
+    def _send_request(self, method, endpoint, payload=None, headers=None, cookies=None):
+        """Send one attempt of a request (see send_request)."""
+        # httpx is most of the import time of the client packages, so it is
+        # only imported once the first request is sent
+        import httpx
+
         # Construct the full URL
         url = f"{self.base_url}{endpoint}"
 
-        # Set default headers if none provided
+        # Set default headers if none provided (shared, never mutated)
         if headers is None:
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-
-        # Log request details
-        logger.info(f"Sending {method} request to: {url}")
-        if payload:
-            logger.debug(f"Request payload: {json.dumps(payload, indent=2)}")
-        if headers:
+            headers = DEFAULT_HEADERS
+
+        # Log request details; the debug dumps are only built when they are emitted
+        logger.info("Sending %s request to: %s", method, url)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            if isinstance(payload, (dict, list)):
+                logger.debug(f"Request payload: {json.dumps(payload, indent=2)}")
             logger.debug(f"Request headers: {headers}")
 
         # Prepare request kwargs
+        timeout_s, deadline = self.request_timeout(method, endpoint)
         request_kwargs = {
             "headers": headers,
-            "cookies": cookies
+            "cookies": cookies,
+            "timeout": timeout_s
         }
 
         # Add JSON payload for appropriate methods
         if payload and method.upper() in ["POST", "PUT", "PATCH"]:
-            request_kwargs["json"] = payload
+            if isinstance(payload, (dict, list)):
+                request_kwargs["json"] = payload
+            else:
+                # Pre-encoded or streamed body, sent as is
+                request_kwargs["content"] = payload
+                # httpx sizes bytes and text itself; len() of a str counts characters
+                if (not isinstance(payload, (str, bytes, bytearray, memoryview))
+                        and hasattr(payload, "__len__")):
+                    request_kwargs["headers"] = {**headers, "Content-Length": str(len(payload))}
 
+        start = time.perf_counter()
         try:
-            # Create a client and send the request
-            with httpx.Client() as client:
-                response = client.request(method, url, **request_kwargs)
+            if self.client is not None:
+                # Reuse the shared client and its connection pool
+                response = self._fetch(self.client, method, endpoint, url, request_kwargs)
+            else:
+                # Create a client and send the request
+                mounts = {"all://": self.transport} if self.transport is not None else None
+                with httpx.Client(mounts=mounts) as client:
+                    response = self._fetch(client, method, endpoint, url, request_kwargs)
+            if _request_listeners:
+                _notify_listeners(method, endpoint, str(response.status_code), start,
+                                  len(response.content))
 
             # Log response details
-            logger.info(f"Response status code: {response.status_code}")
-            try:
-                logger.debug(f"Response body: {json.dumps(response.json(), indent=2)}")
-            except json.JSONDecodeError:
-                logger.debug(f"Response body: {response.text}")
+            logger.info("Response status code: %s", response.status_code)
+            if debug:
+                try:
+                    logger.debug(f"Response body: {json.dumps(response.json(), indent=2)}")
+                except json.JSONDecodeError:
+                    logger.debug(f"Response body: {response.text}")
 
             return response
 
+        except DeadlineExceeded:
+            if _request_listeners:
+                _notify_listeners(method, endpoint, DeadlineExceeded.__name__, start)
+            raise
         except httpx.RequestError as e:
+            if _request_listeners:
+                _notify_listeners(method, endpoint, type(e).__name__, start)
             logger.error(f"Request error: {str(e)}")
-            raise
\ No newline at end of file
+            if deadline is not None and isinstance(e, httpx.TimeoutException):
+                raise DeadlineExceeded(self._step_name(method, endpoint), deadline) from e
+            raise
+
+    def template(self, method, endpoint, payload=None, headers=None):
+        """
+        Prepare a request to send repeatedly with send_template.
+
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE, etc.)
+            endpoint: API endpoint, with {id} where the booking ID goes
+            payload: Request body data (dictionary or encoded bytes)
+            headers: HTTP headers (dictionary)
+
+        Returns:
+            RequestTemplate bound to this client's base URL
+        """
+        return templates.RequestTemplate(method, self.base_url, endpoint, payload=payload, headers=headers)
+
+    def send_template(self, template, booking_id=None, token=None):
+        """
+        Send a prepared request without rebuilding or re-encoding it.
+
+        The template's encoded body and headers go through send_request
+        as they are, so hedging, coalescing, deadlines and request
+        listeners apply as for any other request.
+
+        Args:
+            template: RequestTemplate created with template()
+            booking_id: Booking ID for templates with an {id} placeholder
+            token: Authentication token, sent as the token cookie (optional)
+
+        Returns:
+            Response object from the httpx library
+        """
+        return self.send_request(template.method, template.path(booking_id), template.content,
+                                 template.headers_for(token))
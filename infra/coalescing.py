@@ -0,0 +1,146 @@
+"""
+Singleflight coalescing of identical in-flight requests.
+
+When several threads send the same idempotent request at the same time
+(the same booking, or POST /auth with the same credentials), only the
+first one goes to the server; the others wait for it and share its
+response. Requests are only merged while one is in flight, nothing is
+cached afterwards.
+
+Usage:
+    single_flight = SingleFlight()
+    booking_api = BookingApi(coalescing=single_flight)
+    auth_api = AuthApi(coalescing=single_flight)
+    ...
+    single_flight.stats()   # {"calls": 12, "coalesced": 30, ...}
+
+Waiters receive the very same httpx.Response object; treat it as read-only.
+"""
+import json
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from infra.deadline import DeadlineExceeded, current_deadline, current_step
+
+# Routes whose identical concurrent requests may share one call
+COALESCED_ROUTES = ("GET /booking", "GET /booking/{id}", "GET /ping", "POST /auth")
+
+# Request headers that can change the response and so are part of the key
+KEY_HEADERS = ("accept", "authorization", "cookie")
+
+
+class SingleFlight:
+    """
+    Merges identical concurrent requests into one network call.
+    Safe to share between API clients and threads.
+    """
+
+    def __init__(self, routes=COALESCED_ROUTES):
+        """
+        Args:
+            routes: Routes ("METHOD /route") that may be coalesced; only
+                    GETs and POST /auth are safe to merge
+        """
+        unsafe = [route for route in routes
+                  if not route.startswith("GET ") and route != "POST /auth"]
+        if unsafe:
+            raise ValueError(f"Only idempotent routes can be coalesced, got {unsafe}")
+        self.routes = frozenset(routes)
+        self.calls = 0
+        self.coalesced = 0
+        self.saved_by_route = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def request_key(self, route, url, payload=None, headers=None, cookies=None):
+        """
+        Build the key identical requests share.
+
+        Args:
+            route: Route key, e.g. "GET /booking/{id}"
+            url: Full request URL
+            payload: Request body data (part of the key for POST /auth)
+            headers: Request headers
+            cookies: Request cookies
+
+        Returns:
+            Hashable key, or None if the request must not be coalesced
+        """
+        if route not in self.routes:
+            return None
+        relevant = tuple(sorted((name.lower(), value) for name, value in (headers or {}).items()
+                                if name.lower() in KEY_HEADERS))
+        body = json.dumps(payload, sort_keys=True) if route.startswith("POST ") else None
+        return route, url, relevant, tuple(sorted((cookies or {}).items())), body
+
+    def execute(self, key, send, *args):
+        """
+        Send a request, or wait for the identical one already in flight.
+
+        Args:
+            key: Key from request_key
+            send: Callable sending the request, called as send(*args)
+            *args: Arguments for send
+
+        Returns:
+            The (shared) result of the call
+
+        Raises:
+            The call's exception, for the caller and every waiter;
+            DeadlineExceeded if a waiter's deadline ends first
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+                self.saved_by_route[key[0]] = self.saved_by_route.get(key[0], 0) + 1
+
+        if not leader:
+            return self._wait(future, key)
+
+        try:
+            result = send(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    @staticmethod
+    def _wait(future, key):
+        deadline = current_deadline()
+        if deadline is None:
+            return future.result()
+        try:
+            return future.result(timeout=max(deadline.remaining(), 0))
+        except FutureTimeoutError:
+            route, url = key[0], key[1]
+            label = current_step()
+            request = f"{route} (coalesced, {url})"
+            raise DeadlineExceeded(f"{label} ({request})" if label else request, deadline) from None
+
+    def stats(self):
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dictionary with calls (sent to the server), coalesced (calls
+            saved), saved_ratio and saved_by_route
+        """
+        with self._lock:
+            total = self.calls + self.coalesced
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "saved_ratio": self.coalesced / total if total else 0.0,
+                "saved_by_route": dict(self.saved_by_route)
+            }
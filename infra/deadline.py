@@ -0,0 +1,133 @@
+"""
+Deadline propagation for multi-step API flows.
+
+A deadline is a total time budget set by a test or fixture. Every
+BaseApi request made inside it gets at most the remaining time as its
+timeout; when the budget runs out the request raises DeadlineExceeded,
+which names the step that was running.
+
+Usage:
+    with deadline(30, name="checkout flow"):
+        with step("create booking"):
+            booking_api.create_booking(data)
+        booking_api.get_booking(booking_id)   # gets whatever is left of 30s
+
+The deadline lives in a context variable, so it follows the code across
+function calls but not into new threads; wrap thread targets with bind().
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+_current_step = contextvars.ContextVar("deadline_step", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when a request cannot finish within the active deadline.
+    """
+
+    def __init__(self, step, deadline):
+        """
+        Args:
+            step: Description of the step that ran out of time
+            deadline: The Deadline that expired
+        """
+        self.step = step
+        self.deadline = deadline
+        name = f" '{deadline.name}'" if deadline.name else ""
+        super().__init__(f"Deadline{name} of {deadline.budget_s:g}s exceeded during {step}")
+
+
+class Deadline:
+    """
+    A point in time by which a flow must be done.
+    """
+
+    def __init__(self, budget_s, name=None):
+        """
+        Args:
+            budget_s: Total time budget in seconds
+            name: Label used in error messages (optional)
+        """
+        self.budget_s = budget_s
+        self.name = name
+        self.expires_at = time.monotonic() + budget_s
+
+    def remaining(self):
+        """Seconds left (negative once expired)."""
+        return self.expires_at - time.monotonic()
+
+
+@contextmanager
+def deadline(budget_s, name=None):
+    """
+    Run a block under a time budget.
+
+    Nested deadlines never extend an outer one: the tighter one wins.
+
+    Args:
+        budget_s: Total time budget in seconds
+        name: Label used in error messages (optional)
+
+    Yields:
+        The active Deadline
+    """
+    active = Deadline(budget_s, name)
+    outer = _current_deadline.get()
+    if outer is not None and outer.expires_at <= active.expires_at:
+        active = outer
+    token = _current_deadline.set(active)
+    try:
+        yield active
+    finally:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def step(name):
+    """
+    Label the requests of a block for DeadlineExceeded messages.
+
+    Args:
+        name: Step description, e.g. "create bookings"
+    """
+    token = _current_step.set(name)
+    try:
+        yield
+    finally:
+        _current_step.reset(token)
+
+
+def current_deadline():
+    """
+    Get the active deadline.
+
+    Returns:
+        Deadline, or None outside of any deadline block
+    """
+    return _current_deadline.get()
+
+
+def current_step():
+    """Get the label set with step(), or None."""
+    return _current_step.get()
+
+
+def bind(function):
+    """
+    Carry the current deadline (and step) into another thread.
+
+    Args:
+        function: Callable to run later, e.g. in a ThreadPoolExecutor
+
+    Returns:
+        Callable that runs function in a copy of the current context
+    """
+    context = contextvars.copy_context()
+
+    def bound(*args, **kwargs):
+        return context.copy().run(function, *args, **kwargs)
+
+    return bound
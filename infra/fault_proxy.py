@@ -0,0 +1,370 @@
+"""
+Local fault- and latency-injecting HTTP proxy.
+
+FaultProxy listens on localhost and forwards every request to a target
+(e.g. the Restful Booker API). Point a client at it with
+BookingApi(base_url=proxy.url) and script what goes wrong with
+FaultRules:
+
+    latency     delay before forwarding, drawn from a distribution
+    cold_start  one long delay on the first request after an idle period
+    bandwidth   cap response bytes per second
+    reset       drop the connection with a TCP reset, no response
+    truncate    send only part of the response body, then disconnect
+    status      answer with an error status (e.g. 503) without forwarding
+
+Rules can be limited to a time window since the proxy started, repeat
+as periodic bursts, fire with a probability and match only some methods
+or paths.
+"""
+import logging
+import random
+import re
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+FAULTS = ("latency", "cold_start", "bandwidth", "reset", "truncate", "status")
+
+# Headers that describe a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te",
+    "trailers", "transfer-encoding", "upgrade", "host", "content-length", "content-encoding"
+}
+
+
+def sample_delay_ms(distribution="fixed", rng=random, **params):
+    """
+    Draw a delay from a latency distribution.
+
+    Args:
+        distribution: fixed (ms), uniform (min_ms, max_ms), normal (mean_ms,
+                      stdev_ms), lognormal (median_ms, sigma) or exponential
+                      (mean_ms)
+        rng: random.Random instance (default: module random)
+        **params: Parameters of the distribution
+
+    Returns:
+        Delay in milliseconds (never negative)
+    """
+    if distribution == "fixed":
+        value = params["ms"]
+    elif distribution == "uniform":
+        value = rng.uniform(params["min_ms"], params["max_ms"])
+    elif distribution == "normal":
+        value = rng.gauss(params["mean_ms"], params["stdev_ms"])
+    elif distribution == "lognormal":
+        value = params["median_ms"] * rng.lognormvariate(0, params["sigma"])
+    elif distribution == "exponential":
+        value = rng.expovariate(1 / params["mean_ms"])
+    else:
+        raise ValueError(f"Unknown latency distribution '{distribution}'")
+    return max(value, 0.0)
+
+
+class FaultRule:
+    """
+    One scripted fault and when it applies.
+    """
+
+    def __init__(self, fault, probability=1.0, start_s=0.0, end_s=None, every_s=None,
+                 burst_s=None, methods=None, path=None, **params):
+        """
+        Args:
+            fault: One of FAULTS
+            probability: Chance that a matching request is affected
+            start_s: Seconds after the proxy started when the rule begins
+            end_s: Seconds after the proxy started when the rule ends (optional)
+            every_s: Repeat period for bursts (optional)
+            burst_s: Length of each burst within every_s
+            methods: HTTP methods to match (default: all)
+            path: Regular expression the request path must match (optional)
+            **params: Fault parameters:
+                latency: distribution and its parameters (see sample_delay_ms)
+                cold_start: idle_s, delay_ms
+                bandwidth: bytes_per_s
+                truncate: fraction of the body to send (default 0.5)
+                status: status (default 503), body, retry_after_s
+        """
+        if fault not in FAULTS:
+            raise ValueError(f"Unknown fault '{fault}', expected one of {FAULTS}")
+        if every_s is not None and burst_s is None:
+            raise ValueError("burst_s is required with every_s")
+        self.fault = fault
+        self.probability = probability
+        self.start_s = start_s
+        self.end_s = end_s
+        self.every_s = every_s
+        self.burst_s = burst_s
+        self.methods = {method.upper() for method in methods} if methods else None
+        self.path = re.compile(path) if path else None
+        self.params = params
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a rule from a configuration dictionary (e.g. from JSON).
+
+        Args:
+            data: Dictionary with a "fault" key and the constructor arguments
+
+        Returns:
+            FaultRule
+        """
+        return cls(**data)
+
+    def is_active(self, elapsed_s):
+        """
+        Tell whether the schedule covers a moment.
+
+        Args:
+            elapsed_s: Seconds since the proxy started
+        """
+        if elapsed_s < self.start_s or (self.end_s is not None and elapsed_s >= self.end_s):
+            return False
+        if self.every_s is not None:
+            return (elapsed_s - self.start_s) % self.every_s < self.burst_s
+        return True
+
+    def matches(self, method, path, elapsed_s, rng=random):
+        """
+        Decide whether the rule fires for a request.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            elapsed_s: Seconds since the proxy started
+            rng: random.Random instance used for the probability
+        """
+        if self.methods is not None and method not in self.methods:
+            return False
+        if self.path is not None and not self.path.search(path):
+            return False
+        if not self.is_active(elapsed_s):
+            return False
+        return self.probability >= 1 or rng.random() < self.probability
+
+
+class FaultProxy:
+    """
+    Reverse proxy that injects faults into the traffic it forwards.
+    """
+
+    def __init__(self, target, rules=None, host="127.0.0.1", port=0, seed=None):
+        """
+        Args:
+            target: Base URL requests are forwarded to
+            rules: List of FaultRule (or dictionaries accepted by FaultRule.from_dict)
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            seed: Seed for probabilities and latency draws (optional)
+        """
+        self.target = target.rstrip("/")
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.rules = []
+        self.injected = {fault: 0 for fault in FAULTS}
+        self.forwarded = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._upstream = None
+        self._started = None
+        self._last_request = None
+        for rule in rules or []:
+            self.add_rule(rule)
+
+    @property
+    def url(self):
+        """Base URL clients should use instead of the target."""
+        return f"http://{self.host}:{self.port}"
+
+    def add_rule(self, rule):
+        """
+        Add a fault rule (takes effect for the next request).
+
+        Args:
+            rule: FaultRule or dictionary accepted by FaultRule.from_dict
+
+        Returns:
+            The FaultRule, so it can be removed later
+        """
+        if isinstance(rule, dict):
+            rule = FaultRule.from_dict(rule)
+        with self._lock:
+            self.rules = self.rules + [rule]
+        return rule
+
+    def remove_rule(self, rule):
+        """Remove a rule added with add_rule."""
+        with self._lock:
+            self.rules = [existing for existing in self.rules if existing is not rule]
+
+    def clear(self):
+        """Remove all rules; the proxy forwards traffic untouched."""
+        with self._lock:
+            self.rules = []
+
+    def restart_schedule(self):
+        """Make rule schedules count from now."""
+        self._started = time.monotonic()
+
+    def start(self):
+        """
+        Start proxying in a background thread.
+
+        Returns:
+            Base URL of the proxy
+        """
+        self._upstream = httpx.Client(limits=httpx.Limits(max_connections=200,
+                                                           max_keepalive_connections=200))
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.restart_schedule()
+        threading.Thread(target=self._server.serve_forever, name="fault-proxy",
+                         daemon=True).start()
+        logger.info(f"Fault proxy {self.url} -> {self.target}")
+        return self.url
+
+    def stop(self):
+        """Stop proxying and close upstream connections."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._upstream is not None:
+            self._upstream.close()
+            self._upstream = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, fault):
+        with self._lock:
+            self.injected[fault] += 1
+
+    def _plan(self, method, path):
+        """Pick the rules that fire for one request."""
+        now = time.monotonic()
+        elapsed_s = now - self._started
+        with self._lock:
+            idle_s = now - self._last_request if self._last_request is not None else float("inf")
+            self._last_request = now
+        fired = [rule for rule in self.rules if rule.matches(method, path, elapsed_s, self.rng)]
+
+        delay_ms = 0.0
+        terminal = None
+        bandwidth = None
+        for rule in fired:
+            if rule.fault == "latency":
+                delay_ms += sample_delay_ms(rng=self.rng, **rule.params)
+            elif rule.fault == "cold_start":
+                if idle_s < rule.params.get("idle_s", 30):
+                    continue
+                delay_ms += rule.params.get("delay_ms", 5000)
+            elif rule.fault == "bandwidth":
+                bandwidth = rule.params["bytes_per_s"]
+            elif terminal is None:
+                terminal = rule
+            else:
+                continue
+            self._count(rule.fault)
+        return delay_ms, terminal, bandwidth
+
+    def _handler_class(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes: with Nagle's algorithm the
+            # body waits for the client's delayed ACK (about 40ms per request)
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                delay_ms, terminal, bandwidth = proxy._plan(self.command, self.path)
+                if delay_ms:
+                    time.sleep(delay_ms / 1000)
+
+                if terminal is not None and terminal.fault == "reset":
+                    self._reset()
+                    return
+                if terminal is not None and terminal.fault == "status":
+                    self._send_status(terminal.params)
+                    return
+
+                headers = {name: value for name, value in self.headers.items()
+                           if name.lower() not in HOP_BY_HOP_HEADERS}
+                try:
+                    upstream = proxy._upstream.request(self.command, proxy.target + self.path,
+                                                       headers=headers, content=body)
+                except httpx.RequestError as e:
+                    logger.warning(f"Fault proxy upstream error: {e}")
+                    self._send_status({"status": 502, "body": f"Upstream error: {e}"})
+                    return
+                with proxy._lock:
+                    proxy.forwarded += 1
+
+                content = upstream.content
+                self.send_response(upstream.status_code)
+                for name, value in upstream.headers.multi_items():
+                    if name.lower() not in HOP_BY_HOP_HEADERS:
+                        self.send_header(name, value)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+
+                if terminal is not None and terminal.fault == "truncate":
+                    self._write(content[:int(len(content) * terminal.params.get("fraction", 0.5))],
+                                bandwidth)
+                    self._reset()
+                    return
+                self._write(content, bandwidth)
+
+            def _write(self, content, bytes_per_s):
+                if not bytes_per_s:
+                    self.wfile.write(content)
+                    self.wfile.flush()
+                    return
+                chunk_size = max(1, min(16384, int(bytes_per_s / 10)))
+                for start in range(0, len(content), chunk_size):
+                    chunk = content[start:start + chunk_size]
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+                    time.sleep(len(chunk) / bytes_per_s)
+
+            def _send_status(self, params):
+                body = params.get("body", "Service Unavailable").encode()
+                self.send_response(params.get("status", 503))
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                if params.get("retry_after_s") is not None:
+                    self.send_header("Retry-After", str(params["retry_after_s"]))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _reset(self):
+                # SO_LINGER with a zero timeout turns close() into a TCP RST
+                self.wfile.flush()
+                self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                                           struct.pack("ii", 1, 0))
+                self.connection.close()
+                self.close_connection = True
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+        return Handler
@@ -0,0 +1,253 @@
+"""
+Hedged requests for idempotent GETs.
+
+A hedged request is sent once; if it has not answered after a delay
+(by default the route's observed p95 latency), an identical second
+attempt is sent and whichever answers first is returned. The slower
+attempt is left to finish in the background. This cuts the latency tail
+caused by the odd slow request, at the price of some extra load, which
+the hedge-rate cap keeps bounded.
+
+Usage:
+    hedging = HedgingPolicy(percentile=95, max_hedge_rate=0.05)
+    booking_api = BookingApi(hedging=hedging)
+    ...
+    print(format_hedging(hedging.stats()))
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from infra.deadline import bind
+from infra.stats import LatencyHistogram
+
+# Idempotent routes that may be hedged (get_booking, get_all_bookings, health_check)
+HEDGEABLE_ROUTES = ("GET /booking/{id}", "GET /booking", "GET /ping")
+
+
+class HedgingPolicy:
+    """
+    Decides when to send a duplicate request and keeps hedging metrics.
+    Safe to share between API clients and threads.
+    """
+
+    def __init__(self, percentile=95.0, delay_ms=None, max_hedge_rate=0.05, min_samples=20,
+                 routes=HEDGEABLE_ROUTES, max_workers=64):
+        """
+        Args:
+            percentile: Latency percentile of the route after which a hedge is sent
+            delay_ms: Fixed hedge delay in milliseconds (overrides percentile)
+            max_hedge_rate: Most hedges per request (0.05 = at most 5% extra requests)
+            min_samples: Latencies a route needs before percentile delays apply;
+                         until then its requests are not hedged
+            routes: Routes ("METHOD /route") that may be hedged, GET only
+            max_workers: Threads available for hedged attempts; a request
+                         that cannot be hedged, or finds them all busy, is
+                         sent on the caller's thread
+        """
+        unsafe = [route for route in routes if not route.startswith("GET ")]
+        if unsafe:
+            raise ValueError(f"Only idempotent GET routes can be hedged, got {unsafe}")
+        self.percentile = percentile
+        self.delay_ms = delay_ms
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.routes = frozenset(routes)
+        self.max_workers = max_workers
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies = {}
+        self._observed = LatencyHistogram()
+        self._primary = LatencyHistogram()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def applies_to(self, route):
+        """Tell whether requests to a route ("GET /booking/{id}") are hedged."""
+        return route in self.routes
+
+    def hedge_delay_ms(self, route):
+        """
+        Get the current hedge delay of a route.
+
+        Args:
+            route: Route key, e.g. "GET /booking/{id}"
+
+        Returns:
+            Delay in milliseconds, or None while the route has too few samples
+        """
+        if self.delay_ms is not None:
+            return self.delay_ms
+        with self._lock:
+            histogram = self._latencies.get(route)
+            if histogram is None or histogram.count < self.min_samples:
+                return None
+            return histogram.percentile(self.percentile)
+
+    def _can_hedge(self):
+        # Called with the lock held; requests already counts the current one
+        return self.hedged + 1 <= self.max_hedge_rate * self.requests
+
+    def _take_hedge(self):
+        # Called with the lock held
+        if not self._can_hedge():
+            return False
+        self.hedged += 1
+        return True
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="hedge")
+            return self._executor
+
+    def _submit(self, send, args):
+        # Returns None instead of queueing behind busy workers
+        if not self._slots.acquire(blocking=False):
+            return None
+        future = self._get_executor().submit(bind(send), *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _record_primary(self, route, latency_ms):
+        with self._lock:
+            self._latencies.setdefault(route, LatencyHistogram()).record(latency_ms)
+            self._primary.record(latency_ms)
+
+    def _send_direct(self, route, send, args):
+        start = time.perf_counter()
+        try:
+            result = send(*args)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._observed.record(latency_ms)
+        self._record_primary(route, latency_ms)
+        return result
+
+    def execute(self, route, send, *args):
+        """
+        Run a request, hedging it if the first attempt is slow.
+
+        Args:
+            route: Route key, e.g. "GET /booking/{id}"
+            send: Callable sending one attempt, called as send(*args)
+            *args: Arguments for send
+
+        Returns:
+            Result of the attempt that answered first
+
+        Raises:
+            The attempt's exception if every attempt failed
+        """
+        delay_ms = self.hedge_delay_ms(route)
+        with self._lock:
+            self.requests += 1
+            hedgeable = delay_ms is not None and self._can_hedge()
+
+        start = time.perf_counter()
+        primary = self._submit(send, args) if hedgeable else None
+        if primary is None:
+            # No hedge could be sent: a second thread would only add latency
+            return self._send_direct(route, send, args)
+
+        def record_primary(future):
+            if not future.cancelled() and future.exception() is None:
+                self._record_primary(route, (time.perf_counter() - start) * 1000)
+
+        primary.add_done_callback(record_primary)
+        attempts = [primary]
+        hedge = None
+        wait(attempts, timeout=delay_ms / 1000)
+        if not primary.done():
+            with self._lock:
+                allowed = self._take_hedge()
+            if allowed:
+                hedge = self._submit(send, args)
+                if hedge is None:
+                    with self._lock:
+                        self.hedged -= 1
+                else:
+                    attempts.append(hedge)
+
+        pending = attempts
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.exception() is None), None)
+            if winner is not None or not pending:
+                break
+        with self._lock:
+            self._observed.record((time.perf_counter() - start) * 1000)
+            if winner is not None and winner is hedge:
+                self.hedge_wins += 1
+        if winner is None:
+            raise done.pop().exception()
+        return winner.result()
+
+    def stats(self):
+        """
+        Get hedging metrics.
+
+        Returns:
+            Dictionary with requests, hedged, hedge_rate (extra load),
+            hedge_wins, current delays per route and latency summaries of
+            the first attempts ("primary") and of what callers got
+            ("observed")
+        """
+        # Request threads add routes under the lock; hedge_delay_ms takes it too
+        with self._lock:
+            routes = sorted(self._latencies)
+        delays = {route: self.hedge_delay_ms(route) for route in routes}
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "delay_ms": delays,
+                "latency_ms": {
+                    "primary": self._primary.summary(),
+                    "observed": self._observed.summary()
+                }
+            }
+
+    def close(self):
+        """Wait for in-flight attempts and release the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def format_hedging(stats):
+    """
+    Format hedging metrics: tail latency with and without hedging against
+    the extra requests sent.
+
+    Args:
+        stats: Dictionary returned by HedgingPolicy.stats
+
+    Returns:
+        Multi-line string
+    """
+    primary = stats["latency_ms"]["primary"]
+    observed = stats["latency_ms"]["observed"]
+
+    def ms(summary, name):
+        value = summary.get(name)
+        return f"{value:.1f}" if value is not None else "-"
+
+    lines = [
+        f"Hedging: {stats['hedged']} hedges for {stats['requests']} requests "
+        f"({stats['hedge_rate']:.1%} extra load), {stats['hedge_wins']} won",
+        f"{'':<18}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+    ]
+    for label, summary in (("first attempt", primary), ("hedged", observed)):
+        lines.append(f"{label:<18}{ms(summary, 'p50'):>9}{ms(summary, 'p90'):>9}"
+                     f"{ms(summary, 'p99'):>9}{ms(summary, 'max'):>9}")
+    if primary.get("p99") and observed.get("p99") is not None:
+        lines.append(f"p99 reduction: {1 - observed['p99'] / primary['p99']:.1%}")
+    return "\n".join(lines)
@@ -0,0 +1,410 @@
+"""
+Live request metrics for long running tests and load runs.
+
+RequestMetrics keeps, per (method, endpoint template, status), a
+cumulative request counter and a rolling window of latency histograms.
+Each thread records into its own accumulator, so the request path takes
+no lock; accumulators are merged only when somebody reads them (a
+Prometheus scrape or a dashboard refresh).
+
+Usage:
+    metrics = RequestMetrics().install()      # hook into BaseApi
+    server = MetricsServer(metrics, port=9100)
+    server.start()                            # http://127.0.0.1:9100/metrics
+    Dashboard(metrics).start()                # refreshing terminal view
+"""
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from infra import base_api
+from infra.base_api import endpoint_template
+from infra.stats import LatencyHistogram
+
+# Quantiles exposed for the rolling window
+QUANTILES = (50, 90, 95, 99)
+
+
+def is_error_status(status):
+    """
+    Tell whether a recorded status counts as an error.
+
+    Args:
+        status: HTTP status code as a string, or an exception class name
+    """
+    return not status.isdigit() or int(status) >= 400
+
+
+class _ThreadRecorder:
+    """
+    Accumulator written by exactly one thread.
+
+    The window is a ring of one-second slots. A slot is replaced, never
+    cleared, when its second comes around again, so readers always see
+    either the old or the new slot and never a half reset one.
+    """
+
+    def __init__(self, window_s, precision):
+        self.thread = threading.current_thread()
+        self.precision = precision
+        self.slots = [(None, {}) for _ in range(window_s + 1)]
+        self.totals = {}
+
+    def record(self, key, latency_ms, second):
+        index = second % len(self.slots)
+        slot_second, entries = self.slots[index]
+        if slot_second != second:
+            entries = {}
+            self.slots[index] = (second, entries)
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = [0, LatencyHistogram(self.precision)]
+        entry[0] += 1
+        entry[1].record(latency_ms)
+
+        total = self.totals.get(key)
+        if total is None:
+            total = self.totals[key] = [0, 0.0]
+        total[0] += 1
+        total[1] += latency_ms
+
+    def newest_second(self):
+        seconds = [second for second, _ in self.slots if second is not None]
+        return max(seconds) if seconds else None
+
+
+class RequestMetrics:
+    """
+    Rolling-window request metrics, keyed by method, endpoint and status.
+    """
+
+    def __init__(self, window_s=60, precision=0.01):
+        """
+        Args:
+            window_s: Length of the rolling window in seconds
+            precision: Relative precision of the latency quantiles
+        """
+        self.window_s = window_s
+        self.precision = precision
+        self.started = time.monotonic()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._recorders = []
+        self._retired_totals = {}
+
+    def record(self, method, endpoint, status, latency_ms, size=0):
+        """
+        Count one request. Safe to call from any thread without locking.
+
+        Args:
+            method: HTTP method
+            endpoint: Request path (IDs are collapsed into {id})
+            status: HTTP status code as a string, or an exception class name
+            latency_ms: Latency in milliseconds
+            size: Response body size in bytes (not tracked)
+        """
+        recorder = getattr(self._local, "recorder", None)
+        if recorder is None:
+            recorder = self._local.recorder = _ThreadRecorder(self.window_s, self.precision)
+            with self._lock:
+                self._recorders.append(recorder)
+        key = (method.upper(), endpoint_template(endpoint), status)
+        recorder.record(key, latency_ms, int(time.monotonic()))
+
+    def install(self):
+        """
+        Record every request sent through BaseApi.
+
+        Returns:
+            self, to allow chaining
+        """
+        base_api.add_request_listener(self.record)
+        return self
+
+    def uninstall(self):
+        """Stop recording BaseApi requests."""
+        base_api.remove_request_listener(self.record)
+
+    def snapshot(self):
+        """
+        Merge all thread accumulators.
+
+        Returns:
+            Dictionary with:
+                window_s: Seconds the window currently covers
+                totals: {(method, endpoint, status): (count, latency_sum_ms)} since start
+                window: {(method, endpoint, status): (count, LatencyHistogram)}
+        """
+        now = int(time.monotonic())
+        oldest = now - self.window_s
+        with self._lock:
+            self._retire_finished(oldest)
+            recorders = list(self._recorders)
+            totals = {key: tuple(value) for key, value in self._retired_totals.items()}
+
+        window = {}
+        for recorder in recorders:
+            for key, (count, latency_sum) in list(recorder.totals.items()):
+                previous = totals.get(key, (0, 0.0))
+                totals[key] = (previous[0] + count, previous[1] + latency_sum)
+            for second, entries in list(recorder.slots):
+                if second is None or second <= oldest:
+                    continue
+                for key, (count, histogram) in list(entries.items()):
+                    merged = window.get(key)
+                    if merged is None:
+                        window[key] = (count, histogram.copy())
+                    else:
+                        window[key] = (merged[0] + count, merged[1].merge(histogram.copy()))
+
+        return {
+            "window_s": max(min(self.window_s, time.monotonic() - self.started), 1e-9),
+            "totals": totals,
+            "window": window
+        }
+
+    def _retire_finished(self, oldest):
+        # Fold accumulators of finished threads into the retired totals once
+        # their window slots have expired. Called with the lock held.
+        alive = []
+        for recorder in self._recorders:
+            newest = recorder.newest_second()
+            if recorder.thread.is_alive() or (newest is not None and newest > oldest):
+                alive.append(recorder)
+                continue
+            for key, (count, latency_sum) in recorder.totals.items():
+                total = self._retired_totals.setdefault(key, [0, 0.0])
+                total[0] += count
+                total[1] += latency_sum
+        self._recorders = alive
+
+    def rows(self):
+        """
+        Summarize the rolling window per endpoint, for display.
+
+        Returns:
+            List of dictionaries (method, endpoint, rps, error_rate, statuses,
+            p50..p99 in ms), busiest endpoint first
+        """
+        snapshot = self.snapshot()
+        routes = {}
+        for (method, endpoint, status), (count, histogram) in snapshot["window"].items():
+            route = routes.setdefault((method, endpoint), {
+                "count": 0, "errors": 0, "statuses": {},
+                "histogram": LatencyHistogram(self.precision)
+            })
+            route["count"] += count
+            route["statuses"][status] = route["statuses"].get(status, 0) + count
+            if is_error_status(status):
+                route["errors"] += count
+            route["histogram"].merge(histogram)
+
+        rows = []
+        for (method, endpoint), route in routes.items():
+            row = {
+                "method": method,
+                "endpoint": endpoint,
+                "requests": route["count"],
+                "rps": route["count"] / snapshot["window_s"],
+                "error_rate": route["errors"] / route["count"],
+                "statuses": route["statuses"]
+            }
+            for pct in QUANTILES:
+                row[f"p{pct}"] = route["histogram"].percentile(pct)
+            rows.append(row)
+        rows.sort(key=lambda row: row["requests"], reverse=True)
+        return rows
+
+    def prometheus_text(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text (version 0.0.4)
+        """
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP booker_requests_total Requests sent, by endpoint and status.",
+            "# TYPE booker_requests_total counter"
+        ]
+        durations = {}
+        for (method, endpoint, status), (count, latency_sum) in sorted(snapshot["totals"].items()):
+            labels = _labels(method=method, endpoint=endpoint, status=status)
+            lines.append(f"booker_requests_total{{{labels}}} {count}")
+            duration = durations.setdefault((method, endpoint), [0, 0.0])
+            duration[0] += count
+            duration[1] += latency_sum
+
+        lines += [
+            f"# HELP booker_window_requests_per_second Request rate over the last {self.window_s}s.",
+            "# TYPE booker_window_requests_per_second gauge"
+        ]
+        histograms = {}
+        for (method, endpoint, status), (count, histogram) in sorted(snapshot["window"].items()):
+            labels = _labels(method=method, endpoint=endpoint, status=status)
+            lines.append(f"booker_window_requests_per_second{{{labels}}} "
+                         f"{count / snapshot['window_s']:.6g}")
+            merged = histograms.get((method, endpoint))
+            if merged is None:
+                histograms[(method, endpoint)] = histogram.copy()
+            else:
+                merged.merge(histogram)
+
+        lines += [
+            f"# HELP booker_request_duration_seconds Request latency; quantiles over "
+            f"the last {self.window_s}s, sum and count since start.",
+            "# TYPE booker_request_duration_seconds summary"
+        ]
+        for (method, endpoint), (count, latency_sum) in sorted(durations.items()):
+            labels = _labels(method=method, endpoint=endpoint)
+            histogram = histograms.get((method, endpoint))
+            for pct in QUANTILES:
+                value = histogram.percentile(pct) / 1000 if histogram else float("nan")
+                lines.append(f"booker_request_duration_seconds{{{labels},"
+                             f"quantile=\"{pct / 100:g}\"}} {value:.6g}")
+            lines.append(f"booker_request_duration_seconds_sum{{{labels}}} {latency_sum / 1000:.6g}")
+            lines.append(f"booker_request_duration_seconds_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels):
+    escaped = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        escaped.append(f"{name}=\"{value}\"")
+    return ",".join(escaped)
+
+
+class MetricsServer:
+    """
+    Serves RequestMetrics at /metrics in a background thread.
+    """
+
+    def __init__(self, metrics, port=9100, host="127.0.0.1"):
+        """
+        Args:
+            metrics: RequestMetrics instance
+            port: Port to listen on (0 picks a free port)
+            host: Interface to bind (default: localhost only)
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        """
+        Start serving.
+
+        Returns:
+            URL of the metrics endpoint
+        """
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-server",
+                         daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def stop(self):
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def format_dashboard(rows, window_s):
+    """
+    Format RequestMetrics.rows() as a table.
+
+    Args:
+        rows: Rows returned by RequestMetrics.rows()
+        window_s: Length of the rolling window in seconds
+
+    Returns:
+        Multi-line string
+    """
+    def ms(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    lines = [
+        f"Live request metrics (last {window_s}s)   {time.strftime('%H:%M:%S')}",
+        f"{'method':<7}{'endpoint':<22}{'rps':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}  statuses",
+        "-" * 96
+    ]
+    for row in rows:
+        statuses = " ".join(f"{status}={count}" for status, count in sorted(row["statuses"].items()))
+        lines.append(f"{row['method']:<7}{row['endpoint']:<22}{row['rps']:>9.1f}"
+                     f"{row['error_rate'] * 100:>6.1f}%{ms(row['p50']):>9}{ms(row['p95']):>9}"
+                     f"{ms(row['p99']):>9}  {statuses}")
+    if not rows:
+        lines.append("(no requests yet)")
+    return "\n".join(lines)
+
+
+class Dashboard:
+    """
+    Redraws a metrics table in the terminal at a fixed interval.
+    """
+
+    # Move the cursor home and clear the screen
+    CLEAR = "\x1b[H\x1b[2J"
+
+    def __init__(self, metrics, interval_s=1.0, stream=None):
+        """
+        Args:
+            metrics: RequestMetrics instance
+            interval_s: Seconds between refreshes
+            stream: Output stream (default: sys.stderr)
+        """
+        self.metrics = metrics
+        self.interval_s = interval_s
+        self.stream = stream or sys.stderr
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start refreshing in a background thread."""
+        self._thread = threading.Thread(target=self._loop, name="metrics-dashboard", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop refreshing and draw the final state once more."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.draw()
+
+    def draw(self):
+        """Draw the table once."""
+        self.stream.write(self.CLEAR + format_dashboard(self.metrics.rows(), self.metrics.window_s) + "\n")
+        self.stream.flush()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_s):
+            self.draw()
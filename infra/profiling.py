@@ -0,0 +1,285 @@
+"""
+Sampling profiler for the client side of API requests.
+
+ClientProfiler runs a background thread that looks at the stacks of all
+other threads every few milliseconds (sys._current_frames). Only threads
+that are inside a BaseApi request are sampled, and their stacks are cut
+at the outermost BaseApi frame. Nothing is instrumented, so the request
+path runs unchanged; the cost is one stack walk per busy thread per
+interval, paid by the sampler thread.
+
+Every sample is put in one category, so wall time inside requests splits
+into what the client does and what it waits for:
+
+    client_setup      creating and closing an httpx.Client (SSL context
+                      loading), paid on every request without a shared client
+    json_encoding     encoding request bodies (and debug dumps) as JSON
+    logging           building and emitting log records
+    connection_setup  DNS, TCP connect and TLS handshake
+    pool_wait         waiting for a free connection in the pool
+    socket_wait       blocked reading from or writing to the socket
+    response_parsing  parsing HTTP responses and decoding JSON bodies
+    client_other      everything else in the client (httpx, hooks, ...)
+
+Usage:
+    profiler = ClientProfiler(interval_ms=5).start()
+    ...                                      # run requests in any threads
+    profiler.stop()
+    profiler.write_collapsed("client.folded")   # flamegraph.pl / speedscope input
+    print(format_profile(profiler.summary()))
+"""
+import linecache
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+CATEGORIES = ("client_setup", "json_encoding", "logging", "connection_setup", "pool_wait",
+              "socket_wait", "response_parsing", "client_other")
+
+# BaseApi methods that mark a thread as busy with a request; _send_request
+# also covers attempts sent from hedging worker threads
+REQUEST_FUNCTIONS = frozenset({"send_request", "_send_request", "send_template"})
+
+# Functions that only run while a connection is being opened
+CONNECTION_FUNCTIONS = frozenset({"connect_tcp", "connect_unix_socket", "start_tls",
+                                  "create_connection", "getaddrinfo", "do_handshake", "wrap_socket"})
+
+# httpx.Client methods that create or tear down a client
+CLIENT_SETUP_FUNCTIONS = frozenset({"__init__", "__exit__", "close"})
+
+# (path fragment, category) checked from the innermost frame outwards;
+# the first match wins
+LEAF_RULES = (
+    (os.path.join("httpcore", "_backends"), "socket_wait"),
+    (os.sep + "ssl.py", "socket_wait"),
+    (os.sep + "socket.py", "socket_wait"),
+    (os.sep + "selectors.py", "socket_wait"),
+    (os.path.join("json", "encoder.py"), "json_encoding"),
+    (os.path.join("json", "decoder.py"), "response_parsing"),
+    (os.path.join("h11", ""), "response_parsing"),
+    (os.path.join("httpx", "_decoders.py"), "response_parsing"),
+    (os.path.join("logging", ""), "logging")
+)
+
+_BASE_API_FILE = os.path.join("infra", "base_api.py")
+
+_HTTPX_CLIENT_FILE = os.path.join("httpx", "_client.py")
+
+
+def request_stack(frame):
+    """
+    Get the part of a thread's stack that belongs to a BaseApi request.
+
+    Args:
+        frame: Innermost frame of the thread
+
+    Returns:
+        List of (filename, function, lineno) from the outermost BaseApi
+        request frame to the innermost frame, or None if the thread is not
+        inside a request
+    """
+    stack = []
+    root = None
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_name, frame.f_lineno))
+        if code.co_name in REQUEST_FUNCTIONS and code.co_filename.endswith(_BASE_API_FILE):
+            root = len(stack)
+        frame = frame.f_back
+    if root is None:
+        return None
+    return stack[:root][::-1]
+
+
+def categorize(stack):
+    """
+    Put one sampled request stack in a category.
+
+    Args:
+        stack: List of (filename, function, lineno), outermost first
+
+    Returns:
+        One of CATEGORIES
+    """
+    # A sample taken on a logger.* line of BaseApi (e.g. a debug dump
+    # being built) is logging cost, whatever the callee is
+    for filename, _, lineno in reversed(stack):
+        if filename.endswith(_BASE_API_FILE):
+            if "logger." in linecache.getline(filename, lineno):
+                return "logging"
+            break
+    # Only a Client that BaseApi builds or closes itself; httpx._client also
+    # holds the stream wrapper whose close() runs after every shared read
+    if any(function in CLIENT_SETUP_FUNCTIONS and filename.endswith(_HTTPX_CLIENT_FILE)
+           and caller.endswith(_BASE_API_FILE)
+           for (caller, _, _), (filename, function, _) in zip(stack, stack[1:])):
+        return "client_setup"
+    functions = {function for _, function, _ in stack}
+    if functions & CONNECTION_FUNCTIONS:
+        return "connection_setup"
+    leaf_file = stack[-1][0]
+    if leaf_file.endswith("threading.py") or "_synchronization" in leaf_file:
+        in_pool = any(filename.endswith("connection_pool.py") for filename, _, _ in stack)
+        return "pool_wait" if in_pool else "client_other"
+    for filename, _, _ in reversed(stack):
+        for fragment, category in LEAF_RULES:
+            if fragment in filename:
+                return category
+    return "client_other"
+
+
+def frame_label(filename, function):
+    """Label of one frame in collapsed stacks, e.g. "base_api:_send_request"."""
+    return f"{os.path.splitext(os.path.basename(filename))[0]}:{function}"
+
+
+class ClientProfiler:
+    """
+    Samples the stacks of threads sending BaseApi requests.
+    """
+
+    def __init__(self, interval_ms=5):
+        """
+        Args:
+            interval_ms: Time between two samples in milliseconds
+        """
+        self.interval_s = interval_ms / 1000
+        self.samples = 0
+        self.stacks = Counter()
+        self.categories = Counter()
+        self.sampler_cpu_s = 0.0
+        self.elapsed_s = 0.0
+        self._start = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start sampling in a background thread.
+
+        Returns:
+            self, for chaining
+        """
+        self._start = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="client-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling; the collected samples are kept."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.elapsed_s += time.monotonic() - self._start
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        cpu_start = time.thread_time()
+        while not self._stop.wait(self.interval_s):
+            self.sample(exclude=own_id)
+        self.sampler_cpu_s += time.thread_time() - cpu_start
+
+    def sample(self, exclude=None):
+        """
+        Take one sample of every thread that is inside a request.
+
+        Args:
+            exclude: Thread ID to skip (the sampler itself)
+        """
+        sampled = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == exclude:
+                continue
+            stack = request_stack(frame)
+            if stack is not None:
+                sampled.append(stack)
+        with self._lock:
+            for stack in sampled:
+                self.samples += 1
+                self.stacks[";".join(frame_label(filename, function)
+                                     for filename, function, _ in stack)] += 1
+                self.categories[categorize(stack)] += 1
+
+    def collapsed(self):
+        """
+        Get the samples as collapsed stacks ("frame;frame;frame count" lines),
+        the input format of flamegraph.pl and speedscope.
+
+        Returns:
+            List of lines, most frequent stack first
+        """
+        with self._lock:
+            return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def write_collapsed(self, path):
+        """
+        Write the collapsed stacks to a file.
+
+        Args:
+            path: Output file path
+        """
+        with open(path, "w") as f:
+            f.writelines(line + "\n" for line in self.collapsed())
+
+    def summary(self):
+        """
+        Get the time split by category.
+
+        Time is estimated as samples x interval, summed over threads, so it
+        can exceed the elapsed time when several threads send requests.
+
+        Returns:
+            Dictionary with samples, interval_ms, elapsed_s, sampler_cpu_s
+            (the profiler's own cost), and categories ({category:
+            {samples, share, time_s}})
+        """
+        with self._lock:
+            samples = self.samples
+            categories = {
+                category: {
+                    "samples": self.categories[category],
+                    "share": self.categories[category] / samples if samples else 0.0,
+                    "time_s": self.categories[category] * self.interval_s
+                }
+                for category in CATEGORIES
+            }
+        return {
+            "samples": samples,
+            "interval_ms": self.interval_s * 1000,
+            "elapsed_s": self.elapsed_s,
+            "sampler_cpu_s": self.sampler_cpu_s,
+            "categories": categories
+        }
+
+
+def format_profile(summary):
+    """
+    Format a profile summary as a category table.
+
+    Args:
+        summary: Dictionary returned by ClientProfiler.summary
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"Client profile: {summary['samples']} samples every {summary['interval_ms']:g}ms "
+             f"over {summary['elapsed_s']:.1f}s (profiler CPU {summary['sampler_cpu_s']:.2f}s)",
+             f"{'category':<18}{'samples':>9}{'share':>8}{'est. time':>11}"]
+    for category, row in summary["categories"].items():
+        lines.append(f"{category:<18}{row['samples']:>9}{row['share']:>8.1%}{row['time_s']:>10.2f}s")
+    client = sum(row["share"] for category, row in summary["categories"].items()
+                 if category not in ("socket_wait", "pool_wait"))
+    lines.append(f"Client overhead {client:.1%} of request time, waiting on the network "
+                 f"{summary['categories']['socket_wait']['share']:.1%}")
+    return "\n".join(lines)
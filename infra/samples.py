@@ -0,0 +1,352 @@
+"""
+Append-only columnar store for per-request samples.
+
+Every column (timestamp, endpoint, status, latency, response bytes) is a
+typed array. Appends go to a small in-memory buffer that is spilled to
+one file per column; queries memory-map those files and scan them in
+fixed-size chunks, bucketing latencies into LatencyHistograms with
+map/Counter passes. Memory use is bounded by the buffer and chunk sizes,
+not by the number of samples, so a 10M-request run can be analysed in a
+few megabytes of RAM.
+
+Usage:
+    store = SampleStore("run-samples").install()   # record every BaseApi request
+    ...
+    store.close()
+    SampleStore("run-samples").group_by_endpoint()
+"""
+import array
+import csv
+import json
+import math
+import mmap
+import os
+import threading
+import time
+from collections import Counter
+from itertools import compress, groupby, repeat
+from operator import eq, sub, truediv
+
+from infra import base_api
+from infra.base_api import endpoint_template
+from infra.metrics import is_error_status
+from infra.stats import LatencyHistogram
+
+# Column name -> array typecode
+COLUMNS = (
+    ("timestamp", "d"),
+    ("endpoint", "H"),
+    ("status", "H"),
+    ("latency_ms", "f"),
+    ("bytes", "I")
+)
+
+META_FILE = "meta.json"
+
+
+class SampleStore:
+    """
+    Columnar, memory-mapped store of request samples.
+    """
+
+    def __init__(self, directory, buffer_size=65536, chunk_size=262144):
+        """
+        Open a store, creating it or continuing an existing one.
+
+        Args:
+            directory: Directory holding the column files
+            buffer_size: Samples kept in memory before spilling to disk
+            chunk_size: Samples scanned at a time by queries
+        """
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.endpoints = meta["endpoints"]
+            self.statuses = meta["statuses"]
+            self.count = meta["count"]
+        else:
+            self.endpoints = []
+            self.statuses = []
+            self.count = 0
+        self._endpoint_codes = {name: code for code, name in enumerate(self.endpoints)}
+        self._status_codes = {name: code for code, name in enumerate(self.statuses)}
+
+        self._buffers = {name: array.array(typecode) for name, typecode in COLUMNS}
+        # Opened on the first spill, so analysing a finished run writes nothing
+        self._files = None
+
+    def _column_path(self, name):
+        return os.path.join(self.directory, f"{name}.col")
+
+    def __len__(self):
+        return self.count + len(self._buffers["timestamp"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _intern(value, names, codes):
+        code = codes.get(value)
+        if code is None:
+            if len(names) >= 65535:
+                raise ValueError(f"Too many distinct values (adding '{value}')")
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def append(self, timestamp, endpoint, status, latency_ms, size=0):
+        """
+        Append one sample. Safe to call from several threads.
+
+        Args:
+            timestamp: Unix time of the request
+            endpoint: Endpoint label, e.g. "GET /booking/{id}"
+            status: HTTP status code as a string, or an exception class name
+            latency_ms: Latency in milliseconds
+            size: Response body size in bytes
+        """
+        with self._lock:
+            buffers = self._buffers
+            buffers["timestamp"].append(timestamp)
+            buffers["endpoint"].append(self._intern(endpoint, self.endpoints, self._endpoint_codes))
+            buffers["status"].append(self._intern(status, self.statuses, self._status_codes))
+            buffers["latency_ms"].append(latency_ms)
+            buffers["bytes"].append(size)
+            if len(buffers["timestamp"]) >= self.buffer_size:
+                self._spill()
+
+    def record_request(self, method, endpoint, status, latency_ms, size=0):
+        """
+        BaseApi request listener: append the request as a sample.
+        """
+        self.append(time.time(), f"{method.upper()} {endpoint_template(endpoint)}",
+                    status, latency_ms, size)
+
+    def install(self):
+        """
+        Record every request sent through BaseApi.
+
+        Returns:
+            self, to allow chaining
+        """
+        base_api.add_request_listener(self.record_request)
+        return self
+
+    def uninstall(self):
+        """Stop recording BaseApi requests."""
+        base_api.remove_request_listener(self.record_request)
+
+    def _spill(self):
+        # Called with the lock held
+        pending = len(self._buffers["timestamp"])
+        if not pending:
+            return
+        if self._files is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._files = {name: open(self._column_path(name), "ab") for name, _ in COLUMNS}
+        for name, _ in COLUMNS:
+            self._buffers[name].tofile(self._files[name])
+            del self._buffers[name][:]
+            self._files[name].flush()
+        self.count += pending
+        with open(os.path.join(self.directory, META_FILE), "w") as f:
+            json.dump({"columns": dict(COLUMNS), "endpoints": self.endpoints,
+                       "statuses": self.statuses, "count": self.count}, f)
+
+    def flush(self):
+        """Write buffered samples to the column files."""
+        with self._lock:
+            self._spill()
+
+    def close(self):
+        """Flush, stop recording and close the column files."""
+        self.uninstall()
+        with self._lock:
+            self._spill()
+            files, self._files = self._files, None
+        for f in (files or {}).values():
+            f.close()
+
+    def chunks(self, *names):
+        """
+        Scan columns in chunks through memory maps.
+
+        The yielded memoryviews are only valid until the next iteration.
+
+        Args:
+            *names: Column names (see COLUMNS)
+
+        Yields:
+            Tuple of typed memoryviews, one per requested column
+        """
+        self.flush()
+        if not self.count:
+            return
+        typecodes = dict(COLUMNS)
+        maps, views = [], []
+        try:
+            for name in names:
+                with open(self._column_path(name), "rb") as f:
+                    maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                views.append(memoryview(maps[-1]).cast(typecodes[name])[:self.count])
+            for start in range(0, self.count, self.chunk_size):
+                chunk = tuple(view[start:start + self.chunk_size] for view in views)
+                try:
+                    yield chunk
+                finally:
+                    for view in chunk:
+                        view.release()
+        finally:
+            for view in views:
+                view.release()
+            for mapped in maps:
+                mapped.close()
+
+    def _endpoint_mask(self, endpoints, endpoint):
+        # Selector for compress(); None means every sample matches
+        if endpoint is None:
+            return None
+        return map(eq, endpoints, repeat(self._endpoint_codes.get(endpoint, -1)))
+
+    def histogram(self, endpoint=None):
+        """
+        Build a latency histogram of all samples (or of one endpoint).
+
+        Args:
+            endpoint: Endpoint label to filter on (optional)
+
+        Returns:
+            LatencyHistogram
+        """
+        histogram = LatencyHistogram()
+        for endpoints, latencies in self.chunks("endpoint", "latency_ms"):
+            mask = self._endpoint_mask(endpoints, endpoint)
+            histogram.record_many(latencies if mask is None else list(compress(latencies, mask)))
+        return histogram
+
+    def percentiles(self, pcts=(50, 90, 95, 99, 99.9), endpoint=None):
+        """
+        Get latency percentiles (within the histogram precision).
+
+        Args:
+            pcts: Percentiles to compute (0-100)
+            endpoint: Endpoint label to filter on (optional)
+
+        Returns:
+            Dictionary mapping "p<pct>" to latency in milliseconds
+        """
+        histogram = self.histogram(endpoint)
+        return {f"p{pct:g}": histogram.percentile(pct) for pct in pcts}
+
+    def group_by_endpoint(self):
+        """
+        Summarize samples per endpoint.
+
+        Returns:
+            Dictionary mapping endpoint label to count, errors, bytes,
+            statuses and a latency_ms summary
+        """
+        histograms = {}
+        sizes = Counter()
+        statuses = Counter()
+        for endpoints, status_codes, latencies, byte_counts in self.chunks(
+                "endpoint", "status", "latency_ms", "bytes"):
+            statuses.update(zip(endpoints, status_codes))
+            for code in set(endpoints):
+                selected = list(map(eq, endpoints, repeat(code)))
+                histograms.setdefault(code, LatencyHistogram()).record_many(
+                    list(compress(latencies, selected)))
+                sizes[code] += sum(compress(byte_counts, selected))
+
+        groups = {}
+        for code, histogram in histograms.items():
+            counts = {self.statuses[status]: count
+                      for (endpoint, status), count in statuses.items() if endpoint == code}
+            groups[self.endpoints[code]] = {
+                "count": histogram.count,
+                "errors": sum(count for status, count in counts.items() if is_error_status(status)),
+                "bytes": sizes[code],
+                "statuses": counts,
+                "latency_ms": histogram.summary()
+            }
+        return groups
+
+    def time_buckets(self, width_s=1.0, endpoint=None):
+        """
+        Summarize samples per time bucket.
+
+        Args:
+            width_s: Bucket width in seconds
+            endpoint: Endpoint label to filter on (optional)
+
+        Returns:
+            List of dictionaries (start_s from the first sample, count,
+            errors, rps, latency_ms summary), in time order
+        """
+        error_codes = [is_error_status(status) for status in self.statuses]
+        buckets = {}
+        first = None
+        for timestamps, endpoints, status_codes, latencies in self.chunks(
+                "timestamp", "endpoint", "status", "latency_ms"):
+            if first is None:
+                first = timestamps[0]
+            mask = self._endpoint_mask(endpoints, endpoint)
+            if mask is not None:
+                mask = list(mask)
+                timestamps, status_codes, latencies = (
+                    list(compress(column, mask)) for column in (timestamps, status_codes, latencies))
+            offsets = map(truediv, map(sub, timestamps, repeat(first)), repeat(width_s))
+            position = 0
+            # Samples arrive in (almost) time order, so buckets come in runs
+            for index, run in groupby(map(math.floor, offsets)):
+                length = len(list(run))
+                bucket = buckets.get(index)
+                if bucket is None:
+                    bucket = buckets[index] = {"histogram": LatencyHistogram(), "errors": 0}
+                bucket["histogram"].record_many(latencies[position:position + length])
+                bucket["errors"] += sum(map(error_codes.__getitem__,
+                                            status_codes[position:position + length]))
+                position += length
+
+        return [{
+            "start_s": index * width_s,
+            "count": bucket["histogram"].count,
+            "errors": bucket["errors"],
+            "rps": bucket["histogram"].count / width_s,
+            "latency_ms": bucket["histogram"].summary()
+        } for index, bucket in sorted(buckets.items())]
+
+    def to_csv(self, path):
+        """
+        Export all samples to CSV, streaming chunk by chunk.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            Number of rows written
+        """
+        rows = 0
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([name for name, _ in COLUMNS])
+            for timestamps, endpoints, status_codes, latencies, byte_counts in self.chunks(
+                    *(name for name, _ in COLUMNS)):
+                writer.writerows(zip(
+                    map(round, timestamps, repeat(6)),
+                    map(self.endpoints.__getitem__, endpoints),
+                    map(self.statuses.__getitem__, status_codes),
+                    map(round, latencies, repeat(3)),
+                    byte_counts
+                ))
+                rows += len(timestamps)
+        return rows
@@ -0,0 +1,261 @@
+"""
+Passive per-endpoint latency SLOs.
+
+SessionLatencies listens to every request sent through BaseApi (see
+add_request_listener) and keeps one LatencyHistogram per logical
+endpoint, e.g. "GET /booking/{id}". No extra requests are made: a normal
+functional test run doubles as a latency health check. At the end, the
+percentiles are checked against an SLO config:
+
+    {
+        "min_samples": 5,
+        "default": {"p95_ms": 3000, "max_failure_rate": 0.01},
+        "endpoints": {
+            "GET /booking/{id}": {"p50_ms": 800, "p95_ms": 2000}
+        }
+    }
+
+Objectives: p50_ms, p90_ms, p95_ms, p99_ms, max_ms and max_failure_rate
+(share of requests that failed with a 5xx or no response). Endpoints
+with fewer than min_samples requests are reported but not checked.
+
+Histograms merge losslessly, so collectors of several processes (e.g.
+pytest-xdist workers) combine with to_dict / merge_dict.
+"""
+import json
+import threading
+from contextlib import contextmanager
+
+from infra import base_api
+from infra.base_api import endpoint_template
+from infra.stats import LatencyHistogram
+
+# Objective name -> summary key it limits (None: the failure rate)
+OBJECTIVES = {
+    "p50_ms": "p50",
+    "p90_ms": "p90",
+    "p95_ms": "p95",
+    "p99_ms": "p99",
+    "max_ms": "max",
+    "max_failure_rate": None
+}
+
+
+def load_slo_config(path):
+    """
+    Load and validate an SLO config file.
+
+    Args:
+        path: JSON file path
+
+    Returns:
+        Dictionary with min_samples, default and endpoints
+    """
+    with open(path) as f:
+        config = json.load(f)
+    config.setdefault("min_samples", 1)
+    config.setdefault("default", {})
+    config.setdefault("endpoints", {})
+    for route, objectives in [("default", config["default"]), *config["endpoints"].items()]:
+        unknown = set(objectives) - set(OBJECTIVES)
+        if unknown:
+            raise ValueError(f"Unknown SLO objectives for {route}: {sorted(unknown)}, "
+                             f"expected some of {list(OBJECTIVES)}")
+    return config
+
+
+def is_failure(status):
+    """
+    Tell whether a request counts against the failure rate: a 5xx status
+    or no response at all (4xx answers are expected by negative tests).
+
+    Args:
+        status: HTTP status code as a string, or an exception class name
+    """
+    return not status.isdigit() or int(status) >= 500
+
+
+class SessionLatencies:
+    """
+    Collects per-endpoint latencies of all BaseApi requests.
+    Safe to record into from several threads.
+    """
+
+    def __init__(self, precision=0.01):
+        """
+        Args:
+            precision: Relative precision of the latency histograms
+        """
+        self.precision = precision
+        self.histograms = {}
+        self.requests = {}
+        self.failures = {}
+        self.paused = False
+        self._lock = threading.Lock()
+
+    def install(self):
+        """
+        Record every request sent through BaseApi.
+
+        Returns:
+            self, to allow chaining
+        """
+        base_api.add_request_listener(self.record)
+        return self
+
+    def uninstall(self):
+        """Stop recording BaseApi requests."""
+        base_api.remove_request_listener(self.record)
+
+    @contextmanager
+    def exempt(self):
+        """Ignore the requests sent inside the block (faults, mocked transports)."""
+        paused, self.paused = self.paused, True
+        try:
+            yield
+        finally:
+            self.paused = paused
+
+    def record(self, method, endpoint, status, latency_ms, size=0):
+        """
+        Record one request (add_request_listener callback).
+
+        Args:
+            method: HTTP method
+            endpoint: Endpoint path as sent, e.g. /booking/42
+            status: HTTP status code as a string, or an exception class name
+            latency_ms: Request latency in milliseconds
+            size: Response body size in bytes (unused)
+        """
+        if self.paused:
+            return
+        route = f"{method.upper()} {endpoint_template(endpoint)}"
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            if is_failure(status):
+                self.failures[route] = self.failures.get(route, 0) + 1
+            if status.isdigit():
+                histogram = self.histograms.get(route)
+                if histogram is None:
+                    histogram = self.histograms[route] = LatencyHistogram(self.precision)
+                histogram.record(latency_ms)
+
+    def to_dict(self):
+        """
+        Serialize the collected data.
+
+        Returns:
+            JSON friendly dictionary accepted by merge_dict
+        """
+        with self._lock:
+            return {
+                "histograms": {route: histogram.to_dict()
+                               for route, histogram in self.histograms.items()},
+                "requests": dict(self.requests),
+                "failures": dict(self.failures)
+            }
+
+    def merge_dict(self, data):
+        """
+        Add data serialized by another collector's to_dict.
+
+        Args:
+            data: Dictionary produced by to_dict
+        """
+        with self._lock:
+            for route, histogram in data["histograms"].items():
+                other = LatencyHistogram.from_dict(histogram)
+                if route in self.histograms:
+                    self.histograms[route].merge(other)
+                else:
+                    self.histograms[route] = other
+            for counter, counts in ((self.requests, data["requests"]),
+                                    (self.failures, data["failures"])):
+                for route, count in counts.items():
+                    counter[route] = counter.get(route, 0) + count
+
+    def summaries(self):
+        """
+        Summarize every endpoint.
+
+        Returns:
+            Dictionary mapping route to requests, failures, failure_rate and
+            latency_ms (LatencyHistogram.summary)
+        """
+        with self._lock:
+            return {
+                route: {
+                    "requests": requests,
+                    "failures": self.failures.get(route, 0),
+                    "failure_rate": self.failures.get(route, 0) / requests,
+                    "latency_ms": (self.histograms[route].summary() if route in self.histograms
+                                   else {"count": 0})
+                }
+                for route, requests in sorted(self.requests.items())
+            }
+
+
+def evaluate(summaries, config):
+    """
+    Check endpoint summaries against an SLO config.
+
+    Args:
+        summaries: Dictionary returned by SessionLatencies.summaries
+        config: Dictionary returned by load_slo_config
+
+    Returns:
+        List of check dictionaries with route, objective, limit, actual and
+        result ("pass", "fail" or "too few samples")
+    """
+    checks = []
+    for route, summary in summaries.items():
+        objectives = {**config["default"], **config["endpoints"].get(route, {})}
+        for objective, limit in objectives.items():
+            key = OBJECTIVES[objective]
+            actual = summary["failure_rate"] if key is None else summary["latency_ms"].get(key)
+            count = summary["requests"] if key is None else summary["latency_ms"]["count"]
+            if count < config["min_samples"] or actual is None:
+                result = "too few samples"
+            else:
+                result = "pass" if actual <= limit else "fail"
+            checks.append({"route": route, "objective": objective, "limit": limit,
+                           "actual": actual, "result": result})
+    return checks
+
+
+def format_slo_report(summaries, checks):
+    """
+    Format endpoint latencies and SLO results.
+
+    Args:
+        summaries: Dictionary returned by SessionLatencies.summaries
+        checks: List returned by evaluate
+
+    Returns:
+        Multi-line string
+    """
+    def ms(latency, name):
+        value = latency.get(name)
+        return f"{value:.0f}" if value is not None else "-"
+
+    lines = [f"{'endpoint':<24}{'requests':>9}{'failed':>8}{'p50':>8}{'p95':>8}{'p99':>8}"
+             f"{'max':>8}  SLO"]
+    for route, summary in summaries.items():
+        latency = summary["latency_ms"]
+        route_checks = [check for check in checks if check["route"] == route]
+        failed = [f"{check['objective']} {check['actual']:.4g} > {check['limit']}"
+                  for check in route_checks if check["result"] == "fail"]
+        if failed:
+            verdict = "FAIL " + ", ".join(failed)
+        elif any(check["result"] == "pass" for check in route_checks):
+            verdict = "ok"
+        else:
+            verdict = "-"
+        lines.append(f"{route:<24}{summary['requests']:>9}{summary['failures']:>8}"
+                     f"{ms(latency, 'p50'):>8}{ms(latency, 'p95'):>8}{ms(latency, 'p99'):>8}"
+                     f"{ms(latency, 'max'):>8}  {verdict}")
+    failed = sum(check["result"] == "fail" for check in checks)
+    lines.append(f"{failed} of {len(checks)} SLO objectives failed" if failed
+                 else f"All {sum(check['result'] == 'pass' for check in checks)} checked SLO "
+                      f"objectives met")
+    return "\n".join(lines)
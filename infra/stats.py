@@ -0,0 +1,338 @@
+import math
+import random
+from collections import Counter
+from itertools import repeat
+from operator import truediv
+
+
+def percentile(sorted_values, pct):
+    """
+    Get a percentile from an already sorted list of numbers.
+    Uses linear interpolation between the closest ranks.
+
+    Args:
+        sorted_values: Ascending list of numbers
+        pct: Percentile to compute (0-100)
+
+    Returns:
+        The interpolated percentile value, or None for an empty list
+    """
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return sorted_values[int(rank)]
+    weight = rank - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize_latencies(latencies_ms):
+    """
+    Build a latency summary (count, spread and common percentiles).
+
+    Args:
+        latencies_ms: Iterable of latencies in milliseconds
+
+    Returns:
+        Dictionary with count, min, p50, p90, p95, p99, max, mean, stdev and spread
+    """
+    values = sorted(latencies_ms)
+    if not values:
+        return {"count": 0}
+
+    mean = sum(values) / len(values)
+    variance = sum((value - mean) ** 2 for value in values) / len(values)
+    return {
+        "count": len(values),
+        "min": values[0],
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+        "mean": mean,
+        "stdev": math.sqrt(variance),
+        "spread": values[-1] - values[0]
+    }
+
+
+def mann_whitney_u(sample_a, sample_b):
+    """
+    Two-sided Mann-Whitney U test: do two samples come from the same
+    distribution? Uses the normal approximation with tie and continuity
+    corrections, which is accurate from about 20 values per sample.
+
+    Args:
+        sample_a: First sample (e.g. latencies of target A)
+        sample_b: Second sample
+
+    Returns:
+        Tuple (u, p_value) where u is the U statistic of sample_a, or
+        (None, None) if a sample is empty
+    """
+    n_a, n_b = len(sample_a), len(sample_b)
+    if not n_a or not n_b:
+        return None, None
+    combined = sorted([(value, 0) for value in sample_a] + [(value, 1) for value in sample_b])
+    n = n_a + n_b
+    rank_sum_a = 0.0
+    tie_term = 0
+    start = 0
+    while start < n:
+        end = start
+        while end + 1 < n and combined[end + 1][0] == combined[start][0]:
+            end += 1
+        average_rank = (start + end) / 2 + 1
+        ties = end - start + 1
+        tie_term += ties ** 3 - ties
+        rank_sum_a += average_rank * sum(1 for i in range(start, end + 1) if combined[i][1] == 0)
+        start = end + 1
+
+    u = rank_sum_a - n_a * (n_a + 1) / 2
+    mean = n_a * n_b / 2
+    variance = n_a * n_b / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0
+    if variance <= 0:
+        return u, 1.0
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+def _median(values):
+    return percentile(sorted(values), 50)
+
+
+def bootstrap_ratio_ci(sample_a, sample_b, statistic=_median, iterations=1000, confidence=0.95,
+                       rng=None):
+    """
+    Estimate statistic(sample_a) / statistic(sample_b) with a percentile
+    bootstrap confidence interval.
+
+    Args:
+        sample_a: Numerator sample (e.g. latencies of the current build)
+        sample_b: Denominator sample (e.g. latencies of the new build)
+        statistic: Callable reducing a sample to a number (default: median)
+        iterations: Bootstrap resamples
+        confidence: Confidence level of the interval
+        rng: random.Random instance (default: a fixed seed, for repeatable reports)
+
+    Returns:
+        Tuple (ratio, low, high), or (None, None, None) if a sample is empty
+        or a statistic is zero
+    """
+    if not sample_a or not sample_b:
+        return None, None, None
+    rng = rng or random.Random(0)
+    base_b = statistic(sample_b)
+    if not base_b:
+        return None, None, None
+    ratios = []
+    for _ in range(iterations):
+        resampled_b = statistic(rng.choices(sample_b, k=len(sample_b)))
+        if resampled_b:
+            ratios.append(statistic(rng.choices(sample_a, k=len(sample_a))) / resampled_b)
+    ratios.sort()
+    tail = (1 - confidence) / 2 * 100
+    return (statistic(sample_a) / base_b, percentile(ratios, tail),
+            percentile(ratios, 100 - tail))
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram.
+
+    Values are counted in buckets whose width grows geometrically, so the
+    relative error of every percentile is bounded by the precision while
+    memory stays constant. Histograms with the same precision merge
+    losslessly by adding bucket counts, which makes them safe to combine
+    across threads, processes and machines.
+    """
+
+    # Smallest distinguishable latency in milliseconds
+    MIN_VALUE_MS = 0.001
+
+    def __init__(self, precision=0.01):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            precision: Relative width of a bucket (0.01 = 1% error)
+        """
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value_ms):
+        """
+        Count one latency sample.
+
+        Args:
+            value_ms: Latency in milliseconds
+        """
+        value_ms = max(value_ms, self.MIN_VALUE_MS)
+        index = math.floor(math.log(value_ms) / self._log_base)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        if self.min is None or value_ms < self.min:
+            self.min = value_ms
+        if self.max is None or value_ms > self.max:
+            self.max = value_ms
+
+    def record_many(self, values_ms):
+        """
+        Count a batch of latency samples.
+
+        Bucketing runs in map/Counter passes instead of a Python level
+        loop, roughly twice as fast as calling record for every value.
+
+        Args:
+            values_ms: Sequence of latencies in milliseconds (list, array
+                       or memoryview)
+        """
+        if not len(values_ms):
+            return
+        values = list(map(max, values_ms, repeat(self.MIN_VALUE_MS)))
+        indexes = map(math.floor, map(truediv, map(math.log, values), repeat(self._log_base)))
+        for index, count in Counter(indexes).items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += len(values)
+        self.total += sum(values)
+        low, high = min(values), max(values)
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+    def merge(self, other):
+        """
+        Add all samples of another histogram to this one.
+
+        Args:
+            other: LatencyHistogram with the same precision
+
+        Returns:
+            self, to allow chaining
+        """
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge histograms with precision {other.precision} and {self.precision}"
+            )
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    def copy(self):
+        """
+        Take a snapshot of the histogram.
+
+        The bucket counts are copied in one step, so a snapshot can be
+        taken while another thread keeps recording.
+
+        Returns:
+            New LatencyHistogram with the same samples
+        """
+        histogram = LatencyHistogram(precision=self.precision)
+        histogram.counts = dict(self.counts)
+        histogram.count = sum(histogram.counts.values())
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        return histogram
+
+    def percentile(self, pct):
+        """
+        Estimate a percentile.
+
+        Args:
+            pct: Percentile to compute (0-100)
+
+        Returns:
+            Latency in milliseconds (within the precision), or None if empty
+        """
+        if not self.count:
+            return None
+        if pct <= 0:
+            return self.min
+        if pct >= 100:
+            return self.max
+
+        target = self.count * pct / 100.0
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                # Geometric midpoint of the bucket, clamped to observed values
+                value = math.exp((index + 0.5) * self._log_base)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Build a summary with the same keys as summarize_latencies.
+
+        Returns:
+            Dictionary with count, min, p50, p90, p95, p99, max and mean
+        """
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min": self.min,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "mean": self.total / self.count,
+            "spread": self.max - self.min
+        }
+
+    def to_dict(self):
+        """
+        Serialize to a JSON/pickle friendly dictionary.
+
+        Returns:
+            Dictionary accepted by from_dict
+        """
+        return {
+            "precision": self.precision,
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a histogram serialized with to_dict.
+
+        Args:
+            data: Dictionary produced by to_dict
+
+        Returns:
+            LatencyHistogram
+        """
+        histogram = cls(precision=data["precision"])
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
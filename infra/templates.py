@@ -0,0 +1,94 @@
+import json
+
+from infra import base_api
+
+
+class RequestTemplate:
+    """
+    A request prepared once and sent many times.
+
+    The URL, headers and JSON body bytes are built when the template is
+    created. Sending it only splices in the booking ID and swaps the auth
+    cookie, so no URL formatting, header dictionaries or JSON encoding
+    happen per request. Templates may be shared by threads.
+    """
+
+    # Placeholder for the booking ID in template paths
+    ID_PLACEHOLDER = "{id}"
+
+    def __init__(self, method, base_url, endpoint, payload=None, headers=None):
+        """
+        Prepare a request.
+
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE, etc.)
+            base_url: The base URL of the API
+            endpoint: API endpoint, with {id} where the booking ID goes
+                      (e.g. /booking/{id})
+            payload: Request body as a dictionary or already encoded bytes
+            headers: HTTP headers (default: base_api.DEFAULT_HEADERS)
+        """
+        self.method = method.upper()
+        self.endpoint = endpoint
+        self.base_url = base_url
+        self.path_prefix, _, self.path_suffix = endpoint.partition(self.ID_PLACEHOLDER)
+        self.has_id = self.ID_PLACEHOLDER in endpoint
+        self.headers = dict(headers if headers is not None else base_api.DEFAULT_HEADERS)
+
+        if payload is None or isinstance(payload, bytes):
+            self.content = payload
+        else:
+            self.content = json.dumps(payload, separators=(",", ":")).encode()
+        # Last token used and its headers, replaced as one tuple so threads
+        # never see a token paired with another token's cookie
+        self._auth = (None, self.headers)
+
+    def path(self, booking_id=None):
+        """
+        Build the request path.
+
+        Args:
+            booking_id: Booking ID for templates with an {id} placeholder
+
+        Returns:
+            Endpoint path, e.g. /booking/7
+        """
+        if not self.has_id:
+            return self.path_prefix
+        if booking_id is None:
+            raise ValueError(f"Template {self.method} {self.endpoint} needs a booking ID")
+        return f"{self.path_prefix}{booking_id}{self.path_suffix}"
+
+    def url(self, booking_id=None):
+        """
+        Build the request URL.
+
+        Args:
+            booking_id: Booking ID for templates with an {id} placeholder
+
+        Returns:
+            Full URL string
+        """
+        return f"{self.base_url}{self.path(booking_id)}"
+
+    def headers_for(self, token=None):
+        """
+        Get the request headers, with the auth cookie if a token is given.
+
+        The headers of the most recent token are cached, so a run that
+        keeps one token builds its headers only once.
+
+        Args:
+            token: Authentication token (optional)
+
+        Returns:
+            Headers dictionary (do not modify)
+        """
+        if token is None:
+            return self.headers
+        cached_token, headers = self._auth
+        if cached_token != token:
+            headers = dict(self.headers)
+            headers["Cookie"] = f"token={token}"
+            self._auth = (token, headers)
+        return headers
@@ -0,0 +1,31 @@
+"""
+API clients for the Restful Booker endpoints.
+
+The clients are loaded on first access (PEP 562 module __getattr__), so
+`import logic` costs nothing until one of them is used:
+
+    from logic import BookingApi    # imports logic.booking_api only
+"""
+import importlib
+
+# Public name -> module defining it
+_EXPORTS = {
+    "AuthApi": "logic.auth_api",
+    "BookingApi": "logic.booking_api",
+    "PingApi": "logic.ping_api"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -11,12 +11,16 @@ class AuthApi(BaseApi):
     DEFAULT_USERNAME = "admin"
     DEFAULT_PASSWORD = "password123"
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         """
         Initialize AuthApi with the base URL.
         Calls parent class constructor to set up the HTTP client.
+
+        Args:
+            **kwargs: Passed to BaseApi (base_url, client, timeouts, hedging,
+                      coalescing, transport)
         """
-        super().__init__()
+        super().__init__(**kwargs)
 
     def create_token(self, username=None, password=None):
         """
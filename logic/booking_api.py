@@ -7,11 +7,25 @@ class BookingApi(BaseApi):
     Handles CRUD operations for hotel bookings.
     """
 
-    def __init__(self):
+    # Operation name -> (method, endpoint) for request templates
+    TEMPLATE_ROUTES = {
+        "get_all_bookings": ("GET", "/booking"),
+        "get_booking": ("GET", "/booking/{id}"),
+        "create_booking": ("POST", "/booking"),
+        "update_booking": ("PUT", "/booking/{id}"),
+        "partial_update_booking": ("PATCH", "/booking/{id}"),
+        "delete_booking": ("DELETE", "/booking/{id}")
+    }
+
+    def __init__(self, **kwargs):
         """
         Initialize BookingApi with the base URL.
+
+        Args:
+            **kwargs: Passed to BaseApi (base_url, client, timeouts, hedging,
+                      coalescing, transport)
         """
-        super().__init__()
+        super().__init__(**kwargs)
 
     def _get_auth_headers(self, token):
         """
@@ -120,3 +134,20 @@ class BookingApi(BaseApi):
             headers=self._get_auth_headers(token)
         )
 
+    def booking_template(self, operation, booking_data=None):
+        """
+        Prepare a booking request to send repeatedly with send_template.
+        The payload is encoded once; the booking ID and token are passed
+        to send_template.
+
+        Args:
+            operation: One of TEMPLATE_ROUTES (e.g. "update_booking")
+            booking_data: Booking data for create/update operations
+
+        Returns:
+            RequestTemplate
+        """
+        if operation not in self.TEMPLATE_ROUTES:
+            raise ValueError(f"Unknown booking operation '{operation}'")
+        method, endpoint = self.TEMPLATE_ROUTES[operation]
+        return self.template(method, endpoint, payload=booking_data)
@@ -7,12 +7,16 @@ class PingApi(BaseApi):
     Used to verify that the API service is running and accessible.
     """
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         """
         Initialize PingApi with the base URL.
         Calls parent class constructor to set up the HTTP client.
+
+        Args:
+            **kwargs: Passed to BaseApi (base_url, client, timeouts, hedging,
+                      coalescing, transport)
         """
-        super().__init__()
+        super().__init__(**kwargs)
 
     def health_check(self):
         """
@@ -4,73 +4,250 @@ Pytest configuration and shared fixtures.
 This module provides common fixtures used across multiple test files
 to reduce code duplication and ensure test independence.
 """
+import os
+from concurrent.futures import wait
+
 import pytest
+from infra.coalescing import SingleFlight
+from infra.deadline import deadline
+from infra.slo import SessionLatencies, evaluate, format_slo_report, load_slo_config
 from logic.auth_api import AuthApi
 from logic.booking_api import BookingApi
+from utils.prefetch import create_booking, fetch_token, prefetch
 from utils.test_data import generate_booking_data
 
 
+def pytest_addoption(parser):
+    """Register command line options."""
+    parser.addoption("--deadline", type=float, default=None,
+                     help="Default time budget in seconds for every test (see the deadline marker)")
+    parser.addoption("--no-prefetch", action="store_true", default=False,
+                     help="Run token and booking setup one call after the other")
+    parser.addoption("--profile-client", metavar="PATH", default=None,
+                     help="Sample the client during requests; write collapsed stacks to PATH "
+                          "and report where request time goes")
+    parser.addoption("--profile-interval", type=float, default=5.0,
+                     help="Client profiler sampling interval in milliseconds")
+    parser.addoption("--slo-config", metavar="PATH", default=None,
+                     help="Per-endpoint latency SLOs checked at the end of the run "
+                          "(default: slo.json in the project root)")
+    parser.addoption("--slo-enforce", action="store_true", default=False,
+                     help="Fail the run if an endpoint misses its SLO")
+
+
+def pytest_configure(config):
+    """Start the client profiler if --profile-client is given, and the SLO collector."""
+    config.client_profiler = None
+    if config.getoption("--profile-client"):
+        from infra.profiling import ClientProfiler
+
+        config.client_profiler = ClientProfiler(
+            interval_ms=config.getoption("--profile-interval")).start()
+    config.slo_latencies = SessionLatencies().install()
+    config.slo_checks = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    """Leave requests of fault injection, mocked-transport and 5xx-provoking tests out of SLOs."""
+    if item.get_closest_marker("slo_exempt") or "fault_proxy" in item.fixturenames:
+        with item.config.slo_latencies.exempt():
+            yield
+    else:
+        yield
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Merge the request latencies collected by a pytest-xdist worker."""
+    data = getattr(node, "workeroutput", {}).get("slo_latencies")
+    if data is not None:
+        node.config.slo_latencies.merge_dict(data)
+
+
+def pytest_sessionfinish(session):
+    """Stop the client profiler, and check the session's request latencies against the SLOs."""
+    config = session.config
+    profiler = config.client_profiler
+    if profiler is not None:
+        profiler.stop()
+        profiler.write_collapsed(config.getoption("--profile-client"))
+
+    config.slo_latencies.uninstall()
+    if hasattr(config, "workerinput"):
+        # xdist worker: the controller merges and checks
+        config.workeroutput["slo_latencies"] = config.slo_latencies.to_dict()
+        return
+    path = config.getoption("--slo-config") or os.path.join(config.rootpath, "slo.json")
+    if not os.path.exists(path):
+        return
+    config.slo_checks = evaluate(config.slo_latencies.summaries(), load_slo_config(path))
+    failed = any(check["result"] == "fail" for check in config.slo_checks)
+    if failed and config.getoption("--slo-enforce") and session.exitstatus == 0:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Print the session SLO report and the client profile category table."""
+    if config.slo_checks is not None:
+        terminalreporter.section("endpoint latency SLOs")
+        terminalreporter.write_line(format_slo_report(config.slo_latencies.summaries(),
+                                                      config.slo_checks))
+    if config.client_profiler is not None:
+        from infra.profiling import format_profile
+
+        terminalreporter.section("client profile")
+        terminalreporter.write_line(format_profile(config.client_profiler.summary()))
+        terminalreporter.write_line(
+            f"Collapsed stacks written to {config.getoption('--profile-client')}")
+
+
+@pytest.fixture(autouse=True)
+def test_deadline(request):
+    """
+    Fixture running each test under its time budget.
+    The budget comes from @pytest.mark.deadline(seconds), else from the
+    --deadline option; it also covers the setup of the test's fixtures.
+    
+    Args:
+        request: Pytest request object
+        
+    Yields:
+        Deadline or None: The active deadline, if any
+    """
+    marker = request.node.get_closest_marker("deadline")
+    budget_s = marker.args[0] if marker else request.config.getoption("--deadline")
+    if budget_s is None:
+        yield None
+        return
+    with deadline(budget_s, name=request.node.name) as active:
+        yield active
+
+
+def warm_client(config):
+    """
+    Return the pooled client kept by tools.warm_runner between runs, or
+    None (one client per request) in a plain pytest run.
+    """
+    warm_session = getattr(config, "warm_session", None)
+    return warm_session.client if warm_session else None
+
+
+def token_fetcher(config):
+    """
+    Return the function creating auth tokens: the warm runner's cached
+    fetch_token when running in one, else utils.prefetch.fetch_token.
+    """
+    warm_session = getattr(config, "warm_session", None)
+    return warm_session.fetch_token if warm_session else fetch_token
+
+
 @pytest.fixture
-def booking_api():
+def booking_api(request):
     """
     Fixture providing a BookingApi instance.
     
+    Args:
+        request: Pytest request object
+        
     Returns:
         BookingApi: Fresh API client instance
     """
-    return BookingApi()
+    return BookingApi(client=warm_client(request.config))
+
+
+@pytest.fixture(scope="session")
+def single_flight():
+    """
+    Fixture providing a SingleFlight shared by the whole session, so
+    identical token requests made at the same moment use one call.
+    
+    Returns:
+        SingleFlight: Session-wide coalescing layer
+    """
+    return SingleFlight(routes=("POST /auth",))
 
 
 @pytest.fixture
-def auth_api():
+def auth_api(request, single_flight):
     """
     Fixture providing an AuthApi instance.
     
+    Args:
+        request: Pytest request object
+        single_flight: Session SingleFlight fixture
+        
     Returns:
         AuthApi: Fresh API client instance
     """
-    return AuthApi()
+    return AuthApi(client=warm_client(request.config), coalescing=single_flight)
+
+
+@pytest.fixture(autouse=True)
+def prefetched_setup(request, test_deadline):
+    """
+    Fixture starting the network setup of a test's fixtures concurrently.
+    As soon as the test's deadline is set, the token and booking creation
+    needed by auth_token, created_booking and booking_with_auth are started
+    in the background; those fixtures only join the results.
+    
+    Args:
+        request: Pytest request object
+        test_deadline: Deadline fixture (so prefetched calls run under it)
+        
+    Yields:
+        dict: Futures keyed by the fixture that will consume them
+    """
+    names = set(request.fixturenames)
+    futures = {}
+    if not request.config.getoption("--no-prefetch"):
+        if names & {"auth_token", "booking_with_auth"}:
+            futures["auth_token"] = prefetch(token_fetcher(request.config),
+                                             request.getfixturevalue("auth_api"))
+        for name in ("created_booking", "booking_with_auth"):
+            if name in names:
+                futures[name] = prefetch(create_booking, request.getfixturevalue("booking_api"),
+                                         generate_booking_data())
+    yield futures
+    # Do not leave calls running into the next test
+    wait(futures.values())
 
 
 @pytest.fixture
-def auth_token(auth_api):
+def auth_token(request, auth_api, prefetched_setup):
     """
     Fixture providing a valid authentication token.
     
     Args:
+        request: Pytest request object
         auth_api: AuthApi fixture
+        prefetched_setup: Prefetch fixture
         
     Returns:
         str: Valid authentication token
     """
-    response = auth_api.create_token()
-    return response.json()["token"]
+    future = prefetched_setup.get("auth_token")
+    return future.result() if future else token_fetcher(request.config)(auth_api)
 
 
 @pytest.fixture
-def created_booking(booking_api):
+def created_booking(booking_api, prefetched_setup):
     """
     Fixture that creates a booking and returns its data.
     
     Args:
         booking_api: BookingApi fixture
+        prefetched_setup: Prefetch fixture
         
     Returns:
         dict: Contains 'id', 'data', and 'response'
     """
-    booking_data = generate_booking_data()
-    response = booking_api.create_booking(booking_data)
-    booking_id = response.json()["bookingid"]
-    
-    return {
-        "id": booking_id,
-        "data": booking_data,
-        "response": response
-    }
+    future = prefetched_setup.get("created_booking")
+    return future.result() if future else create_booking(booking_api, generate_booking_data())
 
 
 @pytest.fixture
-def booking_with_auth(booking_api, auth_token):
+def booking_with_auth(booking_api, auth_token, prefetched_setup):
     """
     Fixture that creates a booking and provides auth token.
     Useful for tests that need to modify/delete a booking.
@@ -78,18 +255,54 @@ def booking_with_auth(booking_api, auth_token):
     Args:
         booking_api: BookingApi fixture
         auth_token: Auth token fixture
+        prefetched_setup: Prefetch fixture
         
     Returns:
         dict: Contains 'id', 'data', 'token', and 'api'
     """
-    booking_data = generate_booking_data()
-    response = booking_api.create_booking(booking_data)
-    booking_id = response.json()["bookingid"]
+    future = prefetched_setup.get("booking_with_auth")
+    booking = future.result() if future else create_booking(booking_api, generate_booking_data())
     
     return {
-        "id": booking_id,
-        "data": booking_data,
+        "id": booking["id"],
+        "data": booking["data"],
         "token": auth_token,
         "api": booking_api
     }
 
+
+@pytest.fixture
+def fault_proxy(booking_api):
+    """
+    Fixture providing a fault-injecting proxy in front of the API.
+    Starts with no rules; tests add the faults they need.
+    
+    Args:
+        booking_api: BookingApi fixture (its base URL is the proxy target)
+        
+    Yields:
+        FaultProxy: Running proxy, use fault_proxy.url as base URL
+    """
+    # Imported here: the proxy pulls in http.server and httpx, which most
+    # test runs never need
+    from infra.fault_proxy import FaultProxy
+
+    proxy = FaultProxy(booking_api.base_url, seed=0)
+    proxy.start()
+    yield proxy
+    proxy.stop()
+
+
+@pytest.fixture
+def proxied_booking_api(fault_proxy):
+    """
+    Fixture providing a BookingApi that talks through the fault proxy.
+    
+    Args:
+        fault_proxy: FaultProxy fixture
+        
+    Returns:
+        BookingApi: API client routed through the proxy
+    """
+    return BookingApi(base_url=fault_proxy.url)
+
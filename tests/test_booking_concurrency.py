@@ -1,6 +1,14 @@
 import concurrent.futures
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from infra.base_api import create_pooled_client
+from infra.deadline import bind
 from logic.auth_api import AuthApi
 from logic.booking_api import BookingApi
+from tools.contention import ContentionHarness
 from utils.test_data import generate_booking_data
 
 
@@ -35,8 +43,8 @@ class TestBookingConcurrency:
         
         # Act - send two updates concurrently
         with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            future1 = executor.submit(do_update, update_data_1)
-            future2 = executor.submit(do_update, update_data_2)
+            future1 = executor.submit(bind(do_update), update_data_1)
+            future2 = executor.submit(bind(do_update), update_data_2)
             
             response1 = future1.result()
             response2 = future2.result()
@@ -58,6 +66,7 @@ class TestBookingConcurrency:
             f"Final state should be one of the updates, got {final_firstname}"
         )
 
+    @pytest.mark.deadline(60)
     def test_concurrent_delete_and_read_race(self):
         """
         T022: Concurrent delete + read (race).
@@ -84,8 +93,8 @@ class TestBookingConcurrency:
         
         # Act - send DELETE and GET concurrently
         with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            delete_future = executor.submit(do_delete)
-            get_future = executor.submit(do_get)
+            delete_future = executor.submit(bind(do_delete))
+            get_future = executor.submit(bind(do_get))
             
             delete_response = delete_future.result()
             get_response = get_future.result()
@@ -145,3 +154,105 @@ class TestBookingConcurrency:
             "Resource should be removed after cleanup"
         )
 
+    def test_barrier_synchronized_contention_is_consistent(self):
+        """
+        T021 (extended): Barrier-synchronized contention at higher fan-out.
+
+        Verifies that conflicting PUT/PATCH/DELETE/GET requests released
+        together on one booking always leave a consistent final state.
+        """
+        # Arrange
+        harness = ContentionHarness(fan_out=8, iterations=2)
+
+        # Act
+        try:
+            report = harness.run()
+        finally:
+            harness.close()
+
+        # Assert - every race ends in a state some ordering could produce
+        assert report["consistency_rate"] == 1.0, (
+            f"Inconsistent final states: {report['inconsistent']}"
+        )
+
+        # No contending request should crash the server
+        for operation, outcomes in report["outcomes"].items():
+            server_errors = {k: v for k, v in outcomes.items() if k.startswith("5")}
+            assert not server_errors, (
+                f"{operation} got server errors under contention: {server_errors}"
+            )
+
+    @pytest.mark.slo_exempt
+    def test_contention_reports_failed_setup_create(self):
+        """
+        Verifies that a harness iteration whose setup create fails is
+        reported as failed instead of crashing the run.
+        """
+        # Arrange
+        def unavailable(request):
+            if request.url.path == "/auth":
+                return httpx.Response(200, json={"token": "abc123"})
+            return httpx.Response(503, text="Service Unavailable")
+
+        transport = httpx.MockTransport(unavailable)
+        harness = ContentionHarness(
+            booking_api=BookingApi(base_url="http://booker.test", transport=transport),
+            auth_api=AuthApi(base_url="http://booker.test", transport=transport),
+            fan_out=2, iterations=1)
+
+        # Act
+        report = harness.run()
+
+        # Assert
+        assert report["consistency_rate"] == 0.0
+        assert report["inconsistent"] == [{
+            "iteration": 0,
+            "booking_id": None,
+            "reason": "setup create failed with status 503"
+        }]
+
+    def test_contention_warm_up_opens_a_connection_per_worker(self):
+        """
+        Verifies that the harness opens one pooled connection per worker
+        before the races and that later rounds reuse them.
+        """
+        # Arrange
+        peers = []
+
+        class Server(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                peers.append(self.client_address)
+                self.send_response(201)
+                self.send_header("Content-Length", "7")
+                self.end_headers()
+                self.wfile.write(b"Created")
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = create_pooled_client(4)
+        harness = ContentionHarness(
+            booking_api=BookingApi(base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                                   client=client),
+            fan_out=4)
+
+        # Act
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                harness.warm_up(executor)
+                first = set(peers)
+                harness.warm_up(executor)
+        finally:
+            client.close()
+            harness.close()
+            server.shutdown()
+            server.server_close()
+
+        # Assert
+        assert len(peers) == 8
+        assert len(first) == 4
+        assert set(peers) == first
@@ -1,5 +1,6 @@
 from logic.auth_api import AuthApi
 from logic.booking_api import BookingApi
+from utils.prefetch import prefetch
 from utils.test_data import generate_booking_data, generate_partial_booking_data
 
 
@@ -78,14 +79,15 @@ class TestBookingCRUD:
         booking_api = BookingApi()
         auth_api = AuthApi()
         
+        # Get auth token while the booking is created
+        token_future = prefetch(auth_api.create_token)
+        
         # Create initial booking
         initial_data = generate_booking_data()
         create_response = booking_api.create_booking(initial_data)
         booking_id = create_response.json()["bookingid"]
         
-        # Get auth token
-        token_response = auth_api.create_token()
-        token = token_response.json()["token"]
+        token = token_future.result().json()["token"]
         
         # Prepare updated data (all new values)
         updated_data = generate_booking_data()
@@ -118,14 +120,15 @@ class TestBookingCRUD:
         booking_api = BookingApi()
         auth_api = AuthApi()
         
+        # Get auth token while the booking is created
+        token_future = prefetch(auth_api.create_token)
+        
         # Create initial booking
         initial_data = generate_booking_data()
         create_response = booking_api.create_booking(initial_data)
         booking_id = create_response.json()["bookingid"]
         
-        # Get auth token
-        token_response = auth_api.create_token()
-        token = token_response.json()["token"]
+        token = token_future.result().json()["token"]
         
         # Prepare partial update (only firstname)
         new_firstname = "UpdatedName"
@@ -156,14 +159,15 @@ class TestBookingCRUD:
         booking_api = BookingApi()
         auth_api = AuthApi()
         
+        # Get auth token while the booking is created
+        token_future = prefetch(auth_api.create_token)
+        
         # Create booking to delete
         booking_data = generate_booking_data()
         create_response = booking_api.create_booking(booking_data)
         booking_id = create_response.json()["bookingid"]
         
-        # Get auth token
-        token_response = auth_api.create_token()
-        token = token_response.json()["token"]
+        token = token_future.result().json()["token"]
         
         # Act
         response = booking_api.delete_booking(booking_id, token)
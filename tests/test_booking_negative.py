@@ -1,3 +1,4 @@
+import pytest
 from logic.booking_api import BookingApi
 from utils.test_data import generate_booking_data
 
@@ -70,6 +71,7 @@ class TestBookingNegative:
             "Booking should still exist after failed delete"
         )
 
+    @pytest.mark.slo_exempt
     def test_create_booking_empty_required_fields(self):
         """
         T010: Create booking - empty required fields.
@@ -89,6 +91,7 @@ class TestBookingNegative:
             f"Unexpected status {response.status_code}"
         )
 
+    @pytest.mark.slo_exempt
     def test_create_booking_invalid_dates(self):
         """
         T011: Create booking - invalid dates (checkout < checkin).
@@ -111,6 +114,7 @@ class TestBookingNegative:
             f"Unexpected status {response.status_code}"
         )
 
+    @pytest.mark.slo_exempt
     def test_create_booking_very_long_strings(self):
         """
         T012: Create booking - very long strings.
@@ -1,4 +1,5 @@
 import httpx
+import pytest
 from logic.auth_api import AuthApi
 from logic.booking_api import BookingApi
 from utils.test_data import generate_booking_data
@@ -7,6 +8,7 @@ from utils.test_data import generate_booking_data
 class TestBookingSecurity:
     """Security tests for booking API (T024-T027)."""
 
+    @pytest.mark.slo_exempt
     def test_xss_injection_stored_safely(self):
         """
         T024: Special characters injection - XSS / injection check.
@@ -107,6 +109,7 @@ class TestBookingSecurity:
                 "Actual token value leaked in response"
             )
 
+    @pytest.mark.deadline(60)
     def test_mass_cleanup_bulk_delete(self):
         """
         T027: Mass cleanup - bulk delete test data.
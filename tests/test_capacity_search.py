@@ -0,0 +1,45 @@
+import pytest
+
+from tools.capacity import CapacitySearch
+from tools.workloads import parse_weights
+
+
+@pytest.mark.slo_exempt
+class TestCapacitySearch:
+    """Tests for the adaptive concurrency search."""
+
+    def test_ramp_reports_curve_and_capacity(self):
+        """
+        Verifies that the ramp measures every level and reports the best
+        passing one as maximum sustainable throughput.
+        """
+        # Arrange
+        search = CapacitySearch(parse_weights("ping"), start=1, max_concurrency=4,
+                                step_duration_s=0.5, p99_threshold_ms=10000, min_gain=-1)
+        
+        # Act
+        report = search.run()
+        
+        # Assert
+        levels = [point["concurrency"] for point in report["curve"]]
+        assert levels == [1, 2, 4], f"Unexpected ramp levels {levels}"
+        assert report["knee"] is None, f"No knee expected, got {report['knee']}"
+        best = report["max_sustainable"]
+        assert best["throughput_rps"] == max(p["throughput_rps"] for p in report["curve"])
+
+    def test_threshold_breach_marks_knee(self):
+        """
+        Verifies that a level breaking the p99 threshold is the knee and
+        is not counted as sustainable.
+        """
+        # Arrange
+        search = CapacitySearch(parse_weights("ping"), start=1, max_concurrency=8,
+                                step_duration_s=0.3, p99_threshold_ms=0.001)
+        
+        # Act
+        report = search.run()
+        
+        # Assert
+        assert report["knee"]["concurrency"] == 1
+        assert "p99" in report["knee"]["reason"]
+        assert report["max_sustainable"] is None
@@ -0,0 +1,71 @@
+import logging
+import os
+
+import httpx
+import pytest
+
+from infra import base_api
+from logic.booking_api import BookingApi
+from tools.bench_client import (BASELINE_PATH, BENCHMARKS, CLIENT_MODES, canned_response,
+                                check_regressions, load_baseline, run_suite)
+
+BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        BASELINE_PATH)
+
+
+@pytest.mark.slo_exempt
+class TestClientOverhead:
+    """Tests for the client overhead microbenchmarks and their regression gate."""
+
+    def test_client_overhead_within_baseline(self):
+        """
+        Verifies that no API method got slower or allocates more per call
+        than the committed baseline allows. The time tolerance is wider
+        than the tool's default so that a busy test machine does not fail
+        the suite.
+        """
+        # Arrange
+        baseline = load_baseline(BASELINE)
+        
+        # Act
+        report = run_suite(iterations=300, modes=CLIENT_MODES)
+        
+        # Assert
+        assert set(report["results"]) == {f"{mode}/{name}" for mode in CLIENT_MODES
+                                          for name in BENCHMARKS}
+        regressions = check_regressions(report, baseline, tolerance=1.0)
+        assert not regressions, "\n".join(regressions)
+
+    def test_debug_dumps_are_not_built_when_disabled(self, monkeypatch):
+        """
+        Verifies that request and response bodies are only JSON-dumped for
+        the debug log when DEBUG is enabled.
+        """
+        # Arrange
+        dumps = []
+        real_dumps = base_api.json.dumps
+
+        def counting_dumps(*args, **kwargs):
+            dumps.append(args)
+            return real_dumps(*args, **kwargs)
+
+        monkeypatch.setattr(base_api.json, "dumps", counting_dumps)
+        booking_api = BookingApi(base_url="http://booker.test",
+                                 transport=httpx.MockTransport(canned_response))
+        logger = logging.getLogger("infra.base_api")
+        level = logger.level
+        
+        # Act
+        try:
+            logger.setLevel(logging.INFO)
+            response = booking_api.update_booking(1, {"firstname": "Jim"}, "abc123")
+            info_dumps = len(dumps)
+            logger.setLevel(logging.DEBUG)
+            booking_api.update_booking(1, {"firstname": "Jim"}, "abc123")
+        finally:
+            logger.setLevel(level)
+        
+        # Assert
+        assert response.status_code == 200
+        assert info_dumps == 0
+        assert len(dumps) == 2
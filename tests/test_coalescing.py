@@ -0,0 +1,107 @@
+import concurrent.futures
+import threading
+
+from infra.coalescing import SingleFlight
+from logic.auth_api import AuthApi
+from logic.booking_api import BookingApi
+from utils.test_data import generate_booking_data
+
+SLOW_RESPONSES = {"fault": "latency", "distribution": "fixed", "ms": 300}
+
+
+def send_together(function, count):
+    """Call function from count threads released at the same moment."""
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        return function()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(call) for _ in range(count)]
+        return [future.result() for future in futures]
+
+
+class TestCoalescing:
+    """Tests for singleflight coalescing of identical requests."""
+
+    def test_concurrent_reads_share_one_call(self, proxied_booking_api, fault_proxy):
+        """
+        Verifies that identical concurrent GETs reach the server once and
+        every caller gets the booking.
+        """
+        # Arrange
+        booking_data = generate_booking_data()
+        booking_id = proxied_booking_api.create_booking(booking_data).json()["bookingid"]
+        single_flight = SingleFlight()
+        booking_api = BookingApi(base_url=fault_proxy.url, coalescing=single_flight)
+        fault_proxy.add_rule(SLOW_RESPONSES)
+        forwarded_before = fault_proxy.forwarded
+        
+        # Act
+        responses = send_together(lambda: booking_api.get_booking(booking_id), 8)
+        
+        # Assert
+        assert all(response.json()["firstname"] == booking_data["firstname"]
+                   for response in responses)
+        assert fault_proxy.forwarded - forwarded_before == 1
+        stats = single_flight.stats()
+        assert (stats["calls"], stats["coalesced"]) == (1, 7)
+        assert stats["saved_by_route"] == {"GET /booking/{id}": 7}
+
+    def test_concurrent_auth_shares_token(self, fault_proxy):
+        """
+        Verifies that concurrent POST /auth calls with the same credentials
+        are merged, and that different credentials are not.
+        """
+        # Arrange
+        single_flight = SingleFlight()
+        auth_api = AuthApi(base_url=fault_proxy.url, coalescing=single_flight)
+        fault_proxy.add_rule(SLOW_RESPONSES)
+        
+        # Act
+        responses = send_together(auth_api.create_token, 4)
+        other = auth_api.create_token(username="someone", password="else")
+        
+        # Assert
+        assert len({response.json()["token"] for response in responses}) == 1
+        assert other.json() != responses[0].json()
+        assert single_flight.stats()["calls"] == 2
+        assert single_flight.stats()["coalesced"] == 3
+
+    def test_only_identical_idempotent_requests_share_a_key(self):
+        """
+        Verifies which requests may be merged.
+        """
+        # Arrange
+        single_flight = SingleFlight()
+        url = "http://localhost/booking/1"
+        
+        # Act
+        plain = single_flight.request_key("GET /booking/{id}", url)
+        same = single_flight.request_key("GET /booking/{id}", url, headers={})
+        other_token = single_flight.request_key("GET /booking/{id}", url,
+                                                headers={"Cookie": "token=abc"})
+        write = single_flight.request_key("POST /booking", "http://localhost/booking",
+                                          payload={"firstname": "Jim"})
+        
+        # Assert
+        assert plain == same
+        assert plain != other_token
+        assert write is None
+
+    def test_sequential_requests_are_not_cached(self, booking_api, created_booking):
+        """
+        Verifies that only in-flight requests are merged.
+        """
+        # Arrange
+        single_flight = SingleFlight()
+        coalescing_api = BookingApi(base_url=booking_api.base_url, coalescing=single_flight)
+        
+        # Act
+        coalescing_api.get_booking(created_booking["id"])
+        coalescing_api.get_booking(created_booking["id"])
+        
+        # Assert
+        assert single_flight.stats()["calls"] == 2
+        assert single_flight.stats()["coalesced"] == 0
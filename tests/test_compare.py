@@ -0,0 +1,77 @@
+import random
+
+from infra.stats import bootstrap_ratio_ci, mann_whitney_u
+from tools.compare import Comparison, format_report
+from tools.workloads import build_apis
+
+# Every request through the proxy takes 30ms longer
+SLOW_TARGET = {"fault": "latency", "distribution": "fixed", "ms": 30}
+
+
+class TestCompare:
+    """Tests for the A/B latency comparison."""
+
+    def test_mann_whitney_u_matches_reference_values(self):
+        """
+        Verifies the U statistic and p-value against a hand-computed
+        example, and that identical samples are not significant.
+        """
+        # Arrange
+        sample_a = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        sample_b = [6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        
+        # Act
+        u, p_value = mann_whitney_u(sample_a, sample_b)
+        _, same_p_value = mann_whitney_u(sample_a, list(sample_a))
+        
+        # Assert
+        assert u == 12.5
+        assert 0.004 < p_value < 0.006
+        assert same_p_value == 1.0
+        assert mann_whitney_u([], sample_b) == (None, None)
+
+    def test_bootstrap_interval_contains_true_ratio(self):
+        """
+        Verifies that the speedup interval brackets the true ratio of
+        medians of two shifted samples.
+        """
+        # Arrange
+        rng = random.Random(7)
+        sample_a = [rng.lognormvariate(4.6, 0.3) for _ in range(300)]
+        sample_b = [value / 1.5 for value in sample_a]
+        rng.shuffle(sample_b)
+        
+        # Act
+        ratio, low, high = bootstrap_ratio_ci(sample_a, sample_b)
+        
+        # Assert
+        assert abs(ratio - 1.5) < 1e-9
+        assert low <= 1.5 <= high
+        assert high - low < 0.3
+
+    def test_detects_slower_target(self, booking_api, fault_proxy):
+        """
+        Verifies that a target with 30ms of added latency is reported as
+        significantly slower, with both targets seeing the same workload.
+        """
+        # Arrange
+        fault_proxy.add_rule(SLOW_TARGET)
+        *apis_a, client_a = build_apis(booking_api.base_url, 2)
+        *apis_b, client_b = build_apis(fault_proxy.url, 2)
+        comparison = Comparison(tuple(apis_a), tuple(apis_b),
+                                {"get_booking": 1, "ping": 1}, concurrency=2, seed=1)
+        
+        # Act
+        try:
+            report = comparison.run(rounds=60)
+        finally:
+            client_a.close()
+            client_b.close()
+        
+        # Assert
+        assert report["rounds"] == 60
+        for operation, result in report["operations"].items():
+            assert result["a"]["count"] == result["b"]["count"], result["statuses"]
+            assert result["verdict"] == "B slower", f"{operation}: {result}"
+            assert result["speedup_ci"][1] < 1
+        assert "B slower" in format_report(report)
@@ -0,0 +1,88 @@
+import concurrent.futures
+import time
+
+import pytest
+
+from infra.deadline import DeadlineExceeded, bind, current_deadline, deadline, step
+from utils.test_data import generate_booking_data
+
+
+class TestDeadlines:
+    """Tests for deadline propagation and per-endpoint timeouts."""
+
+    def test_later_steps_get_remaining_budget(self, proxied_booking_api, fault_proxy):
+        """
+        Verifies that a stalled call inside a deadline fails with
+        DeadlineExceeded naming the step, once the budget is used up.
+        """
+        # Arrange
+        fault_proxy.add_rule({"fault": "latency", "distribution": "fixed", "ms": 3000,
+                              "methods": ["GET"], "path": r"^/booking/\d+"})
+        
+        # Act
+        with pytest.raises(DeadlineExceeded) as error:
+            with deadline(1.0, name="create and read"):
+                booking_id = proxied_booking_api.create_booking(
+                    generate_booking_data()).json()["bookingid"]
+                with step("read back"):
+                    proxied_booking_api.get_booking(booking_id)
+        
+        # Assert
+        assert error.value.step == f"read back (GET /booking/{booking_id})"
+        assert "create and read" in str(error.value)
+
+    def test_dripped_response_cannot_outlast_deadline(self, proxied_booking_api, fault_proxy,
+                                                      created_booking):
+        """
+        Verifies that the deadline bounds the whole request: a response
+        whose body trickles in, each read well within the timeout, still
+        fails with DeadlineExceeded once the budget is used up.
+        """
+        # Arrange
+        fault_proxy.add_rule({"fault": "bandwidth", "bytes_per_s": 100,
+                              "methods": ["GET"], "path": r"^/booking/\d+"})
+        
+        # Act
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded) as error:
+            with deadline(0.5, name="read back"):
+                proxied_booking_api.get_booking(created_booking["id"])
+        elapsed_s = time.monotonic() - start
+        
+        # Assert
+        assert error.value.step == f"GET /booking/{created_booking['id']}"
+        assert 0.5 < elapsed_s < 0.75
+
+    def test_expired_deadline_sends_nothing(self, proxied_booking_api, fault_proxy):
+        """
+        Verifies that no request is sent once the budget is exhausted.
+        """
+        with pytest.raises(DeadlineExceeded):
+            with deadline(0):
+                proxied_booking_api.get_all_bookings()
+        assert fault_proxy.forwarded == 0
+
+    def test_nested_deadline_cannot_extend_outer(self):
+        """
+        Verifies that the tighter of two nested deadlines wins.
+        """
+        with deadline(1, name="outer"):
+            with deadline(60, name="inner") as active:
+                assert active.name == "outer"
+                assert active.remaining() <= 1
+
+    @pytest.mark.deadline(30)
+    def test_marker_budget_reaches_worker_threads(self, test_deadline):
+        """
+        Verifies that the deadline marker applies to the test and that
+        bind() carries it into executor threads.
+        """
+        # Act
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            bound = executor.submit(bind(current_deadline)).result()
+            unbound = executor.submit(current_deadline).result()
+        
+        # Assert
+        assert test_deadline.budget_s == 30
+        assert bound is test_deadline, "bind() should propagate the deadline"
+        assert unbound is None, "Plain executor threads do not inherit context"
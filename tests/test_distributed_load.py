@@ -0,0 +1,88 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from tools.distributed import Agent, Connection, Coordinator, run_local
+from tools.workloads import parse_weights
+
+
+WORKLOAD = {
+    "weights": parse_weights("ping"),
+    "processes": 1,
+    "concurrency": 2,
+    "requests": 30,
+    "duration_s": None,
+    "base_url": None
+}
+
+
+class TestDistributedLoad:
+    """Tests for coordinator/agent distributed load runs."""
+
+    def test_local_agents_combined_report(self):
+        """
+        Verifies that several agents on localhost split the workload,
+        start together and their histograms merge into one report.
+        """
+        # Act
+        report = run_local(3, WORKLOAD)
+        
+        # Assert - every agent reported and the shares add up
+        assert len(report["agents"]) == 3, f"Expected 3 agents, got {report['agents']}"
+        assert not report["worker_errors"], f"Agents failed: {report['worker_errors']}"
+        assert report["requests"] == 30, f"Expected 30 requests, got {report['requests']}"
+        assert sum(a["requests"] for a in report["agents"].values()) == 30
+        assert report["latency_ms"]["ping"]["count"] == 30
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not available")
+    def test_agents_over_unix_socket(self):
+        """
+        Verifies that the protocol also works over a Unix domain socket.
+        """
+        # Arrange
+        path = os.path.join(tempfile.mkdtemp(), "coordinator.sock")
+        coordinator = Coordinator(f"unix:{path}", 2, WORKLOAD, start_delay_s=0.5)
+        address = coordinator.listen()
+        agents = [threading.Thread(target=Agent(address, name=f"agent-{i}").run, daemon=True)
+                  for i in range(2)]
+        for agent in agents:
+            agent.start()
+        
+        # Act
+        report = coordinator.run()
+        
+        # Assert
+        assert set(report["agents"]) == {"agent-0", "agent-1"}
+        assert report["requests"] == 30
+        assert report["errors"] == 0, f"Unexpected errors: {report['statuses']}"
+
+    def test_agent_rejects_start_without_workload(self):
+        """
+        Verifies that an agent told to start before it got a workload
+        reports an error instead of crashing.
+        """
+        # Arrange
+        server = socket.create_server(("127.0.0.1", 0))
+        agent = Agent(f"127.0.0.1:{server.getsockname()[1]}", name="early")
+        reports = []
+        thread = threading.Thread(target=lambda: reports.append(agent.run()), daemon=True)
+        thread.start()
+        connection = Connection(server.accept()[0])
+
+        # Act
+        hello = connection.receive()
+        connection.send({"type": "start", "start_at": time.time()})
+        reply = connection.receive()
+        thread.join(5)
+        connection.close()
+        server.close()
+
+        # Assert
+        assert hello == {"type": "hello", "agent": "early"}
+        assert reply == {"type": "result",
+                         "report": {"error": "Agent got start before a workload"}}
+        assert reports == [reply["report"]]
@@ -0,0 +1,140 @@
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from infra.fault_proxy import FaultProxy
+from logic.booking_api import BookingApi
+from tools.driver import build_report, merge_results, run_worker
+from tools.workloads import parse_weights
+
+
+class TestFaultInjection:
+    """Tests for client behaviour under injected faults."""
+
+    def test_latency_is_injected(self, proxied_booking_api, fault_proxy):
+        """
+        Verifies that an injected delay shows up in the client latency.
+        """
+        # Arrange
+        fault_proxy.add_rule({"fault": "latency", "distribution": "fixed", "ms": 300})
+        
+        # Act
+        start = time.perf_counter()
+        response = proxied_booking_api.get_all_bookings()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        # Assert
+        assert response.status_code == 200
+        assert elapsed_ms >= 300, f"Expected at least 300ms, got {elapsed_ms:.0f}ms"
+
+    def test_client_timeout_under_slow_responses(self, fault_proxy):
+        """
+        Verifies that the endpoint timeout fires when responses are slower.
+        """
+        # Arrange
+        fault_proxy.add_rule({"fault": "latency", "distribution": "fixed", "ms": 500})
+        booking_api = BookingApi(base_url=fault_proxy.url, timeouts={"GET /booking": 0.2})
+        
+        # Act / Assert
+        with pytest.raises(httpx.ReadTimeout):
+            booking_api.get_all_bookings()
+
+    def test_error_burst_then_recovery(self, proxied_booking_api, fault_proxy):
+        """
+        Verifies that a 503 burst is returned while active and that traffic
+        recovers once the rule is removed.
+        """
+        # Arrange
+        rule = fault_proxy.add_rule({"fault": "status", "status": 503, "retry_after_s": 1})
+        
+        # Act
+        during = proxied_booking_api.get_all_bookings()
+        fault_proxy.remove_rule(rule)
+        after = proxied_booking_api.get_all_bookings()
+        
+        # Assert
+        assert during.status_code == 503
+        assert during.headers["Retry-After"] == "1"
+        assert after.status_code == 200, "Requests should pass once the burst is over"
+
+    @pytest.mark.parametrize("fault", ["reset", "truncate"])
+    def test_broken_connections_raise_request_errors(self, proxied_booking_api, fault_proxy, fault):
+        """
+        Verifies that resets and truncated bodies surface as httpx request
+        errors rather than as partial responses.
+        """
+        # Arrange
+        fault_proxy.add_rule({"fault": fault, "methods": ["GET"]})
+        
+        # Act / Assert
+        with pytest.raises(httpx.RequestError):
+            proxied_booking_api.get_all_bookings()
+        assert fault_proxy.injected[fault] == 1
+
+    def test_throughput_under_partial_failure(self, fault_proxy):
+        """
+        Verifies that a load run through the proxy measures the injected
+        error rate (20% of requests answered with 503).
+        """
+        # Arrange
+        fault_proxy.add_rule({"fault": "status", "status": 503, "probability": 0.2})
+        config = {"weights": parse_weights("get_all_bookings"), "concurrency": 4,
+                  "requests": 200, "base_url": fault_proxy.url}
+        
+        # Act
+        result = run_worker(config, threading.Event())
+        report = build_report(merge_results([result]), result["elapsed_s"])
+        
+        # Assert
+        assert report["requests"] == 200
+        assert 0.1 < report["error_rate"] < 0.3, f"Unexpected error rate {report['error_rate']:.2f}"
+        assert report["statuses"]["get_all_bookings"]["503"] == fault_proxy.injected["status"]
+
+    def test_proxy_without_rules_adds_little_latency(self):
+        """
+        Verifies that a proxy without rules forwards keep-alive requests
+        without a Nagle/delayed ACK stall (about 40ms per request).
+        """
+        # Arrange
+        class Upstream(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, format, *args):
+                pass
+
+        upstream = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+        upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}"
+
+        def median_ms(client, url):
+            client.get(url)  # open the connection
+            latencies = []
+            for _ in range(30):
+                start = time.perf_counter()
+                client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+            return statistics.median(latencies)
+
+        # Act
+        try:
+            with FaultProxy(upstream_url) as proxy, httpx.Client() as client:
+                direct_ms = median_ms(client, f"{upstream_url}/ping")
+                proxied_ms = median_ms(client, f"{proxy.url}/ping")
+        finally:
+            upstream.shutdown()
+            upstream.server_close()
+
+        # Assert
+        assert proxied_ms - direct_ms < 10, (
+            f"Proxy added {proxied_ms - direct_ms:.1f}ms (direct {direct_ms:.1f}ms)")
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from tools.fuzz import Fuzzer, generate_case, load_seeds, save_findings, shrink
+
+
+@pytest.mark.slo_exempt
+class TestFuzz:
+    """Tests for the booking payload fuzzer."""
+
+    def test_case_is_reproducible_from_seed(self):
+        """
+        Verifies that a case seed always generates the same payload.
+        """
+        # Act
+        first = generate_case("42-7")
+        second = generate_case("42-7")
+        other = generate_case("42-8")
+        
+        # Assert
+        assert first == second
+        assert first["payload"] != other["payload"]
+        assert first["mutations"], "Expected at least one mutation"
+
+    def test_shrink_finds_minimal_reproducer(self):
+        """
+        Verifies that shrinking drops everything the failure does not need.
+        """
+        # Arrange
+        payload = {"firstname": "Jim", "totalprice": 10 ** 12,
+                   "bookingdates": {"checkin": "2024-02-30", "checkout": "2024-03-01"}}
+        
+        def still_fails(candidate):
+            dates = candidate.get("bookingdates")
+            return isinstance(dates, dict) and dates.get("checkin", "").endswith("-30")
+        
+        # Act
+        minimal, attempts = shrink(payload, still_fails)
+        
+        # Assert
+        assert minimal == {"bookingdates": {"checkin": "-30"}}
+        assert attempts < 200
+
+    def test_live_run_classifies_and_persists(self, booking_api, auth_api, tmp_path):
+        """
+        Verifies that every case gets an outcome and that failures are saved
+        with seeds that can be replayed.
+        """
+        # Arrange
+        fuzzer = Fuzzer(booking_api, auth_api, seed=3, concurrency=4, max_shrink=1,
+                        shrink_attempts=20)
+        findings = tmp_path / "findings.jsonl"
+        
+        # Act
+        report = fuzzer.run(cases=60)
+        save_findings(report, findings)
+        
+        # Assert
+        assert report["cases"] == 60
+        assert sum(report["outcomes"].values()) == 60
+        assert set(report["outcomes"]) <= {"2xx", "4xx", "5xx", "timeout", "error"}
+        seeds = [case["seed"] for case in report["failures"]]
+        expected = {"create_booking": list(dict.fromkeys(seeds))} if seeds else {}
+        assert load_seeds(findings) == expected
+        if report["failures"]:
+            assert any("reproducer" in case for case in report["failures"])
+
+    def test_findings_keep_their_operation(self, tmp_path):
+        """
+        Verifies that replayed seeds are grouped by the operation they were
+        found with.
+        """
+        # Arrange
+        findings = tmp_path / "findings.jsonl"
+        create = {"run_seed": 1, "operation": "create_booking", "seed": "1-4"}
+        update = {"run_seed": 2, "operation": "update_booking", "seed": "2-9"}
+        findings.write_text("".join(json.dumps(finding) + "\n"
+                                    for finding in (create, update, create)), encoding="utf-8")
+
+        # Act
+        seeds = load_seeds(findings)
+
+        # Assert
+        assert seeds == {"create_booking": ["1-4"], "update_booking": ["2-9"]}
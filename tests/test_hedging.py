@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from infra.hedging import HedgingPolicy, format_hedging
+from logic.booking_api import BookingApi
+from utils.test_data import generate_booking_data
+
+# The first request after 0.3s of quiet takes an extra second; the hedge
+# sent right behind it is not delayed
+COLD_GET = {"fault": "cold_start", "idle_s": 0.3, "delay_ms": 1000, "methods": ["GET"]}
+
+
+class TestHedging:
+    """Tests for hedged GET requests."""
+
+    def test_hedge_answers_slow_get(self, proxied_booking_api, fault_proxy):
+        """
+        Verifies that a duplicate GET is sent when the first attempt is slow
+        and that the faster answer is returned.
+        """
+        # Arrange
+        booking_data = generate_booking_data()
+        booking_id = proxied_booking_api.create_booking(booking_data).json()["bookingid"]
+        hedging = HedgingPolicy(delay_ms=100, max_hedge_rate=1.0)
+        booking_api = BookingApi(base_url=fault_proxy.url, hedging=hedging)
+        fault_proxy.add_rule(COLD_GET)
+        time.sleep(0.4)
+        
+        # Act
+        start = time.perf_counter()
+        response = booking_api.get_booking(booking_id)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        hedging.close()
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["firstname"] == booking_data["firstname"]
+        assert elapsed_ms < 800, f"Expected the hedge to answer first, took {elapsed_ms:.0f}ms"
+        stats = hedging.stats()
+        assert (stats["requests"], stats["hedged"], stats["hedge_wins"]) == (1, 1, 1)
+        assert stats["latency_ms"]["primary"]["max"] >= 1000
+        assert "p99 reduction" in format_hedging(stats)
+
+    def test_hedge_rate_cap(self, fault_proxy):
+        """
+        Verifies that no hedge is sent once the hedge-rate cap is used up.
+        """
+        # Arrange
+        hedging = HedgingPolicy(delay_ms=100, max_hedge_rate=0.0)
+        booking_api = BookingApi(base_url=fault_proxy.url, hedging=hedging)
+        fault_proxy.add_rule(COLD_GET)
+        time.sleep(0.4)
+        
+        # Act
+        start = time.perf_counter()
+        response = booking_api.get_all_bookings()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        hedging.close()
+        
+        # Assert
+        assert response.status_code == 200
+        assert elapsed_ms >= 1000
+        assert hedging.stats()["hedged"] == 0
+        assert fault_proxy.forwarded == 1
+
+    def test_percentile_delay_and_unhedged_writes(self, booking_api):
+        """
+        Verifies that the percentile delay needs enough samples and that
+        non-idempotent requests bypass hedging.
+        """
+        # Arrange
+        hedging = HedgingPolicy(percentile=90, min_samples=5, max_hedge_rate=1.0)
+        hedged_api = BookingApi(base_url=booking_api.base_url, hedging=hedging)
+        booking_id = hedged_api.create_booking(generate_booking_data()).json()["bookingid"]
+        
+        # Act
+        delay_before = hedging.hedge_delay_ms("GET /booking/{id}")
+        for _ in range(5):
+            hedged_api.get_booking(booking_id)
+        hedging.close()
+        
+        # Assert
+        assert delay_before is None
+        assert hedging.hedge_delay_ms("GET /booking/{id}") > 0
+        assert hedging.stats()["requests"] == 5
+
+    def test_unhedgeable_requests_run_on_caller_thread(self):
+        """
+        Verifies that the first attempt only goes through the worker pool
+        when a hedge could follow it, and is sent on the caller's thread
+        when the hedge cap is used up or every worker is busy.
+        """
+        # Arrange
+        hedging = HedgingPolicy(delay_ms=50, max_hedge_rate=1.0, max_workers=1)
+        capped = HedgingPolicy(delay_ms=50, max_hedge_rate=0.0)
+        threads = {}
+        release = threading.Event()
+
+        def send(name):
+            threads[name] = threading.current_thread().name
+            if name == "blocker":
+                release.wait(5)
+            return name
+
+        # Act
+        pooled = hedging.execute("GET /ping", send, "pooled")
+        direct = capped.execute("GET /ping", send, "capped")
+        blocker = threading.Thread(target=hedging.execute, args=("GET /ping", send, "blocker"))
+        blocker.start()
+        while "blocker" not in threads:
+            time.sleep(0.01)
+        saturated = hedging.execute("GET /ping", send, "saturated")
+        release.set()
+        blocker.join()
+        hedging.close()
+
+        # Assert
+        caller = threading.current_thread().name
+        assert (pooled, direct, saturated) == ("pooled", "capped", "saturated")
+        assert threads["pooled"].startswith("hedge")
+        assert threads["blocker"].startswith("hedge")
+        assert threads["capped"] == caller
+        assert threads["saturated"] == caller
+        assert hedging.stats()["requests"] == 3
+        assert capped.stats()["latency_ms"]["primary"]["count"] == 1
+
+    def test_only_get_routes_can_be_hedged(self):
+        """
+        Verifies that hedging rejects non-idempotent routes.
+        """
+        with pytest.raises(ValueError):
+            HedgingPolicy(routes=("POST /booking",))
@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+from tools.importtime import PROJECT_ROOT, check_budget, measure_imports, parse_importtime
+
+# Cold start budget for importing the API clients and data generators; about
+# 13ms on a laptop without httpx, over 150ms when httpx is imported eagerly
+IMPORT_BUDGET_MS = 50
+
+
+def run_python(code):
+    """Run code in a fresh interpreter from the project root and return its stdout."""
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+class TestImportTime:
+    """Tests for the cold start cost of the client packages."""
+
+    def test_parse_importtime_report(self):
+        """
+        Verifies that self and cumulative times are read per module.
+        """
+        # Arrange
+        report = ("import time: self [us] | cumulative | imported package\n"
+                  "import time:       120 |        120 |   json.decoder\n"
+                  "import time:       300 |        420 | json\n")
+
+        # Act
+        timings = parse_importtime(report)
+
+        # Assert
+        assert timings == {"json.decoder": (120, 120), "json": (300, 420)}
+
+    def test_client_imports_within_budget(self):
+        """
+        Verifies that importing the API clients stays within the cold start
+        budget and does not import httpx before the first request.
+        """
+        # Act
+        report = measure_imports(runs=3)
+
+        # Assert
+        violations = check_budget(report, IMPORT_BUDGET_MS, forbidden=("httpx",))
+        assert not violations, "\n".join(violations)
+
+    def test_imports_have_no_side_effects(self):
+        """
+        Verifies that importing the packages configures no logging and that
+        their public names are only loaded on first access.
+        """
+        # Act
+        output = run_python(
+            "import logging, sys, infra, logic, utils\n"
+            "before = sorted(m for m in sys.modules if m.startswith(('infra.', 'logic.', 'utils.')))\n"
+            "from logic import BookingApi\n"
+            "print(len(logging.getLogger().handlers), before, BookingApi.__module__,\n"
+            "      'logic.auth_api' in sys.modules, 'httpx' in sys.modules)"
+        )
+
+        # Assert
+        assert output == "0 [] logic.booking_api False False"
@@ -0,0 +1,64 @@
+import json
+
+from tools.injection_scan import InjectionScanner, compare, iter_corpus
+
+
+class TestInjectionScan:
+    """Tests for the corpus-driven injection scanner."""
+
+    def test_compare_classifies_round_trips(self):
+        """
+        Verifies how stored values are classified against sent ones.
+        """
+        assert compare("<b>x</b>", "<b>x</b>") == "intact"
+        assert compare("<b>x</b>", "&lt;b&gt;x&lt;/b&gt;") == "escaped"
+        assert compare("\u00c5ngstr\u00f6m", "A\u030angstro\u0308m") == "normalized"
+        assert compare("'; DROP TABLE bookings; --", "DROP TABLE bookings") == "mutated"
+        assert compare("123", 123) == "mutated"
+
+    def test_corpus_is_streamed(self, tmp_path):
+        """
+        Verifies corpus parsing: classes, JSON-escaped payloads and comments.
+        """
+        # Arrange
+        corpus = tmp_path / "corpus.txt"
+        corpus.write_text('# comment\nxss\t<svg/onload=alert(1)>\n\nunicode\t"e\\u0301"\n'
+                          'sqli\t" OR ""="\nbare payload\n', encoding="utf-8")
+        
+        # Act
+        entries = iter_corpus(corpus)
+        first = next(entries)
+        rest = list(entries)
+        
+        # Assert
+        assert first == {"line": 2, "class": "xss", "payload": "<svg/onload=alert(1)>"}
+        assert [entry["payload"] for entry in rest] == ["e\u0301", '" OR ""="', "bare payload"]
+        assert rest[-1]["class"] == "uncategorized"
+
+    def test_scan_writes_results_per_batch(self, booking_api, tmp_path):
+        """
+        Verifies that every payload/field round-trip gets an outcome and is
+        written to the output file.
+        """
+        # Arrange
+        corpus = tmp_path / "corpus.txt"
+        corpus.write_text("xss\t<script>alert(1)</script>\nsqli\t' OR '1'='1\n"
+                          "template\t{{7*7}}\n", encoding="utf-8")
+        scanner = InjectionScanner(booking_api, fields=("firstname", "additionalneeds"),
+                                   concurrency=4, batch_size=4)
+        batches = []
+        
+        # Act
+        with open(tmp_path / "results.jsonl", "w", encoding="utf-8") as output:
+            report = scanner.scan(iter_corpus(corpus), output=output,
+                                  on_batch=lambda done, _: batches.append(done))
+        
+        # Assert
+        results = [json.loads(line) for line in (tmp_path / "results.jsonl").open(encoding="utf-8")]
+        assert report["probes"] == len(results) == 6
+        assert batches == [4, 6]
+        assert {(r["class"], r["field"]) for r in results} == {
+            (c, f) for c in ("xss", "sqli", "template") for f in ("firstname", "additionalneeds")}
+        counts = report["summary"]["xss"]["firstname"]
+        assert sum(counts.values()) == 1
+        assert all(result["outcome"] != "server_error" for result in results)
@@ -0,0 +1,66 @@
+import threading
+
+import httpx
+
+from infra.metrics import MetricsServer, RequestMetrics, endpoint_template
+
+
+class TestLiveMetrics:
+    """Tests for the live request metrics."""
+
+    def test_endpoint_template_collapses_ids(self):
+        """
+        Verifies that booking IDs and query strings do not create new series.
+        """
+        assert endpoint_template("/booking/123") == "/booking/{id}"
+        assert endpoint_template("/booking?firstname=Jim") == "/booking"
+        assert endpoint_template("/ping") == "/ping"
+
+    def test_thread_accumulators_merge_on_scrape(self):
+        """
+        Verifies that counts recorded from many threads add up exactly.
+        """
+        # Arrange
+        metrics = RequestMetrics()
+
+        def worker():
+            for i in range(1000):
+                metrics.record("GET", f"/booking/{i}", "200", 5.0)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        rows = metrics.rows()
+        text = metrics.prometheus_text()
+
+        # Assert
+        assert len(rows) == 1, f"Expected one route, got {rows}"
+        assert rows[0]["requests"] == 8000
+        assert 'booker_requests_total{method="GET",endpoint="/booking/{id}",status="200"} 8000' in text
+
+    def test_live_requests_are_exposed(self, booking_api, created_booking):
+        """
+        Verifies that BaseApi requests show up on the Prometheus endpoint.
+        """
+        # Arrange
+        metrics = RequestMetrics().install()
+        server = MetricsServer(metrics, port=0)
+        url = server.start()
+
+        try:
+            # Act
+            booking_api.get_booking(created_booking["id"])
+            booking_api.get_booking(999999999)
+            text = httpx.get(url).text
+        finally:
+            server.stop()
+            metrics.uninstall()
+
+        # Assert
+        assert 'endpoint="/booking/{id}",status="200"} 1' in text, text
+        assert 'endpoint="/booking/{id}",status="404"} 1' in text, text
+        assert 'booker_request_duration_seconds_count{method="GET",endpoint="/booking/{id}"} 2' in text, text
@@ -0,0 +1,50 @@
+import random
+
+from infra.stats import LatencyHistogram
+from tools.driver import LoadDriver
+from tools.workloads import parse_weights
+
+
+class TestLoadDriver:
+    """Tests for the multi-process load driver."""
+
+    def test_histogram_merge_is_lossless(self):
+        """
+        Verifies that histograms recorded in separate shards and merged
+        give exactly the same result as one histogram over all samples.
+        """
+        # Arrange - the same samples split over three shards
+        samples = [random.lognormvariate(4, 1) for _ in range(3000)]
+        single = LatencyHistogram()
+        shards = [LatencyHistogram() for _ in range(3)]
+        for i, value in enumerate(samples):
+            single.record(value)
+            shards[i % 3].record(value)
+        
+        # Act - merge serialized shards like the parent process does
+        merged = LatencyHistogram()
+        for shard in shards:
+            merged.merge(LatencyHistogram.from_dict(shard.to_dict()))
+        
+        # Assert
+        assert merged.counts == single.counts
+        assert merged.count == len(samples)
+        for pct in (50, 90, 99):
+            assert merged.percentile(pct) == single.percentile(pct)
+
+    def test_multi_process_run_completes_all_requests(self):
+        """
+        Verifies that a sharded run performs exactly the requested number
+        of requests and merges results from every worker.
+        """
+        # Arrange
+        driver = LoadDriver(parse_weights("ping"), processes=2, concurrency=2, requests=10)
+        
+        # Act
+        report = driver.run()
+        
+        # Assert
+        assert not report["worker_errors"], f"Workers failed: {report['worker_errors']}"
+        assert report["requests"] == 10, f"Expected 10 requests, got {report['requests']}"
+        assert report["errors"] == 0, f"Unexpected errors: {report['statuses']}"
+        assert report["latency_ms"]["ping"]["count"] == 10
@@ -0,0 +1,73 @@
+import httpx
+import pytest
+
+from logic.booking_api import BookingApi
+from tools.payload_sweep import PayloadSweep, format_report, parse_size
+from utils.test_data import BookingStream
+
+
+@pytest.mark.slo_exempt
+class TestPayloadSweep:
+    """Tests for streamed request bodies and the payload-size sweep."""
+
+    def test_streamed_booking_is_created(self, booking_api):
+        """
+        Verifies that a BookingStream is uploaded as a valid booking of the
+        requested size.
+        """
+        # Arrange
+        stream = BookingStream(parse_size("256KB"), chunk_size=parse_size("16KB"))
+        
+        # Act
+        response = booking_api.create_booking(stream)
+        
+        # Assert
+        assert response.status_code == 200, f"Expected status 200, got {response.status_code}"
+        booking = response.json()["booking"]
+        assert booking["firstname"] == stream.fields["firstname"]
+        assert len(stream) == 256 * 1024
+        assert len(booking["additionalneeds"]) == stream.padding
+
+    def test_text_body_length_counts_bytes(self):
+        """
+        Verifies that a non-ASCII text body is sent with the Content-Length
+        of its UTF-8 encoding.
+        """
+        # Arrange
+        sent = []
+
+        def record(request):
+            sent.append((request.headers["Content-Length"], request.read()))
+            return httpx.Response(200, json={"bookingid": 1})
+
+        booking_api = BookingApi(base_url="http://booker.test",
+                                 transport=httpx.MockTransport(record))
+        body = '{"firstname": "Zoë", "lastname": "Müller"}'
+
+        # Act
+        booking_api.create_booking(body)
+
+        # Assert
+        assert sent == [(str(len(body.encode())), body.encode())]
+
+    def test_sweep_reports_every_size(self, booking_api, auth_api):
+        """
+        Verifies that the sweep measures each size with latency, throughput
+        and client memory.
+        """
+        # Arrange
+        sweep = PayloadSweep(booking_api, auth_api, [parse_size("64KB"), parse_size("1KB")],
+                             operation="update_booking", repeats=2)
+        
+        # Act
+        report = sweep.run()
+        
+        # Assert
+        assert [result["size"] for result in report["results"]] == ["1KB", "64KB"]
+        for result in report["results"]:
+            assert result["statuses"] == {"200": 3}, f"Unexpected statuses {result['statuses']}"
+            assert result["latency_ms"]["count"] == 2
+            assert result["throughput_mb_s"] > 0
+            assert result["client_peak_mb"] > 0
+        assert report["first_failing_size"] is None
+        assert "No size failed" in format_report(report)
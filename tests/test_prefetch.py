@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from infra.deadline import current_deadline
+from logic.auth_api import AuthApi
+from utils.prefetch import create_booking, fetch_token, prefetch
+from utils.test_data import generate_booking_data
+
+
+class TestPrefetch:
+    """Tests for concurrent token and booking setup."""
+
+    def test_setup_calls_overlap(self, proxied_booking_api, fault_proxy):
+        """
+        Verifies that prefetched setup calls take about as long as the
+        slowest one, not as long as all of them together.
+        """
+        # Arrange
+        fault_proxy.add_rule({"fault": "latency", "distribution": "fixed", "ms": 400})
+        auth_api = AuthApi(base_url=fault_proxy.url)
+
+        start = time.perf_counter()
+        fetch_token(auth_api)
+        create_booking(proxied_booking_api, generate_booking_data())
+        serial_ms = (time.perf_counter() - start) * 1000
+
+        # Act
+        start = time.perf_counter()
+        token_future = prefetch(fetch_token, auth_api)
+        booking_future = prefetch(create_booking, proxied_booking_api, generate_booking_data())
+        token = token_future.result()
+        booking = booking_future.result()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        # Assert
+        assert token
+        assert booking["id"]
+        assert elapsed_ms < 0.75 * serial_ms, (
+            f"Expected overlapping calls, got {elapsed_ms:.0f}ms vs {serial_ms:.0f}ms in series")
+
+    @pytest.mark.deadline(30)
+    def test_prefetch_carries_deadline(self, test_deadline):
+        """
+        Verifies that prefetched calls run under the caller's deadline.
+        """
+        assert prefetch(current_deadline).result() is test_deadline
+
+    def test_booking_with_auth_is_prefetched(self, booking_with_auth, prefetched_setup, pytestconfig):
+        """
+        Verifies that booking_with_auth comes from the prefetched calls and
+        that its token can modify its booking.
+        """
+        if pytestconfig.getoption("--no-prefetch"):
+            pytest.skip("prefetching disabled with --no-prefetch")
+        
+        # Arrange
+        booking_api = booking_with_auth["api"]
+
+        # Act
+        response = booking_api.delete_booking(booking_with_auth["id"], booking_with_auth["token"])
+
+        # Assert
+        assert set(prefetched_setup) == {"auth_token", "booking_with_auth"}
+        assert prefetched_setup["booking_with_auth"].result()["id"] == booking_with_auth["id"]
+        assert response.status_code == 201
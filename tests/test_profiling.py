@@ -0,0 +1,106 @@
+import os
+import threading
+
+from infra.base_api import create_pooled_client
+from infra.profiling import CATEGORIES, ClientProfiler, categorize, format_profile
+from logic.booking_api import BookingApi
+
+BASE_API = os.path.join("infra", "base_api.py")
+HTTPCORE = os.path.join("site-packages", "httpcore")
+
+
+def spin(stop):
+    """Keep a thread busy outside any request until stop is set."""
+    while not stop.is_set():
+        pass
+
+
+class TestProfiling:
+    """Tests for the client-side sampling profiler."""
+
+    def test_stacks_are_categorized(self):
+        """
+        Verifies that sampled stacks are put in the expected categories.
+        """
+        # Arrange
+        root = [(BASE_API, "send_request", 1)]
+        pool = os.path.join(HTTPCORE, "_sync", "connection_pool.py")
+        stacks = {
+            "socket_wait": root + [(pool, "handle_request", 1),
+                                   (os.path.join(HTTPCORE, "_backends", "sync.py"), "read", 1)],
+            "connection_setup": root + [(pool, "handle_request", 1),
+                                        (os.path.join(HTTPCORE, "_backends", "sync.py"),
+                                         "connect_tcp", 1),
+                                        (os.path.join("lib", "socket.py"),
+                                         "create_connection", 1)],
+            "pool_wait": root + [(pool, "handle_request", 1),
+                                 (os.path.join(HTTPCORE, "_synchronization.py"), "wait", 1)],
+            "client_setup": root + [(os.path.join("site-packages", "httpx", "_client.py"),
+                                     "__init__", 1)],
+            "json_encoding": root + [(os.path.join("lib", "json", "encoder.py"), "encode", 1)],
+            "response_parsing": root + [(os.path.join("site-packages", "h11", "_readers.py"),
+                                         "maybe_read_from_IDLE_client", 1)],
+            "client_other": root + [(os.path.join("site-packages", "httpx", "_models.py"),
+                                     "__init__", 1)]
+        }
+        
+        client_file = os.path.join("site-packages", "httpx", "_client.py")
+        shared_read = root + [(client_file, "request", 1),
+                              (os.path.join("site-packages", "httpx", "_models.py"), "close", 1),
+                              (client_file, "close", 1)]
+        
+        # Act
+        categories = {expected: categorize(stack) for expected, stack in stacks.items()}
+        
+        # Assert
+        assert categories == {expected: expected for expected in stacks}
+        assert categorize(shared_read) == "client_other"
+
+    def test_samples_only_threads_inside_requests(self, booking_api):
+        """
+        Verifies that busy threads outside BaseApi are not sampled and that
+        requests without a shared client show up as client_setup.
+        """
+        # Arrange
+        stop = threading.Event()
+        spinner = threading.Thread(target=spin, args=(stop,))
+        spinner.start()
+        # Its own client: the booking_api fixture may be pooled (warm runner)
+        unpooled_api = BookingApi(base_url=booking_api.base_url)
+        profiler = ClientProfiler(interval_ms=1)
+        
+        # Act
+        with profiler:
+            for _ in range(5):
+                unpooled_api.get_all_bookings()
+        stop.set()
+        spinner.join()
+        summary = profiler.summary()
+        
+        # Assert
+        assert summary["samples"] > 0
+        assert sum(row["samples"] for row in summary["categories"].values()) == summary["samples"]
+        assert summary["categories"]["client_setup"]["samples"] > 0
+        for line in profiler.collapsed():
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("base_api:send_request;") and int(count) > 0
+        assert all(category in format_profile(summary) for category in CATEGORIES)
+
+    def test_shared_client_has_no_client_setup(self, booking_api):
+        """
+        Verifies that a pooled client removes the per-request client setup.
+        """
+        # Arrange
+        client = create_pooled_client(4)
+        pooled_api = BookingApi(base_url=booking_api.base_url, client=client)
+        pooled_api.get_all_bookings()
+        profiler = ClientProfiler(interval_ms=1)
+        
+        # Act
+        with profiler:
+            for _ in range(20):
+                pooled_api.get_all_bookings()
+        client.close()
+        
+        # Assert
+        assert profiler.summary()["categories"]["client_setup"]["samples"] == 0
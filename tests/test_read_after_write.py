@@ -0,0 +1,35 @@
+import itertools
+
+from tools.consistency import VisibilityProbe, poll_delays
+
+
+class TestReadAfterWrite:
+    """Tests for read-after-write visibility of booking writes."""
+
+    def test_poll_schedule_backs_off(self):
+        """
+        Verifies that polling starts immediately and backs off to a cap.
+        """
+        delays = list(itertools.islice(poll_delays(1, 8), 7))
+        assert delays == [0, 1, 2, 4, 8, 8, 8]
+
+    def test_writes_become_visible(self, booking_api, auth_api):
+        """
+        Verifies that acknowledged PUT, PATCH and DELETE writes become
+        readable within the timeout, with and without concurrent writers.
+        """
+        # Arrange
+        probe = VisibilityProbe(booking_api, auth_api, writes=6,
+                                concurrency_levels=(1, 3), timeout_s=10)
+        
+        # Act
+        report = probe.run()
+        
+        # Assert
+        assert len(report["results"]) == 6, "Expected one row per concurrency level and kind"
+        for row in report["results"]:
+            assert row["write_errors"] == 0, f"Writes failed: {row}"
+            assert row["never_visible"] == 0, (
+                f"{row['kind']} never became visible at concurrency {row['concurrency']}"
+            )
+            assert row["visibility_ms"]["count"] == row["writes"]
@@ -0,0 +1,105 @@
+import json
+
+from logic.auth_api import AuthApi
+from logic.ping_api import PingApi
+from tools.replay import Replayer, iter_log, parse_line
+
+
+def write_log(path, entries):
+    """Write entries as a JSON lines access log."""
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries), encoding="utf-8")
+    return path
+
+
+class TestReplay:
+    """Tests for access log replay."""
+
+    def test_parses_json_and_combined_log_lines(self):
+        """
+        Verifies that both log formats give the same request fields.
+        """
+        # Act
+        combined = parse_line('10.0.0.1 - - [01/May/2024:12:00:00 +0000] '
+                              '"GET /booking/12?x=1 HTTP/1.1" 200 512 "-" "curl/8.0"')
+        json_line = parse_line('{"timestamp": "2024-05-01T12:00:00Z", "method": "get", '
+                               '"path": "/booking/12?x=1", "status": 200}')
+        
+        # Assert
+        assert combined == json_line == {"timestamp": 1714564800.0, "method": "GET",
+                                         "path": "/booking/12?x=1", "status": 200, "body": None}
+        assert parse_line("not a request") is None
+
+    def test_ids_are_rewritten_to_replay_bookings(self, booking_api, tmp_path):
+        """
+        Verifies that original booking IDs follow the bookings created
+        during the replay, including a 404 after a replayed delete.
+        """
+        # Arrange
+        log = write_log(tmp_path / "access.jsonl", [
+            {"timestamp": 0, "method": "POST", "path": "/booking", "status": 200},
+            {"timestamp": 1, "method": "GET", "path": "/booking/5001", "status": 200},
+            {"timestamp": 2, "method": "PATCH", "path": "/booking/5001", "status": 200,
+             "body": {"firstname": "Replayed"}},
+            {"timestamp": 3, "method": "DELETE", "path": "/booking/5001", "status": 201},
+            {"timestamp": 4, "method": "GET", "path": "/booking/5001", "status": 404},
+            {"timestamp": 5, "method": "GET", "path": "/robots.txt", "status": 404}
+        ])
+        replayer = Replayer(booking_api, AuthApi(base_url=booking_api.base_url),
+                            PingApi(base_url=booking_api.base_url), speed=0, concurrency=1)
+        
+        # Act
+        report = replayer.run(iter_log(log))
+        
+        # Assert
+        assert report["requests"] == 5
+        assert report["created_on_demand"] == 0
+        assert report["skipped"] == {"GET /robots.txt": 1}
+        for route, endpoint in report["endpoints"].items():
+            assert endpoint["status_match_rate"] == 1.0, f"{route}: {endpoint['statuses']}"
+        assert report["endpoints"]["GET /booking/{id}"]["latency_ms"]["count"] == 2
+
+    def test_ids_wait_for_replayed_posts_in_flight(self, booking_api, tmp_path):
+        """
+        Verifies that with many requests in flight an ID is mapped to the
+        replayed POST before it in the log, not to a booking created on
+        demand while that POST is still running.
+        """
+        # Arrange
+        entries = []
+        for index in range(4):
+            entries.append({"timestamp": index, "method": "POST", "path": "/booking",
+                            "status": 200})
+            entries.append({"timestamp": index, "method": "GET",
+                            "path": f"/booking/{7000 + index}", "status": 200})
+        log = write_log(tmp_path / "access.jsonl", entries)
+        replayer = Replayer(booking_api, AuthApi(base_url=booking_api.base_url),
+                            PingApi(base_url=booking_api.base_url), speed=0, concurrency=8)
+
+        # Act
+        report = replayer.run(iter_log(log))
+
+        # Assert
+        assert report["requests"] == 8
+        assert report["created_on_demand"] == 0
+        assert report["endpoints"]["GET /booking/{id}"]["status_match_rate"] == 1.0
+        assert len(set(replayer.ids.mapping.values())) == 4
+
+    def test_speed_factor_scales_timing(self, booking_api, tmp_path):
+        """
+        Verifies that inter-arrival gaps are divided by the speed factor.
+        """
+        # Arrange
+        log = write_log(tmp_path / "access.jsonl", [
+            {"timestamp": 100.0 + offset, "method": "GET", "path": "/ping"}
+            for offset in (0, 0.5, 1.0, 1.5, 2.0)
+        ])
+        replayer = Replayer(booking_api, AuthApi(base_url=booking_api.base_url),
+                            PingApi(base_url=booking_api.base_url), speed=4)
+        
+        # Act
+        report = replayer.run(iter_log(log))
+        
+        # Assert
+        assert report["log_span_s"] == 2.0
+        assert 0.5 <= report["elapsed_s"] < 1.5, f"Expected ~0.5s, took {report['elapsed_s']:.2f}s"
+        assert report["endpoints"]["GET /ping"]["requests"] == 5
@@ -0,0 +1,51 @@
+import json
+
+from utils.test_data import generate_booking_data
+
+
+class TestRequestTemplates:
+    """Tests for pre-serialized request templates."""
+
+    def test_template_patches_id_and_token(self, booking_api):
+        """
+        Verifies that a template encodes its body once and only swaps
+        the booking ID and auth cookie per request.
+        """
+        # Arrange
+        booking_data = generate_booking_data()
+        template = booking_api.booking_template("update_booking", booking_data)
+        
+        # Act
+        first_headers = template.headers_for("token-a")
+        second_headers = template.headers_for("token-b")
+        
+        # Assert
+        assert template.url(7) == f"{booking_api.base_url}/booking/7"
+        assert template.url(8) == f"{booking_api.base_url}/booking/8"
+        assert json.loads(template.content) == booking_data
+        assert first_headers["Cookie"] == "token=token-a"
+        assert second_headers["Cookie"] == "token=token-b"
+        assert "Cookie" not in template.headers_for(), "Unauthenticated headers must not carry a cookie"
+
+    def test_templated_crud_roundtrip(self, booking_api, auth_token):
+        """
+        Verifies that create, update and get work through templates.
+        """
+        # Arrange
+        create = booking_api.booking_template("create_booking", generate_booking_data())
+        updated_data = generate_booking_data()
+        update = booking_api.booking_template("update_booking", updated_data)
+        get = booking_api.booking_template("get_booking")
+        
+        # Act
+        create_response = booking_api.send_template(create)
+        booking_id = create_response.json()["bookingid"]
+        update_response = booking_api.send_template(update, booking_id, auth_token)
+        get_response = booking_api.send_template(get, booking_id)
+        
+        # Assert
+        assert create_response.status_code == 200
+        assert update_response.status_code == 200, (
+            f"Templated update failed with {update_response.status_code}"
+        )
+        assert get_response.json()["firstname"] == updated_data["firstname"]
@@ -0,0 +1,88 @@
+import csv
+import random
+
+from infra.samples import SampleStore
+from infra.stats import summarize_latencies
+
+
+class TestSampleStore:
+    """Tests for the columnar request sample store."""
+
+    def test_queries_across_spills_and_chunks(self, tmp_path):
+        """
+        Verifies that percentile, group-by, time-bucket and CSV queries see
+        every sample, whether spilled, chunked or still buffered.
+        """
+        # Arrange
+        rng = random.Random(7)
+        latencies = [rng.lognormvariate(3, 0.5) for _ in range(10000)]
+        store = SampleStore(str(tmp_path / "samples"), buffer_size=1000, chunk_size=3000)
+        for i, latency in enumerate(latencies):
+            endpoint = "GET /booking/{id}" if i % 4 else "POST /booking"
+            status = "500" if i % 100 == 0 else "200"
+            store.append(1000.0 + i * 0.01, endpoint, status, latency, 100)
+        store.append(1200.0, "POST /auth", "ConnectError", 1.0)
+        
+        # Act
+        percentiles = store.percentiles(endpoint="GET /booking/{id}")
+        groups = store.group_by_endpoint()
+        buckets = store.time_buckets(width_s=10)
+        rows = store.to_csv(str(tmp_path / "samples.csv"))
+        store.close()
+        
+        # Assert
+        exact = summarize_latencies(latency for i, latency in enumerate(latencies) if i % 4)
+        assert abs(percentiles["p99"] - exact["p99"]) / exact["p99"] < 0.02, (
+            f"p99 {percentiles['p99']} too far from exact {exact['p99']}"
+        )
+        assert groups["GET /booking/{id}"]["count"] == 7500
+        assert groups["POST /booking"]["errors"] == 100
+        assert groups["POST /booking"]["bytes"] == 250000
+        assert groups["POST /auth"]["statuses"] == {"ConnectError": 1}
+        assert [bucket["count"] for bucket in buckets] == [1000] * 10 + [1]
+        assert rows == 10001
+        with open(tmp_path / "samples.csv") as f:
+            assert sum(1 for _ in csv.reader(f)) == 10002, "Expected header plus one row per sample"
+
+    def test_records_live_requests(self, tmp_path, booking_api, created_booking):
+        """
+        Verifies that an installed store records BaseApi requests and can
+        be reopened for analysis.
+        """
+        # Arrange
+        directory = str(tmp_path / "samples")
+        store = SampleStore(directory).install()
+        
+        # Act
+        booking_api.get_booking(created_booking["id"])
+        booking_api.get_booking(created_booking["id"])
+        store.close()
+        groups = SampleStore(directory).group_by_endpoint()
+        
+        # Assert
+        assert groups["GET /booking/{id}"]["count"] == 2
+        assert groups["GET /booking/{id}"]["bytes"] > 0
+
+    def test_opening_for_analysis_writes_nothing(self, tmp_path):
+        """
+        Verifies that a store opened only to be read creates no files and
+        can be closed.
+        """
+        # Arrange
+        missing = tmp_path / "missing"
+        directory = tmp_path / "samples"
+        with SampleStore(str(directory)) as store:
+            store.append(1.0, "GET /ping", "201", 5.0)
+        column_sizes = {path.name: path.stat().st_size for path in directory.iterdir()}
+        
+        # Act
+        empty = SampleStore(str(missing))
+        empty.close()
+        reader = SampleStore(str(directory))
+        groups = reader.group_by_endpoint()
+        reader.close()
+        
+        # Assert
+        assert not missing.exists()
+        assert groups["GET /ping"]["count"] == 1
+        assert {path.name: path.stat().st_size for path in directory.iterdir()} == column_sizes
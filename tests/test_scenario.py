@@ -0,0 +1,94 @@
+import os
+import time
+
+import pytest
+
+from tools.scenario import ScenarioRunner, load_scenario, parse_scenario
+
+SCENARIOS_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "scenarios")
+
+
+class TestScenario:
+    """Tests for declarative weighted workload scenarios."""
+
+    def test_ramp_stages_interpolate_users(self):
+        """
+        Verifies that users ramp linearly within each stage.
+        """
+        # Arrange
+        scenario = parse_scenario({
+            "stages": [{"duration": 10, "users": 10}, {"duration": 10, "users": 0}],
+            "operations": {"get_booking": {"weight": 1}}
+        })
+        
+        # Assert
+        assert scenario.duration_s == 20
+        assert scenario.max_users == 10
+        assert scenario.users_at(0) == 0
+        assert scenario.users_at(5) == 5
+        assert scenario.users_at(15) == 5
+        assert scenario.users_at(25) == 0
+
+    def test_unknown_operation_is_rejected(self):
+        """
+        Verifies that a typo in an operation name fails fast.
+        """
+        with pytest.raises(ValueError, match="Unknown operation"):
+            parse_scenario({"users": 1, "duration": 1,
+                            "operations": {"get_bookings": {"weight": 1}}})
+
+    def test_example_scenarios_are_valid(self):
+        """
+        Verifies that the shipped scenario files parse.
+        """
+        for name in ("crud_mix.yaml", "smoke.json"):
+            scenario = load_scenario(os.path.join(SCENARIOS_DIR, name))
+            assert scenario.operations, f"{name} defines no operations"
+
+    def test_smoke_scenario_meets_slos(self):
+        """
+        Verifies that the smoke scenario runs its weighted mix and
+        periodic token refresh within its SLOs.
+        """
+        # Arrange
+        scenario = load_scenario(os.path.join(SCENARIOS_DIR, "smoke.json"))
+        
+        # Act
+        report = ScenarioRunner(scenario).run()
+        
+        # Assert
+        assert report["requests"] > 0, "Scenario should execute operations"
+        assert "create_token" in report["statuses"], "Periodic create_token should run"
+        failed = [result for result in report["slo"] if result["passed"] is False]
+        assert not failed, f"SLOs violated: {failed}"
+
+    def test_ramped_down_users_are_joined(self):
+        """
+        Verifies that users stopped by a ramp down have finished before the
+        report is built, even when the scenario ends with no users.
+        """
+        # Arrange
+        scenario = parse_scenario({
+            "stages": [{"duration": 1, "users": 2}, {"duration": 1, "users": 0}],
+            "operations": {"ping": {"weight": 1}}
+        })
+        runner = ScenarioRunner(scenario, control_interval_s=0.1)
+        started = []
+        finished = []
+        user_loop = runner._user_loop
+
+        def slow_user_loop(apis, stats, stop_event):
+            started.append(stop_event)
+            user_loop(apis, stats, stop_event)
+            time.sleep(0.3)  # a request still in flight when the user is stopped
+            finished.append(stop_event)
+
+        runner._user_loop = slow_user_loop
+        
+        # Act
+        report = runner.run()
+        
+        # Assert
+        assert started, "Scenario should start users"
+        assert len(finished) == len(started)
+        assert report["requests"] > 0
@@ -0,0 +1,92 @@
+import json
+
+from infra.slo import SessionLatencies, evaluate, format_slo_report, load_slo_config
+
+SLO_CONFIG = {
+    "min_samples": 3,
+    "default": {"p95_ms": 500, "max_failure_rate": 0.2},
+    "endpoints": {"GET /booking/{id}": {"p50_ms": 100}}
+}
+
+
+class TestSlo:
+    """Tests for passive per-endpoint SLO aggregation."""
+
+    def test_requests_are_grouped_by_endpoint_and_checked(self, tmp_path):
+        """
+        Verifies that booking IDs are templated out, that 5xx and failed
+        requests count against the failure rate, and that every objective
+        is checked.
+        """
+        # Arrange
+        config_path = tmp_path / "slo.json"
+        config_path.write_text(json.dumps(SLO_CONFIG))
+        latencies = SessionLatencies()
+        for booking_id, latency_ms in ((1, 50), (2, 150), (3, 200), (4, 250)):
+            latencies.record("GET", f"/booking/{booking_id}", "200", latency_ms)
+        latencies.record("get", "/booking/5", "404", 40)
+        for status in ("200", "200", "503", "ConnectTimeout"):
+            latencies.record("POST", "/auth", status, 20)
+        latencies.record("GET", "/ping", "201", 900)
+        
+        # Act
+        summaries = latencies.summaries()
+        checks = evaluate(summaries, load_slo_config(config_path))
+        
+        # Assert
+        assert summaries["GET /booking/{id}"]["requests"] == 5
+        assert summaries["GET /booking/{id}"]["failures"] == 0
+        assert summaries["POST /auth"]["failure_rate"] == 0.5
+        assert summaries["POST /auth"]["latency_ms"]["count"] == 3
+        results = {(check["route"], check["objective"]): check["result"] for check in checks}
+        assert results == {
+            ("GET /booking/{id}", "p95_ms"): "pass",
+            ("GET /booking/{id}", "max_failure_rate"): "pass",
+            ("GET /booking/{id}", "p50_ms"): "fail",
+            ("POST /auth", "p95_ms"): "pass",
+            ("POST /auth", "max_failure_rate"): "fail",
+            ("GET /ping", "p95_ms"): "too few samples",
+            ("GET /ping", "max_failure_rate"): "too few samples"
+        }
+        assert "2 of 7 SLO objectives failed" in format_slo_report(summaries, checks)
+
+    def test_worker_data_merges_losslessly(self):
+        """
+        Verifies that collectors of several processes (xdist workers)
+        combine into the same percentiles as one collector.
+        """
+        # Arrange
+        combined = SessionLatencies()
+        workers = [SessionLatencies(), SessionLatencies()]
+        for latency_ms in range(1, 201):
+            combined.record("GET", "/booking", "200", latency_ms)
+            workers[latency_ms % 2].record("GET", "/booking", "200", latency_ms)
+        
+        # Act
+        merged = SessionLatencies()
+        for worker in workers:
+            merged.merge_dict(json.loads(json.dumps(worker.to_dict())))
+        
+        # Assert
+        assert merged.summaries() == combined.summaries()
+
+    def test_live_requests_are_recorded_unless_exempt(self, booking_api, created_booking):
+        """
+        Verifies that requests sent through BaseApi are collected without
+        extra calls, and that exempt blocks are left out.
+        """
+        # Arrange
+        latencies = SessionLatencies().install()
+        
+        # Act
+        try:
+            booking_api.get_booking(created_booking["id"])
+            with latencies.exempt():
+                booking_api.get_booking(created_booking["id"])
+        finally:
+            latencies.uninstall()
+        
+        # Assert
+        summaries = latencies.summaries()
+        assert list(summaries) == ["GET /booking/{id}"]
+        assert summaries["GET /booking/{id}"]["latency_ms"]["count"] == 1
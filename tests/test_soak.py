@@ -0,0 +1,40 @@
+from tools.soak import SoakRunner, detect_monotonic_growth
+
+
+class TestSoak:
+    """Tests for the soak/endurance mode."""
+
+    def test_monotonic_growth_detection(self):
+        """
+        Verifies that only a steadily growing tail raises a growth alert.
+        """
+        # Assert - strictly growing tail above threshold is detected
+        assert detect_monotonic_growth([10, 12, 15, 20], window=3, min_growth=5)
+        
+        # A dip inside the window is not monotonic growth
+        assert not detect_monotonic_growth([10, 20, 15, 30], window=3, min_growth=5)
+        
+        # Growth below the threshold is ignored
+        assert not detect_monotonic_growth([10, 11, 12], window=3, min_growth=5)
+        
+        # Too few samples (missing values are skipped)
+        assert not detect_monotonic_growth([None, 10, 20], window=3, min_growth=5)
+
+    def test_short_soak_collects_samples(self):
+        """
+        Verifies that a short soak run loops the workload and
+        records a resource time series.
+        """
+        # Arrange
+        runner = SoakRunner(duration_s=3, sample_interval_s=1)
+        
+        # Act
+        report = runner.run()
+        
+        # Assert
+        assert report["iterations"] > 0, "Workload should run at least once"
+        assert report["errors"] == 0, f"Workload failed: {report['last_error']}"
+        assert len(report["samples"]) >= 2, (
+            f"Expected a time series, got {len(report['samples'])} samples"
+        )
+        assert report["samples"][-1]["rss_kb"], "RSS should be sampled"
@@ -0,0 +1,94 @@
+import io
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from tools.warm_runner import PROJECT_ROOT, TokenCache, run_tests, send_command
+
+PING_TEST = "tests/test_ping.py::TestPing::test_health_check_returns_success_status"
+
+
+def timed_run(args, socket_path):
+    """Run pytest arguments in the warm runner; return (exit code, output, seconds)."""
+    out = io.BytesIO()
+    start = time.perf_counter()
+    code = run_tests(args, socket_path, out)
+    return code, out.getvalue().decode(), time.perf_counter() - start
+
+
+class TestWarmRunner:
+    """Tests for the warm runner daemon."""
+
+    def test_token_cache_reuses_tokens_until_expiry(self):
+        """
+        Verifies that a token is created once per key and recreated after
+        its time to live.
+        """
+        # Arrange
+        now = [0.0]
+        cache = TokenCache(ttl_s=60, clock=lambda: now[0])
+        created = []
+
+        def create():
+            created.append(len(created))
+            return f"token{len(created)}"
+        
+        # Act
+        first = cache.get("http://a", create)
+        now[0] = 59
+        reused = cache.get("http://a", create)
+        other = cache.get("http://b", create)
+        now[0] = 120
+        renewed = cache.get("http://a", create)
+        
+        # Assert
+        assert (first, reused, other, renewed) == ("token1", "token1", "token2", "token3")
+        assert (cache.hits, cache.misses) == (1, 3)
+
+    @pytest.mark.slo_exempt
+    def test_warm_rerun_is_faster_than_cold_run(self, booking_api, tmp_path):
+        """
+        Verifies that the daemon runs node IDs with pytest's exit code and
+        output, and that a warm rerun beats a cold pytest process.
+        """
+        # Arrange
+        socket_path = str(tmp_path / "warm.sock")
+        env = dict(os.environ, BOOKER_BASE_URL=booking_api.base_url,
+                   PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT,
+                                                            os.environ.get("PYTHONPATH")])))
+        daemon = subprocess.Popen(
+            [sys.executable, "-m", "tools.warm_runner", "--socket", socket_path, "serve",
+             "--workers", "1", "--preload", "tests/test_ping.py"],
+            cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        args = [PING_TEST, "-q", "-p", "no:cacheprovider"]
+        try:
+            deadline_at = time.monotonic() + 30
+            while time.monotonic() < deadline_at:
+                status = send_command("status", socket_path)
+                if status and status["workers"][0]["state"] == "idle":
+                    break
+                time.sleep(0.1)
+        
+            # Act
+            first = timed_run(args, socket_path)
+            warm = timed_run(args, socket_path)
+            deselected = timed_run(args + ["-k", "no_such_test"], socket_path)
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "pytest", *args], cwd=PROJECT_ROOT, env=env,
+                           capture_output=True, check=True)
+            cold_s = time.perf_counter() - start
+            status = send_command("status", socket_path)
+        finally:
+            send_command("stop", socket_path)
+            daemon.wait(timeout=10)
+        
+        # Assert
+        assert first[0] == warm[0] == 0
+        assert "1 passed" in warm[1]
+        assert deselected[0] == pytest.ExitCode.NO_TESTS_COLLECTED
+        assert warm[2] < cold_s
+        assert status["runs"] == 3
+        assert not os.path.exists(socket_path)
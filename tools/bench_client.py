@@ -0,0 +1,334 @@
+"""
+Microbenchmark suite: client overhead of every API method.
+
+Every BookingApi, AuthApi and PingApi method is sent to an in-memory
+httpx.MockTransport that answers with canned responses, so the numbers
+cover only what the client does per call: building the client (in
+per_request mode) and headers, logging, JSON encoding and decoding and
+httpx request handling. Per benchmark the suite reports:
+
+    ns_per_op       wall time per call
+    requests_per_s  calls per CPU-second, i.e. per core
+    alloc_kb        peak memory allocated during one call (tracemalloc)
+    relative        ns_per_op divided by the time of a fixed pure-Python
+                    reference workload run right before it
+
+The regression gate compares `relative` (comparable across machines) and
+alloc_kb with a committed baseline, benchmarks/client_overhead.json.
+
+Usage:
+    python -m tools.bench_client
+    python -m tools.bench_client --mode all --check
+    python -m tools.bench_client --update-baseline
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+from logic.auth_api import AuthApi
+from logic.booking_api import BookingApi
+from logic.ping_api import PingApi
+from tools.cli import REQUEST_LOGGERS, configure_logging
+
+BASELINE_PATH = "benchmarks/client_overhead.json"
+
+BENCHMARKS = ("ping", "create_token", "get_all_bookings", "get_booking", "create_booking",
+              "update_booking", "partial_update_booking", "delete_booking")
+
+# shared: one pooled httpx.Client for all calls (the load tools);
+# per_request: BaseApi builds a client per call (the default, used by the tests)
+CLIENT_MODES = ("shared", "per_request")
+
+# A per_request call builds a default client, SSL context included, which
+# costs tens of milliseconds; iterations are divided by this per mode
+MODE_ITERATION_DIVISORS = {"per_request": 100}
+
+TOKEN = "abc123"
+
+BOOKING = {
+    "firstname": "Jim",
+    "lastname": "Brown",
+    "totalprice": 111,
+    "depositpaid": True,
+    "bookingdates": {"checkin": "2024-01-01", "checkout": "2024-01-05"},
+    "additionalneeds": "Breakfast"
+}
+
+_JSON = {"Content-Type": "application/json; charset=utf-8"}
+_TEXT = {"Content-Type": "text/plain; charset=utf-8"}
+
+# Canned response (status, headers, body bytes) per route, encoded once
+CANNED_RESPONSES = {
+    ("POST", "/auth"): (200, _JSON, json.dumps({"token": TOKEN}).encode()),
+    ("GET", "/ping"): (201, _TEXT, b"Created"),
+    ("GET", "/booking"): (200, _JSON,
+                          json.dumps([{"bookingid": i} for i in range(1, 101)]).encode()),
+    ("POST", "/booking"): (200, _JSON, json.dumps({"bookingid": 1, "booking": BOOKING}).encode()),
+    ("GET", "/booking/1"): (200, _JSON, json.dumps(BOOKING).encode()),
+    ("PUT", "/booking/1"): (200, _JSON, json.dumps(BOOKING).encode()),
+    ("PATCH", "/booking/1"): (200, _JSON, json.dumps(BOOKING).encode()),
+    ("DELETE", "/booking/1"): (201, _TEXT, b"Created")
+}
+
+
+def canned_response(request):
+    """MockTransport handler answering every route with its canned response."""
+    status, headers, body = CANNED_RESPONSES.get((request.method, request.url.path),
+                                                 (404, _TEXT, b"Not Found"))
+    return httpx.Response(status, headers=headers, content=body)
+
+
+def build_calls(booking_api, auth_api, ping_api):
+    """
+    Get one callable per benchmark.
+
+    Args:
+        booking_api: BookingApi instance
+        auth_api: AuthApi instance
+        ping_api: PingApi instance
+
+    Returns:
+        Dictionary mapping benchmark name to a callable sending one request
+    """
+    return {
+        "ping": ping_api.health_check,
+        "create_token": auth_api.create_token,
+        "get_all_bookings": booking_api.get_all_bookings,
+        "get_booking": lambda: booking_api.get_booking(1),
+        "create_booking": lambda: booking_api.create_booking(BOOKING),
+        "update_booking": lambda: booking_api.update_booking(1, BOOKING, TOKEN),
+        "partial_update_booking": lambda: booking_api.partial_update_booking(
+            1, {"firstname": "James"}, TOKEN),
+        "delete_booking": lambda: booking_api.delete_booking(1, TOKEN)
+    }
+
+
+def reference_ns(rounds=2000):
+    """
+    Time a fixed pure-Python workload (JSON round-trips of a booking).
+
+    Benchmarks divided by it give costs that can be compared between
+    machines of different speed.
+
+    Returns:
+        Nanoseconds per round
+    """
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        json.loads(json.dumps(BOOKING))
+    return (time.perf_counter_ns() - start) / rounds
+
+
+def measure(call, iterations=2000, repeat=5):
+    """
+    Measure one benchmark.
+
+    Every timed measurement is paired with a run of the reference workload
+    right before it, so a machine that speeds up or slows down during the
+    suite (frequency scaling, noisy neighbours) affects both alike.
+
+    Args:
+        call: Callable sending one request
+        iterations: Calls per timed measurement
+        repeat: Timed measurements; the median one (by relative cost) is reported
+
+    Returns:
+        Dictionary with ns_per_op, requests_per_s, alloc_kb, relative and
+        reference_ns (of the reported measurement)
+    """
+    for _ in range(min(iterations, 100)):
+        call()
+
+    runs = []
+    for _ in range(repeat):
+        reference = reference_ns()
+        cpu_start = time.process_time()
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            call()
+        ns_per_op = (time.perf_counter_ns() - start) / iterations
+        runs.append((ns_per_op / reference, ns_per_op, time.process_time() - cpu_start, reference))
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(5):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+
+    relative, ns_per_op, cpu_s, reference = sorted(runs)[len(runs) // 2]
+    return {
+        "ns_per_op": ns_per_op,
+        "requests_per_s": iterations / cpu_s if cpu_s else None,
+        "alloc_kb": sorted(peaks)[len(peaks) // 2] / 1024,
+        "relative": relative,
+        "reference_ns": reference
+    }
+
+
+def run_suite(iterations=2000, repeat=5, modes=("shared",), benchmarks=BENCHMARKS):
+    """
+    Run the benchmarks.
+
+    Per-request logging is silenced while measuring, as in the load tools.
+
+    Args:
+        iterations: Calls per timed measurement (divided by
+                    MODE_ITERATION_DIVISORS for the slow modes)
+        repeat: Timed measurements per benchmark
+        modes: Client modes from CLIENT_MODES
+        benchmarks: Benchmark names from BENCHMARKS
+
+    Returns:
+        Dictionary with python, reference_ns (fastest reference run) and
+        results ({"mode/benchmark": measure() result})
+    """
+    levels = {name: logging.getLogger(name).level for name in REQUEST_LOGGERS}
+    for name in REQUEST_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    results = {}
+    try:
+        for mode in modes:
+            mode_iterations = max(1, iterations // MODE_ITERATION_DIVISORS.get(mode, 1))
+            transport = httpx.MockTransport(canned_response)
+            if mode == "shared":
+                client = httpx.Client(transport=transport)
+                kwargs = {"client": client}
+            else:
+                client = None
+                kwargs = {"transport": transport}
+            apis = [api_class(base_url="http://booker.test", **kwargs)
+                    for api_class in (BookingApi, AuthApi, PingApi)]
+            calls = build_calls(*apis)
+            try:
+                for name in benchmarks:
+                    results[f"{mode}/{name}"] = measure(calls[name], mode_iterations, repeat)
+            finally:
+                if client is not None:
+                    client.close()
+    finally:
+        for name, level in levels.items():
+            logging.getLogger(name).setLevel(level)
+    return {
+        "python": sys.version.split()[0],
+        "reference_ns": min(result["reference_ns"] for result in results.values()),
+        "results": results
+    }
+
+
+def check_regressions(report, baseline, tolerance=0.5, alloc_tolerance=0.25):
+    """
+    Compare a run with the baseline.
+
+    Args:
+        report: Dictionary returned by run_suite
+        baseline: Baseline dictionary (a saved run_suite report)
+        tolerance: Allowed relative growth of the normalized time cost
+        alloc_tolerance: Allowed relative growth of alloc_kb (plus 1KB)
+
+    Returns:
+        List of regression messages, empty if within the baseline
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        expected = baseline["results"].get(name)
+        if expected is None:
+            continue
+        limit = expected["relative"] * (1 + tolerance)
+        if result["relative"] > limit:
+            regressions.append(f"{name}: relative cost {result['relative']:.1f} > {limit:.1f} "
+                               f"(baseline {expected['relative']:.1f})")
+        alloc_limit = expected["alloc_kb"] * (1 + alloc_tolerance) + 1
+        if result["alloc_kb"] > alloc_limit:
+            regressions.append(f"{name}: {result['alloc_kb']:.1f}KB allocated > "
+                               f"{alloc_limit:.1f}KB (baseline {expected['alloc_kb']:.1f}KB)")
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    """Load a saved baseline report."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def format_report(report, baseline=None):
+    """
+    Format a suite report, with the change against a baseline if given.
+
+    Args:
+        report: Dictionary returned by run_suite
+        baseline: Baseline dictionary (optional)
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"Client overhead on Python {report['python']}, "
+             f"reference workload {report['reference_ns']:,.0f}ns",
+             f"{'benchmark':<36}{'ns/op':>10}{'req/s/core':>12}{'alloc KB':>10}{'relative':>10}"
+             + (f"{'vs base':>9}" if baseline else "")]
+    for name, result in report["results"].items():
+        line = (f"{name:<36}{result['ns_per_op']:>10,.0f}{result['requests_per_s'] or 0:>12,.0f}"
+                f"{result['alloc_kb']:>10.1f}{result['relative']:>10.1f}")
+        expected = (baseline or {}).get("results", {}).get(name)
+        if expected:
+            line += f"{result['relative'] / expected['relative'] - 1:>+9.0%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark client overhead per API method.")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per benchmark")
+    parser.add_argument("--mode", choices=CLIENT_MODES + ("all",), default="shared",
+                        help="Shared pooled client, a client per request, or both")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with 1 if a benchmark regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed growth of the relative cost, e.g. 0.5 for +50%%")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Save this run as the new baseline")
+    parser.add_argument("--json", dest="json_path", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    modes = CLIENT_MODES if args.mode == "all" else (args.mode,)
+    report = run_suite(args.iterations, args.repeat, modes)
+    try:
+        baseline = load_baseline(args.baseline)
+    except FileNotFoundError:
+        baseline = None
+    print(format_report(report, baseline))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check and baseline is not None:
+        regressions = check_regressions(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""
+Microbenchmark: per-request client CPU of send_request vs request templates.
+
+Requests go to an in-memory httpx.MockTransport, so the numbers measure
+only client-side work (URL and header building, JSON encoding, httpx
+request handling) and are reported as requests per CPU-second, i.e. per
+core.
+
+Usage:
+    python -m tools.bench_templates
+    python -m tools.bench_templates --requests 50000 --corpus 16
+"""
+import argparse
+import itertools
+import json
+import time
+
+import httpx
+
+from logic.booking_api import BookingApi
+from tools.cli import configure_logging
+from utils.test_data import generate_booking_data
+
+TOKEN = "abc123"
+
+
+def _respond(request):
+    return httpx.Response(200, content=b'{"bookingid":1}',
+                          headers={"Content-Type": "application/json"})
+
+
+def _cpu_rate(call, requests):
+    """Run call() requests times and return requests per CPU-second."""
+    start = time.process_time()
+    for _ in range(requests):
+        call()
+    return requests / (time.process_time() - start)
+
+
+def run_benchmark(requests=20000, corpus_size=16, repeat=3):
+    """
+    Benchmark plain and templated booking updates.
+
+    Args:
+        requests: Requests per measurement
+        corpus_size: Number of distinct payloads cycled through
+        repeat: Measurements per variant; the best one is reported
+
+    Returns:
+        Dictionary mapping variant name to requests per CPU-second
+    """
+    client = httpx.Client(transport=httpx.MockTransport(_respond))
+    booking_api = BookingApi(base_url="http://booker.test", client=client)
+    corpus = [generate_booking_data() for _ in range(corpus_size)]
+    templates = [booking_api.booking_template("update_booking", data) for data in corpus]
+
+    payloads = itertools.cycle(corpus)
+    prepared = itertools.cycle(templates)
+    variants = {
+        "send_request": lambda: booking_api.update_booking(1, next(payloads), TOKEN),
+        "send_template": lambda: booking_api.send_template(next(prepared), 1, TOKEN)
+    }
+
+    results = {}
+    for name, call in variants.items():
+        call()
+        results[name] = max(_cpu_rate(call, requests) for _ in range(repeat))
+    client.close()
+    return results
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark request templates.")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per measurement")
+    parser.add_argument("--corpus", type=int, default=16, help="Distinct payloads")
+    parser.add_argument("--json", dest="json_path", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    results = run_benchmark(args.requests, args.corpus)
+    baseline = results["send_request"]
+    for name, rate in results.items():
+        print(f"{name:<15}{rate:>12,.0f} req/s per core  ({rate / baseline:.2f}x)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
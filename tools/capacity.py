@@ -0,0 +1,281 @@
+"""
+Adaptive concurrency search for maximum sustainable throughput.
+
+Runs an operation mix at increasing concurrency (geometric steps), watching
+p99 latency and error rate after every step. The search stops at the knee:
+the first step that breaks a threshold, or the point where more concurrency
+no longer buys throughput. Steps between the last good and the first bad
+level are then bisected. The report holds the maximum sustainable
+throughput and the full latency-vs-load curve; keep the JSON output to
+compare capacity between releases.
+
+Usage:
+    python -m tools.capacity --operation get_booking --p99 500 --max-error-rate 0.01
+    python -m tools.capacity --operation create_booking --start 2 --factor 1.5 --step-duration 20 \\
+        --json capacity.json
+"""
+import argparse
+import json
+import logging
+import threading
+
+from tools.cli import configure_logging
+from tools.driver import build_report, merge_results, run_worker
+from tools.workloads import parse_weights
+
+logger = logging.getLogger(__name__)
+
+
+class CapacitySearch:
+    """
+    Finds the highest concurrency that still meets the latency and error
+    thresholds.
+    """
+
+    def __init__(self, weights, start=1, max_concurrency=256, factor=2.0, step_duration_s=10.0,
+                 p99_threshold_ms=1000.0, max_error_rate=0.01, min_gain=0.05, refine_steps=3,
+                 base_url=None):
+        """
+        Args:
+            weights: Dictionary mapping operation name to weight
+            start: First concurrency level
+            max_concurrency: Highest concurrency level to try
+            factor: Growth factor between ramp steps
+            step_duration_s: Seconds each level is measured
+            p99_threshold_ms: Highest acceptable p99 latency
+            max_error_rate: Highest acceptable error rate (0.01 = 1%)
+            min_gain: Relative throughput gain a step must add over the best
+                      level so far; less means the target is saturated
+            refine_steps: Bisection steps between the last good and first
+                          bad level
+            base_url: Target base URL (default: BaseApi default)
+        """
+        if factor <= 1:
+            raise ValueError("factor must be greater than 1")
+        self.weights = weights
+        self.start = start
+        self.max_concurrency = max_concurrency
+        self.factor = factor
+        self.step_duration_s = step_duration_s
+        self.p99_threshold_ms = p99_threshold_ms
+        self.max_error_rate = max_error_rate
+        self.min_gain = min_gain
+        self.refine_steps = refine_steps
+        self.base_url = base_url
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Stop the running step and end the search."""
+        self._stop_event.set()
+
+    def measure(self, concurrency):
+        """
+        Run one load step.
+
+        Args:
+            concurrency: Number of concurrent virtual users
+
+        Returns:
+            Curve point dictionary (concurrency, throughput, error rate,
+            latency percentiles, passed and reason)
+        """
+        config = {
+            "weights": self.weights,
+            "concurrency": concurrency,
+            "duration_s": self.step_duration_s,
+            "base_url": self.base_url
+        }
+        result = run_worker(config, self._stop_event)
+        report = build_report(merge_results([result]), result["elapsed_s"])
+        latency = report["latency_ms"]["all"]
+
+        reasons = []
+        if latency.get("p99") is not None and latency["p99"] > self.p99_threshold_ms:
+            reasons.append(f"p99 {latency['p99']:.1f}ms > {self.p99_threshold_ms:g}ms")
+        if report["error_rate"] > self.max_error_rate:
+            reasons.append(f"error rate {report['error_rate']:.2%} > {self.max_error_rate:.2%}")
+        if not report["requests"]:
+            reasons.append("no requests completed")
+
+        return {
+            "concurrency": concurrency,
+            "requests": report["requests"],
+            "throughput_rps": report["throughput_rps"],
+            "error_rate": report["error_rate"],
+            "latency_ms": latency,
+            "passed": not reasons,
+            "reason": "; ".join(reasons) or None
+        }
+
+    def _levels(self):
+        level = self.start
+        while level <= self.max_concurrency:
+            yield level
+            level = max(level + 1, int(round(level * self.factor)))
+
+    def run(self, on_step=None):
+        """
+        Ramp concurrency until the knee, then bisect around it.
+
+        Args:
+            on_step: Optional callable(point) called after every step
+
+        Returns:
+            Report dictionary with thresholds, curve, knee, max_sustainable
+            and interrupted
+        """
+        curve = []
+        knee = None
+        interrupted = False
+
+        def step(concurrency):
+            point = self.measure(concurrency)
+            curve.append(point)
+            if on_step is not None:
+                on_step(point)
+            return point
+
+        try:
+            best = None
+            for concurrency in self._levels():
+                point = step(concurrency)
+                if self._stop_event.is_set():
+                    break
+                if not point["passed"]:
+                    knee = point
+                    break
+                if best is not None and point["throughput_rps"] < best["throughput_rps"] * (1 + self.min_gain):
+                    point["reason"] = (f"saturated: {point['throughput_rps']:.1f} rps is less than "
+                                       f"{self.min_gain:.0%} above {best['throughput_rps']:.1f} rps")
+                    knee = point
+                    break
+                best = point
+
+            # Bisect between the last passing level and the first failing one
+            if knee is not None and not knee["passed"]:
+                low = max((p["concurrency"] for p in curve if p["passed"]), default=0)
+                high = knee["concurrency"]
+                for _ in range(self.refine_steps):
+                    middle = (low + high) // 2
+                    if middle <= low or self._stop_event.is_set():
+                        break
+                    point = step(middle)
+                    if point["passed"]:
+                        low = middle
+                    else:
+                        high = middle
+                        knee = point
+        except KeyboardInterrupt:
+            logger.warning("Interrupted, reporting the levels measured so far")
+            self._stop_event.set()
+            interrupted = True
+        interrupted = interrupted or self._stop_event.is_set()
+
+        passing = [point for point in curve if point["passed"]]
+        best = max(passing, key=lambda point: point["throughput_rps"]) if passing else None
+        return {
+            "operations": self.weights,
+            "thresholds": {
+                "p99_ms": self.p99_threshold_ms,
+                "max_error_rate": self.max_error_rate,
+                "min_gain": self.min_gain
+            },
+            "step_duration_s": self.step_duration_s,
+            "curve": sorted(curve, key=lambda point: point["concurrency"]),
+            "knee": knee,
+            "max_sustainable": {
+                "concurrency": best["concurrency"],
+                "throughput_rps": best["throughput_rps"],
+                "p99_ms": best["latency_ms"].get("p99")
+            } if best else None,
+            "interrupted": interrupted
+        }
+
+
+def format_point(point):
+    """Format one curve point as a table row."""
+    latency = point["latency_ms"]
+
+    def ms(name):
+        value = latency.get(name)
+        return f"{value:.1f}" if value is not None else "-"
+
+    status = "ok" if point["passed"] else "FAIL"
+    return (f"{point['concurrency']:>6}{point['throughput_rps']:>11.1f}{point['error_rate'] * 100:>7.2f}%"
+            f"{ms('p50'):>9}{ms('p90'):>9}{ms('p99'):>9}  {status:<5}{point['reason'] or ''}")
+
+
+CURVE_HEADER = f"{'conc':>6}{'rps':>11}{'err%':>8}{'p50':>9}{'p90':>9}{'p99':>9}  result"
+
+
+def format_report(report):
+    """
+    Format a capacity report.
+
+    Args:
+        report: Dictionary returned by CapacitySearch.run
+
+    Returns:
+        Multi-line string
+    """
+    thresholds = report["thresholds"]
+    lines = [
+        f"Capacity search (p99 <= {thresholds['p99_ms']:g}ms, "
+        f"errors <= {thresholds['max_error_rate']:.2%})"
+        + (" - interrupted" if report["interrupted"] else ""),
+        CURVE_HEADER
+    ]
+    lines += [format_point(point) for point in report["curve"]]
+    best = report["max_sustainable"]
+    if best:
+        lines.append(f"Max sustainable throughput: {best['throughput_rps']:.1f} req/s "
+                     f"at concurrency {best['concurrency']}")
+    else:
+        lines.append("No concurrency level met the thresholds")
+    if report["knee"]:
+        lines.append(f"Knee at concurrency {report['knee']['concurrency']}: {report['knee']['reason']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Search for the maximum sustainable throughput.")
+    parser.add_argument("--operation", type=parse_weights, default=parse_weights("get_booking"),
+                        help="Operation or weighted mix, e.g. get_booking=8,create_booking=2")
+    parser.add_argument("--start", type=int, default=1, help="First concurrency level")
+    parser.add_argument("--max-concurrency", type=int, default=256, help="Highest level to try")
+    parser.add_argument("--factor", type=float, default=2.0, help="Growth between ramp steps")
+    parser.add_argument("--step-duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--p99", type=float, default=1000.0, help="p99 latency threshold in ms")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="Error rate threshold (0.01 = 1%%)")
+    parser.add_argument("--min-gain", type=float, default=0.05,
+                        help="Throughput gain per step below which the target counts as saturated")
+    parser.add_argument("--refine", type=int, default=3, help="Bisection steps around the knee")
+    parser.add_argument("--base-url", help="Target base URL")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    search = CapacitySearch(args.operation, start=args.start, max_concurrency=args.max_concurrency,
+                            factor=args.factor, step_duration_s=args.step_duration,
+                            p99_threshold_ms=args.p99, max_error_rate=args.max_error_rate,
+                            min_gain=args.min_gain, refine_steps=args.refine,
+                            base_url=args.base_url)
+    print(CURVE_HEADER)
+    report = search.run(on_step=lambda point: print(format_point(point), flush=True))
+    print()
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 0 if report["max_sustainable"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+import logging
+
+# Loggers that emit one line per request - far too noisy for load runs
+REQUEST_LOGGERS = ("infra.base_api", "httpx")
+
+
+def configure_logging(verbose=False):
+    """
+    Configure logging for a command line tool.
+
+    Per-request logging is silenced unless verbose output is requested.
+
+    Args:
+        verbose: Keep per-request INFO logging enabled
+    """
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    if not verbose:
+        for name in REQUEST_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def add_metrics_arguments(parser):
+    """
+    Add the live metrics options (--metrics-port, --dashboard) to a parser.
+
+    Args:
+        parser: argparse.ArgumentParser
+    """
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve live Prometheus metrics on this local port")
+    parser.add_argument("--dashboard", action="store_true",
+                        help="Show a refreshing per-endpoint metrics view")
+    parser.add_argument("--metrics-window", type=int, default=60,
+                        help="Rolling window of the live metrics in seconds")
+
+
+def start_metrics(args):
+    """
+    Start the live metrics requested on the command line.
+
+    Args:
+        args: Namespace parsed by a parser set up with add_metrics_arguments
+
+    Returns:
+        Callable that stops the metrics server and dashboard
+    """
+    if args.metrics_port is None and not args.dashboard:
+        return lambda: None
+
+    from infra.metrics import Dashboard, MetricsServer, RequestMetrics
+
+    metrics = RequestMetrics(window_s=args.metrics_window).install()
+    server = dashboard = None
+    if args.metrics_port is not None:
+        server = MetricsServer(metrics, port=args.metrics_port)
+        logging.getLogger(__name__).info(f"Serving live metrics at {server.start()}")
+    if args.dashboard:
+        dashboard = Dashboard(metrics).start()
+
+    def stop():
+        if dashboard is not None:
+            dashboard.stop()
+        if server is not None:
+            server.stop()
+        metrics.uninstall()
+
+    return stop
+
+
+def add_profiling_arguments(parser):
+    """
+    Add the client profiling options (--profile-client, --profile-interval) to a parser.
+
+    Args:
+        parser: argparse.ArgumentParser
+    """
+    parser.add_argument("--profile-client", metavar="PATH",
+                        help="Sample the client during requests; write collapsed stacks to PATH "
+                             "and print where request time goes")
+    parser.add_argument("--profile-interval", type=float, default=5.0,
+                        help="Profiler sampling interval in milliseconds")
+
+
+def start_profiling(args):
+    """
+    Start the client profiler requested on the command line.
+
+    Args:
+        args: Namespace parsed by a parser set up with add_profiling_arguments
+
+    Returns:
+        Callable that stops the profiler, writes the collapsed stacks and
+        prints the category table
+    """
+    if not args.profile_client:
+        return lambda: None
+
+    from infra.profiling import ClientProfiler, format_profile
+
+    profiler = ClientProfiler(interval_ms=args.profile_interval).start()
+
+    def stop():
+        profiler.stop()
+        profiler.write_collapsed(args.profile_client)
+        print(format_profile(profiler.summary()))
+        logging.getLogger(__name__).info(f"Collapsed stacks written to {args.profile_client}")
+
+    return stop
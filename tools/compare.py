@@ -0,0 +1,270 @@
+"""
+A/B latency comparison of two targets.
+
+Drives the same BookingApi workload against two base URLs (e.g. the
+current build and a new build on staging). Every round picks one
+operation and runs it on both targets back to back, in random order, so
+drift over the run (network, shared hosts, time of day) affects A and B
+alike. Per operation, the latency distributions are compared with a
+two-sided Mann-Whitney U test and the speedup (median A / median B, above
+1 means B is faster) is reported with a bootstrap confidence interval.
+
+A difference counts as significant only if p < --alpha and the interval
+excludes 1.
+
+Usage:
+    python -m tools.compare --a https://restful-booker.herokuapp.com --b https://staging.example.com
+    python -m tools.compare --a URL --b URL --operation get_booking=8,create_booking=2 \\
+        --rounds 2000 --concurrency 4 --json ab.json --fail-if-slower
+"""
+import argparse
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+from infra.metrics import is_error_status
+from infra.stats import bootstrap_ratio_ci, mann_whitney_u, summarize_latencies
+from tools.cli import add_profiling_arguments, configure_logging, start_profiling
+from tools.workloads import OperationPicker, Session, build_apis, parse_weights
+
+logger = logging.getLogger(__name__)
+
+TARGETS = ("a", "b")
+
+VERDICTS = ("B faster", "B slower", "no significant difference")
+
+
+def compare_samples(latencies_a, latencies_b, alpha=0.05, iterations=1000, confidence=0.95,
+                    rng=None):
+    """
+    Compare two latency samples of one operation.
+
+    Args:
+        latencies_a: Latencies in ms measured on target A
+        latencies_b: Latencies in ms measured on target B
+        alpha: Significance level of the Mann-Whitney U test
+        iterations: Bootstrap resamples for the speedup interval
+        confidence: Confidence level of the speedup interval
+        rng: random.Random for the bootstrap (default: fixed seed)
+
+    Returns:
+        Dictionary with the latency summaries of a and b, speedup,
+        speedup_ci, p_value and verdict
+    """
+    _, p_value = mann_whitney_u(latencies_a, latencies_b)
+    speedup, low, high = bootstrap_ratio_ci(latencies_a, latencies_b, iterations=iterations,
+                                            confidence=confidence, rng=rng)
+    verdict = VERDICTS[2]
+    if p_value is not None and low is not None and p_value < alpha:
+        if low > 1:
+            verdict = VERDICTS[0]
+        elif high < 1:
+            verdict = VERDICTS[1]
+    return {
+        "a": summarize_latencies(latencies_a),
+        "b": summarize_latencies(latencies_b),
+        "speedup": speedup,
+        "speedup_ci": [low, high],
+        "p_value": p_value,
+        "verdict": verdict
+    }
+
+
+class Comparison:
+    """
+    Runs one workload against two targets, interleaved.
+    """
+
+    def __init__(self, target_a, target_b, weights, concurrency=1, seed=None):
+        """
+        Args:
+            target_a: Tuple (booking_api, auth_api, ping_api) of target A
+            target_b: Tuple (booking_api, auth_api, ping_api) of target B
+            weights: Dictionary mapping operation name to weight
+            concurrency: Worker threads, each with its own pair of sessions
+            seed: Seed for the operation mix and the A/B order (optional)
+        """
+        self.targets = {"a": target_a, "b": target_b}
+        self.weights = weights
+        self.concurrency = concurrency
+        self.seed = seed
+        self._latencies = {}
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def _record(self, operation, target, status, latency_ms):
+        with self._lock:
+            self._statuses.setdefault(operation, {}).setdefault(target, Counter())[status] += 1
+            if latency_ms is not None and not is_error_status(status):
+                self._latencies.setdefault(operation, {}).setdefault(target, []).append(latency_ms)
+
+    def _worker(self, worker_index, rounds, stop_at, tickets, stop_event):
+        rng = random.Random(None if self.seed is None else f"{self.seed}-{worker_index}")
+        # Both sessions pick bookings with the same sequence of draws
+        session_seed = rng.random()
+        sessions = {target: Session(*apis, rng=random.Random(session_seed))
+                    for target, apis in self.targets.items()}
+        picker = OperationPicker(self.weights, rng=rng)
+        while not stop_event.is_set():
+            if rounds is not None and next(tickets) >= rounds:
+                break
+            if stop_at is not None and time.monotonic() >= stop_at:
+                break
+            operation = picker.pick()
+            for target in rng.sample(TARGETS, 2):
+                try:
+                    response, latency_ms = sessions[target].run(operation)
+                    self._record(operation, target, str(response.status_code), latency_ms)
+                except Exception as e:
+                    self._record(operation, target, type(e).__name__, None)
+
+    def run(self, rounds=None, duration_s=None, alpha=0.05, iterations=1000, confidence=0.95):
+        """
+        Run the comparison.
+
+        Args:
+            rounds: Total rounds (one request per target each), or None
+            duration_s: Run time in seconds, or None
+            alpha: Significance level
+            iterations: Bootstrap resamples
+            confidence: Confidence level of the speedup intervals
+
+        Returns:
+            Report dictionary with rounds, elapsed_s, interrupted, alpha,
+            confidence and per-operation results (compare_samples plus
+            statuses of a and b)
+        """
+        if rounds is None and duration_s is None:
+            raise ValueError("Either rounds or duration_s is required")
+        stop_event = threading.Event()
+        tickets = itertools.count()
+        start = time.monotonic()
+        stop_at = start + duration_s if duration_s else None
+        threads = [threading.Thread(target=self._worker,
+                                    args=(index, rounds, stop_at, tickets, stop_event), daemon=True)
+                   for index in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        interrupted = False
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            logger.warning("Interrupted, comparing the rounds measured so far")
+            interrupted = True
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+        elapsed_s = time.monotonic() - start
+
+        operations = {}
+        for operation in sorted(self._statuses):
+            latencies = self._latencies.get(operation, {})
+            result = compare_samples(latencies.get("a", []), latencies.get("b", []), alpha=alpha,
+                                     iterations=iterations, confidence=confidence,
+                                     rng=random.Random(operation))
+            result["statuses"] = {target: dict(self._statuses[operation].get(target, {}))
+                                  for target in TARGETS}
+            operations[operation] = result
+        return {
+            "targets": {target: apis[0].base_url for target, apis in self.targets.items()},
+            "rounds": sum(sum(self._statuses[operation].get("a", {}).values())
+                          for operation in self._statuses),
+            "elapsed_s": elapsed_s,
+            "interrupted": interrupted,
+            "alpha": alpha,
+            "confidence": confidence,
+            "operations": operations
+        }
+
+
+def format_report(report):
+    """
+    Format a comparison report as one row per operation.
+
+    Args:
+        report: Dictionary returned by Comparison.run
+
+    Returns:
+        Multi-line string
+    """
+    def ms(summary, name):
+        value = summary.get(name)
+        return f"{value:.1f}" if value is not None else "-"
+
+    lines = [f"A: {report['targets']['a']}",
+             f"B: {report['targets']['b']}",
+             f"{report['rounds']} rounds in {report['elapsed_s']:.1f}s, alpha {report['alpha']}, "
+             f"speedup = median A / median B with {report['confidence']:.0%} CI"
+             + (" - interrupted" if report["interrupted"] else ""),
+             f"{'operation':<24}{'n A/B':>11}{'A p50':>9}{'B p50':>9}{'A p99':>9}{'B p99':>9}"
+             f"{'speedup':>9}{'CI':>16}{'p':>10}  verdict"]
+    for operation, result in report["operations"].items():
+        a, b = result["a"], result["b"]
+        low, high = result["speedup_ci"]
+        speedup = f"{result['speedup']:.3f}" if result["speedup"] is not None else "-"
+        ci = f"[{low:.3f}, {high:.3f}]" if low is not None else "-"
+        p_value = f"{result['p_value']:.2g}" if result["p_value"] is not None else "-"
+        lines.append(f"{operation:<24}{a['count']:>5}/{b['count']:<5}{ms(a, 'p50'):>9}"
+                     f"{ms(b, 'p50'):>9}{ms(a, 'p99'):>9}{ms(b, 'p99'):>9}{speedup:>9}{ci:>16}"
+                     f"{p_value:>10}  {result['verdict']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Compare latency of two targets (A/B).")
+    parser.add_argument("--a", dest="target_a", required=True, help="Base URL of target A (baseline)")
+    parser.add_argument("--b", dest="target_b", required=True, help="Base URL of target B (candidate)")
+    parser.add_argument("--operation", type=parse_weights, default=parse_weights("get_booking"),
+                        help="Operation or weighted mix, e.g. get_booking=8,create_booking=2")
+    run_length = parser.add_mutually_exclusive_group()
+    run_length.add_argument("--rounds", type=int, help="Rounds to run (default: 500)")
+    run_length.add_argument("--duration", type=float, help="Run time in seconds")
+    parser.add_argument("--concurrency", type=int, default=1, help="Worker threads")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="Confidence level of the speedup intervals")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Bootstrap resamples")
+    parser.add_argument("--seed", help="Seed for the operation mix and A/B order")
+    parser.add_argument("--fail-if-slower", action="store_true",
+                        help="Exit with 1 if B is significantly slower on any operation")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    rounds = args.rounds if args.rounds is not None or args.duration else 500
+    *apis_a, client_a = build_apis(args.target_a, args.concurrency)
+    *apis_b, client_b = build_apis(args.target_b, args.concurrency)
+    comparison = Comparison(tuple(apis_a), tuple(apis_b), args.operation,
+                            concurrency=args.concurrency, seed=args.seed)
+    stop_profiling = start_profiling(args)
+    try:
+        report = comparison.run(rounds=rounds, duration_s=args.duration, alpha=args.alpha,
+                                iterations=args.bootstrap, confidence=args.confidence)
+    finally:
+        stop_profiling()
+        client_a.close()
+        client_b.close()
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    slower = [operation for operation, result in report["operations"].items()
+              if result["verdict"] == "B slower"]
+    return 1 if args.fail_if_slower and slower else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,341 @@
+"""
+Read-after-write visibility probe.
+
+Writes a booking (PUT, PATCH or DELETE) and, as soon as the write is
+acknowledged, polls GET /booking/{id} until the write is visible. Polls
+start immediately and back off exponentially, so a cache or replica lag of
+a few milliseconds is resolved as finely as one of several seconds is
+cheaply. The time-to-visibility distribution is reported per write kind
+and concurrency level, together with staleness violations: writes still
+not visible after the allowed staleness bound.
+
+Usage:
+    python -m tools.consistency --writes 200 --concurrency 1,8,32
+    python -m tools.consistency --kinds update,delete --staleness-bound 100 --json visibility.json
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+
+from infra.stats import LatencyHistogram
+from tools.cli import (add_metrics_arguments, add_profiling_arguments, configure_logging,
+                       start_metrics, start_profiling)
+from tools.workloads import build_apis
+from utils.test_data import generate_booking_data, generate_partial_booking_data
+
+logger = logging.getLogger(__name__)
+
+WRITE_KINDS = ("update", "partial_update", "delete")
+
+
+def parse_list(text, cast=str):
+    """
+    Parse a comma separated option value.
+
+    Args:
+        text: e.g. "1,8,32"
+        cast: Conversion applied to every item
+
+    Returns:
+        List of converted items
+    """
+    return [cast(part.strip()) for part in text.split(",") if part.strip()]
+
+
+def poll_delays(initial_delay_ms=1.0, max_delay_ms=250.0, factor=2.0):
+    """
+    Yield the wait (ms) before each poll: 0 first, then exponential backoff.
+
+    Args:
+        initial_delay_ms: Wait before the second poll
+        max_delay_ms: Upper bound of the wait between polls
+        factor: Growth of the wait after every stale read
+
+    Yields:
+        Delay in milliseconds
+    """
+    yield 0.0
+    delay = initial_delay_ms
+    while True:
+        yield delay
+        delay = min(delay * factor, max_delay_ms)
+
+
+def is_visible(kind, written, response):
+    """
+    Tell whether a GET response reflects a write.
+
+    Args:
+        kind: One of WRITE_KINDS
+        written: Payload that was written (None for delete)
+        response: Response of GET /booking/{id}
+
+    Returns:
+        True if the write is visible
+    """
+    if kind == "delete":
+        return response.status_code == 404
+    if response.status_code != 200:
+        return False
+    booking = response.json()
+    return all(booking.get(field) == value for field, value in written.items())
+
+
+class VisibilityProbe:
+    """
+    Measures how long acknowledged writes take to become readable.
+    """
+
+    def __init__(self, booking_api, auth_api, writes=100, concurrency_levels=(1,),
+                 kinds=WRITE_KINDS, timeout_s=10.0, staleness_bound_ms=0.0,
+                 initial_delay_ms=1.0, max_delay_ms=250.0):
+        """
+        Args:
+            booking_api: BookingApi instance (ideally on a pooled client)
+            auth_api: AuthApi instance
+            writes: Writes per concurrency level, spread over the kinds
+            concurrency_levels: Numbers of concurrent writers to measure
+            kinds: Write kinds to probe (see WRITE_KINDS)
+            timeout_s: Give up polling a write after this many seconds
+            staleness_bound_ms: Allowed time-to-visibility; slower writes
+                                are violations (0 = read-your-writes)
+            initial_delay_ms: First backoff step of the poll schedule
+            max_delay_ms: Largest wait between two polls
+        """
+        unknown = set(kinds) - set(WRITE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown write kinds {sorted(unknown)}, expected {WRITE_KINDS}")
+        self.booking_api = booking_api
+        self.auth_api = auth_api
+        self.writes = writes
+        self.concurrency_levels = list(concurrency_levels)
+        self.kinds = list(kinds)
+        self.timeout_s = timeout_s
+        self.staleness_bound_ms = staleness_bound_ms
+        self.initial_delay_ms = initial_delay_ms
+        self.max_delay_ms = max_delay_ms
+
+    def probe_write(self, kind, token):
+        """
+        Perform one write on a fresh booking and poll until it is visible.
+
+        Args:
+            kind: One of WRITE_KINDS
+            token: Authentication token
+
+        Returns:
+            Dictionary with write_status, visible_ms (None if the write
+            failed or never became visible), polls and stale_reads
+        """
+        booking_id = self.booking_api.create_booking(generate_booking_data()).json()["bookingid"]
+        # Prime the read path (and any cache in front of it) with the old state
+        self.booking_api.get_booking(booking_id)
+
+        if kind == "update":
+            written = generate_booking_data()
+            response = self.booking_api.update_booking(booking_id, written, token)
+        elif kind == "partial_update":
+            written = generate_partial_booking_data("firstname")
+            response = self.booking_api.partial_update_booking(booking_id, written, token)
+        else:
+            written = None
+            response = self.booking_api.delete_booking(booking_id, token)
+        acked = time.perf_counter()
+
+        result = {"write_status": response.status_code, "visible_ms": None,
+                  "polls": 0, "stale_reads": 0}
+        if response.status_code not in (200, 201):
+            return result
+
+        deadline = acked + self.timeout_s
+        for delay_ms in poll_delays(self.initial_delay_ms, self.max_delay_ms):
+            poll_at = time.perf_counter() + delay_ms / 1000
+            if poll_at > deadline:
+                break
+            time.sleep(max(poll_at - time.perf_counter(), 0))
+            sent = time.perf_counter()
+            read = self.booking_api.get_booking(booking_id)
+            result["polls"] += 1
+            if is_visible(kind, written, read):
+                # Visible no later than when the successful read was sent
+                result["visible_ms"] = (sent - acked) * 1000
+                break
+            result["stale_reads"] += 1
+
+        if kind != "delete":
+            self.booking_api.delete_booking(booking_id, token)
+        return result
+
+    def run_level(self, concurrency, token):
+        """
+        Probe self.writes writes with a number of concurrent writers.
+
+        Args:
+            concurrency: Number of writer threads
+            token: Authentication token
+
+        Returns:
+            Dictionary mapping write kind to accumulated results
+        """
+        stats = {kind: {"histogram": LatencyHistogram(), "writes": 0, "write_errors": 0,
+                        "immediate": 0, "stale_reads": 0, "polls": 0, "never_visible": 0,
+                        "violations": 0}
+                 for kind in self.kinds}
+        lock = threading.Lock()
+        tickets = iter(range(self.writes))
+
+        def writer():
+            while True:
+                with lock:
+                    index = next(tickets, None)
+                if index is None:
+                    return
+                kind = self.kinds[index % len(self.kinds)]
+                try:
+                    result = self.probe_write(kind, token)
+                except Exception as e:
+                    logger.warning(f"{kind} probe failed: {type(e).__name__}: {e}")
+                    result = {"write_status": type(e).__name__, "visible_ms": None,
+                              "polls": 0, "stale_reads": 0}
+                with lock:
+                    self._accumulate(stats[kind], result)
+
+        threads = [threading.Thread(target=writer) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+
+    def _accumulate(self, stats, result):
+        stats["writes"] += 1
+        if result["write_status"] not in (200, 201):
+            stats["write_errors"] += 1
+            return
+        stats["polls"] += result["polls"]
+        stats["stale_reads"] += result["stale_reads"]
+        if result["visible_ms"] is None:
+            stats["never_visible"] += 1
+            stats["violations"] += 1
+            return
+        stats["histogram"].record(result["visible_ms"])
+        if result["stale_reads"] == 0:
+            stats["immediate"] += 1
+        if result["stale_reads"] and result["visible_ms"] > self.staleness_bound_ms:
+            stats["violations"] += 1
+
+    def run(self):
+        """
+        Probe every concurrency level.
+
+        Returns:
+            Report dictionary with one entry per (concurrency, kind)
+        """
+        token = self.auth_api.create_token().json()["token"]
+        rows = []
+        for concurrency in self.concurrency_levels:
+            logger.info(f"Probing {self.writes} writes with {concurrency} concurrent writers")
+            for kind, stats in self.run_level(concurrency, token).items():
+                acknowledged = stats["writes"] - stats["write_errors"]
+                rows.append({
+                    "concurrency": concurrency,
+                    "kind": kind,
+                    "writes": stats["writes"],
+                    "write_errors": stats["write_errors"],
+                    "immediately_visible": stats["immediate"],
+                    "never_visible": stats["never_visible"],
+                    "stale_reads": stats["stale_reads"],
+                    "polls": stats["polls"],
+                    "violations": stats["violations"],
+                    "violation_rate": stats["violations"] / acknowledged if acknowledged else 0.0,
+                    "visibility_ms": stats["histogram"].summary()
+                })
+        return {
+            "staleness_bound_ms": self.staleness_bound_ms,
+            "timeout_s": self.timeout_s,
+            "results": rows
+        }
+
+
+def format_report(report):
+    """
+    Format a probe report as a table.
+
+    Args:
+        report: Dictionary returned by VisibilityProbe.run
+
+    Returns:
+        Multi-line string
+    """
+    def ms(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    lines = [
+        f"Read-after-write visibility (staleness bound {report['staleness_bound_ms']:g}ms, "
+        f"timeout {report['timeout_s']:g}s)",
+        f"{'conc':>5}  {'kind':<15}{'writes':>7}{'immed%':>8}{'p50':>8}{'p90':>8}{'p99':>8}"
+        f"{'max':>8}{'stale':>7}{'never':>7}{'viol%':>7}"
+    ]
+    for row in report["results"]:
+        visibility = row["visibility_ms"]
+        acknowledged = row["writes"] - row["write_errors"]
+        immediate = row["immediately_visible"] / acknowledged * 100 if acknowledged else 0.0
+        lines.append(
+            f"{row['concurrency']:>5}  {row['kind']:<15}{row['writes']:>7}{immediate:>7.1f}%"
+            f"{ms(visibility.get('p50')):>8}{ms(visibility.get('p90')):>8}"
+            f"{ms(visibility.get('p99')):>8}{ms(visibility.get('max')):>8}"
+            f"{row['stale_reads']:>7}{row['never_visible']:>7}{row['violation_rate'] * 100:>6.1f}%"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Measure read-after-write visibility latency.")
+    parser.add_argument("--writes", type=int, default=60, help="Writes per concurrency level")
+    parser.add_argument("--concurrency", type=lambda text: parse_list(text, int), default=[1],
+                        help="Comma separated concurrency levels, e.g. 1,8,32")
+    parser.add_argument("--kinds", type=parse_list, default=list(WRITE_KINDS),
+                        help="Write kinds: update,partial_update,delete")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="Seconds to wait for a write to become visible")
+    parser.add_argument("--staleness-bound", type=float, default=0.0,
+                        help="Allowed time-to-visibility in ms (0 = read-your-writes)")
+    parser.add_argument("--max-poll-interval", type=float, default=250.0,
+                        help="Largest wait between polls in ms")
+    parser.add_argument("--base-url", help="Target base URL")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    add_metrics_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    booking_api, auth_api, _, client = build_apis(args.base_url, max(args.concurrency))
+    probe = VisibilityProbe(booking_api, auth_api, writes=args.writes,
+                            concurrency_levels=args.concurrency, kinds=args.kinds,
+                            timeout_s=args.timeout, staleness_bound_ms=args.staleness_bound,
+                            max_delay_ms=args.max_poll_interval)
+    stop_metrics = start_metrics(args)
+    stop_profiling = start_profiling(args)
+    try:
+        report = probe.run()
+    finally:
+        stop_metrics()
+        stop_profiling()
+        client.close()
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if any(row["violations"] for row in report["results"]) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
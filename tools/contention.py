@@ -0,0 +1,450 @@
+"""
+Barrier-synchronized contention harness.
+
+Releases N conflicting operations (PUT/PATCH/DELETE/GET) against the same
+booking at the same instant, repeats that for M iterations and reports the
+outcome distribution, the final-state consistency rate and the latency
+spread under contention.
+
+Usage:
+    python -m tools.contention --fan-out 50 --iterations 20 --mix put=2,patch=2,get=3,delete=1
+"""
+import argparse
+import concurrent.futures
+import json
+import logging
+import threading
+import time
+from collections import Counter
+
+from infra.base_api import create_pooled_client
+from infra.stats import summarize_latencies
+from logic.auth_api import AuthApi
+from logic.booking_api import BookingApi
+from tools.cli import (add_metrics_arguments, add_profiling_arguments, configure_logging,
+                       start_metrics, start_profiling)
+from utils.test_data import generate_booking_data
+
+logger = logging.getLogger(__name__)
+
+MIN_FAN_OUT = 2
+MAX_FAN_OUT = 500
+
+OPERATIONS = ("put", "patch", "delete", "get")
+DEFAULT_MIX = {"put": 2, "patch": 2, "get": 3, "delete": 1}
+
+# HTTP statuses that mean the operation was applied by the server
+SUCCESS_STATUSES = {
+    "put": {200},
+    "patch": {200},
+    "delete": {200, 201},
+    "get": {200}
+}
+
+
+def parse_mix(text):
+    """
+    Parse an operation mix like "put=2,get=3,delete=1".
+
+    Args:
+        text: Comma separated operation=weight pairs
+
+    Returns:
+        Dictionary mapping operation name to integer weight
+    """
+    mix = {}
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip().lower()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {OPERATIONS}")
+        mix[name] = int(weight) if weight else 1
+    if not mix or not any(weight > 0 for weight in mix.values()):
+        raise ValueError(f"Operation mix '{text}' has no positive weights")
+    return mix
+
+
+def assign_operations(mix, fan_out):
+    """
+    Spread the weighted operation mix over the contending workers.
+
+    Operations are interleaved (weighted round robin) so that any fan-out
+    contains a representative share of every operation.
+
+    Args:
+        mix: Dictionary mapping operation name to weight
+        fan_out: Number of concurrent workers
+
+    Returns:
+        List with one operation name per worker
+    """
+    cycle = []
+    remaining = {name: weight for name, weight in mix.items() if weight > 0}
+    while remaining:
+        for name in list(remaining):
+            cycle.append(name)
+            remaining[name] -= 1
+            if remaining[name] == 0:
+                del remaining[name]
+    return [cycle[slot % len(cycle)] for slot in range(fan_out)]
+
+
+class ContentionHarness:
+    """
+    Runs repeated, barrier-released races against a single booking.
+    """
+
+    def __init__(self, booking_api=None, auth_api=None, fan_out=10, iterations=5,
+                 mix=None, barrier_timeout=60):
+        """
+        Initialize the harness.
+
+        Args:
+            booking_api: BookingApi used by all workers (default: new instance
+                         on a pooled client with one connection per worker)
+            auth_api: AuthApi used to obtain a token (default: new instance
+                      on the same pooled client)
+            fan_out: Number of conflicting operations released together (2-500)
+            iterations: Number of times the race is repeated
+            mix: Dictionary mapping operation name to weight (default: DEFAULT_MIX)
+            barrier_timeout: Seconds to wait for all workers to reach the barrier
+        """
+        if not MIN_FAN_OUT <= fan_out <= MAX_FAN_OUT:
+            raise ValueError(
+                f"fan_out must be between {MIN_FAN_OUT} and {MAX_FAN_OUT}, got {fan_out}"
+            )
+        if iterations < 1:
+            raise ValueError(f"iterations must be positive, got {iterations}")
+
+        self._client = None
+        if booking_api is None or auth_api is None:
+            self._client = create_pooled_client(fan_out)
+        self.booking_api = booking_api or BookingApi(client=self._client)
+        self.auth_api = auth_api or AuthApi(client=self._client)
+        self.fan_out = fan_out
+        self.iterations = iterations
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.barrier_timeout = barrier_timeout
+
+    def run(self):
+        """
+        Run all iterations and build the report.
+
+        Returns:
+            Dictionary report (see build_report)
+        """
+        token = self.auth_api.create_token().json()["token"]
+        operations = assign_operations(self.mix, self.fan_out)
+
+        iterations = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.fan_out) as executor:
+            self.warm_up(executor)
+            for iteration in range(self.iterations):
+                result = self._run_iteration(executor, operations, token, iteration)
+                logger.info(
+                    f"Iteration {iteration + 1}/{self.iterations}: "
+                    f"consistent={result['consistent']} final_status={result['final_status']}"
+                )
+                iterations.append(result)
+
+        return build_report(self.fan_out, self.mix, iterations)
+
+    def warm_up(self, executor):
+        """
+        Open one pooled connection per worker, so that the operations
+        released by the barrier race each other rather than fan_out
+        connection setups. Does nothing without a shared client.
+
+        Args:
+            executor: ThreadPoolExecutor with fan_out workers
+        """
+        if self.booking_api.client is None:
+            return
+        barrier = threading.Barrier(self.fan_out)
+        futures = [executor.submit(self._open_connection, barrier) for _ in range(self.fan_out)]
+        opened = sum(1 for future in futures if future.result())
+        if opened < self.fan_out:
+            logger.warning(f"Pre-opened {opened} of {self.fan_out} connections")
+
+    def _open_connection(self, barrier):
+        """
+        Check out a connection and hold it until every worker has one.
+        """
+        url = f"{self.booking_api.base_url}/ping"
+        try:
+            with self.booking_api.client.stream("GET", url) as response:
+                barrier.wait(timeout=self.barrier_timeout)
+                response.read()
+        except Exception as e:
+            barrier.abort()
+            logger.debug(f"Could not pre-open a connection: {e}")
+            return False
+        return True
+
+    def close(self):
+        """Close the pooled client the harness created, if any."""
+        if self._client is not None:
+            self._client.close()
+
+    def _run_iteration(self, executor, operations, token, iteration):
+        """
+        Create a fresh booking and release all operations on it at once.
+        """
+        initial_data = generate_booking_data(firstname=f"Initial-{iteration}")
+        create_response = self.booking_api.create_booking(initial_data)
+        booking_id = None
+        if create_response.status_code == 200:
+            try:
+                booking_id = create_response.json()["bookingid"]
+            except (ValueError, KeyError):
+                pass
+        if booking_id is None:
+            # No booking to race on: report the iteration as failed
+            return {
+                "iteration": iteration,
+                "booking_id": None,
+                "outcomes": [],
+                "final_status": None,
+                "consistent": False,
+                "reason": f"setup create failed with status {create_response.status_code}",
+                "start_skew_ms": None
+            }
+
+        barrier = threading.Barrier(self.fan_out)
+        futures = []
+        for slot, operation in enumerate(operations):
+            payload = self._build_payload(operation, iteration, slot)
+            futures.append(executor.submit(
+                self._contend, barrier, operation, booking_id, payload, token
+            ))
+        outcomes = [future.result() for future in futures]
+
+        final_response = self.booking_api.get_booking(booking_id)
+        final_state = final_response.json() if final_response.status_code == 200 else None
+        consistent, reason = check_final_state(
+            initial_data, outcomes, final_response.status_code, final_state
+        )
+
+        # Leave nothing behind if no DELETE won the race
+        if final_response.status_code == 200:
+            self.booking_api.delete_booking(booking_id, token)
+
+        starts = [outcome["start"] for outcome in outcomes if outcome["start"] is not None]
+        return {
+            "iteration": iteration,
+            "booking_id": booking_id,
+            "outcomes": outcomes,
+            "final_status": final_response.status_code,
+            "consistent": consistent,
+            "reason": reason,
+            "start_skew_ms": (max(starts) - min(starts)) * 1000 if starts else None
+        }
+
+    @staticmethod
+    def _build_payload(operation, iteration, slot):
+        """
+        Build a payload whose firstname identifies the writer.
+        """
+        name = f"{operation.capitalize()}-{iteration}-{slot}"
+        if operation == "put":
+            return generate_booking_data(firstname=name, lastname=name)
+        if operation == "patch":
+            return {"firstname": name}
+        return None
+
+    def _contend(self, barrier, operation, booking_id, payload, token):
+        """
+        Wait at the barrier, then fire a single operation and time it.
+        """
+        try:
+            barrier.wait(timeout=self.barrier_timeout)
+        except threading.BrokenBarrierError:
+            return {"operation": operation, "payload": payload, "outcome": "BrokenBarrier",
+                    "latency_ms": None, "start": None}
+
+        start = time.perf_counter()
+        try:
+            if operation == "put":
+                response = self.booking_api.update_booking(booking_id, payload, token)
+            elif operation == "patch":
+                response = self.booking_api.partial_update_booking(booking_id, payload, token)
+            elif operation == "delete":
+                response = self.booking_api.delete_booking(booking_id, token)
+            else:
+                response = self.booking_api.get_booking(booking_id)
+            outcome = str(response.status_code)
+        except Exception as e:
+            outcome = type(e).__name__
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        return {"operation": operation, "payload": payload, "outcome": outcome,
+                "latency_ms": latency_ms, "start": start}
+
+
+def check_final_state(initial_data, outcomes, final_status, final_state):
+    """
+    Decide whether the state after a race is one that some ordering of the
+    successful operations could have produced.
+
+    Args:
+        initial_data: Booking data the booking was created with
+        outcomes: Outcome dictionaries of the contending operations
+        final_status: Status code of the GET issued after the race
+        final_state: Booking JSON from that GET (None if not 200)
+
+    Returns:
+        Tuple (consistent, reason)
+    """
+    def succeeded(outcome):
+        return (outcome["outcome"].isdigit()
+                and int(outcome["outcome"]) in SUCCESS_STATUSES[outcome["operation"]])
+
+    deleted = any(succeeded(o) for o in outcomes if o["operation"] == "delete")
+    if deleted:
+        if final_status == 404:
+            return True, None
+        return False, f"DELETE succeeded but final GET returned {final_status}"
+
+    if final_status != 200:
+        return False, f"No DELETE succeeded but final GET returned {final_status}"
+
+    writes = [o for o in outcomes if o["operation"] in ("put", "patch") and succeeded(o)]
+    if not writes:
+        if final_state["firstname"] == initial_data["firstname"]:
+            return True, None
+        return False, f"No write succeeded but firstname is {final_state['firstname']!r}"
+
+    winner = next((o for o in writes if o["payload"]["firstname"] == final_state["firstname"]), None)
+    if winner is None:
+        return False, f"Final firstname {final_state['firstname']!r} matches no successful write"
+
+    # A full update must win as a whole - mixed fields mean a torn write
+    if winner["operation"] == "put" and final_state["lastname"] != winner["payload"]["lastname"]:
+        return False, (
+            f"Torn write: firstname from {winner['payload']['firstname']!r} "
+            f"but lastname {final_state['lastname']!r}"
+        )
+    return True, None
+
+
+def build_report(fan_out, mix, iterations):
+    """
+    Aggregate per-iteration results into a contention report.
+
+    Args:
+        fan_out: Number of concurrent operations per iteration
+        mix: Operation mix used
+        iterations: List of iteration results
+
+    Returns:
+        Dictionary with outcome distributions, consistency rate and latency spread
+    """
+    outcomes = {}
+    latencies = {}
+    for iteration in iterations:
+        for outcome in iteration["outcomes"]:
+            operation = outcome["operation"]
+            outcomes.setdefault(operation, Counter())[outcome["outcome"]] += 1
+            if outcome["latency_ms"] is not None:
+                latencies.setdefault(operation, []).append(outcome["latency_ms"])
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    consistent = sum(1 for iteration in iterations if iteration["consistent"])
+    skews = [i["start_skew_ms"] for i in iterations if i["start_skew_ms"] is not None]
+
+    return {
+        "fan_out": fan_out,
+        "iterations": len(iterations),
+        "mix": mix,
+        "outcomes": {operation: dict(counter) for operation, counter in outcomes.items()},
+        "final_status": dict(Counter(i["final_status"] for i in iterations)),
+        "consistency_rate": consistent / len(iterations) if iterations else None,
+        "inconsistent": [
+            {"iteration": i["iteration"], "booking_id": i["booking_id"], "reason": i["reason"]}
+            for i in iterations if not i["consistent"]
+        ],
+        "latency_ms": {
+            **{operation: summarize_latencies(values) for operation, values in latencies.items()},
+            "all": summarize_latencies(all_latencies)
+        },
+        "start_skew_ms": summarize_latencies(skews)
+    }
+
+
+def format_report(report):
+    """
+    Render a contention report as a plain text table.
+
+    Args:
+        report: Dictionary returned by build_report
+
+    Returns:
+        Multi-line string
+    """
+    lines = [
+        f"Contention report: fan-out={report['fan_out']} iterations={report['iterations']} "
+        f"mix={report['mix']}",
+        f"Consistency rate: {report['consistency_rate']:.1%}",
+        f"Final GET statuses: {report['final_status']}",
+        "",
+        f"{'operation':<10} {'outcomes':<32} {'min':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    ]
+    for operation, summary in report["latency_ms"].items():
+        counts = report["outcomes"].get(operation, {})
+        outcomes = ", ".join(f"{key}:{value}" for key, value in sorted(counts.items()))
+        if summary["count"]:
+            lines.append(
+                f"{operation:<10} {outcomes:<32} {summary['min']:>8.1f} {summary['p50']:>8.1f} "
+                f"{summary['p95']:>8.1f} {summary['p99']:>8.1f} {summary['max']:>8.1f}"
+            )
+    skew = report["start_skew_ms"]
+    if skew["count"]:
+        lines.append("")
+        lines.append(f"Barrier release skew (ms): p50={skew['p50']:.2f} max={skew['max']:.2f}")
+    for item in report["inconsistent"]:
+        lines.append(f"INCONSISTENT iteration {item['iteration']} "
+                     f"(booking {item['booking_id']}): {item['reason']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Barrier-synchronized contention harness.")
+    parser.add_argument("--fan-out", type=int, default=10,
+                        help=f"Concurrent operations per race ({MIN_FAN_OUT}-{MAX_FAN_OUT})")
+    parser.add_argument("--iterations", type=int, default=5, help="Number of races")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Operation weights, e.g. put=2,patch=2,get=3,delete=1")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    add_metrics_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+
+    harness = ContentionHarness(fan_out=args.fan_out, iterations=args.iterations, mix=args.mix)
+    stop_metrics = start_metrics(args)
+    stop_profiling = start_profiling(args)
+    try:
+        report = harness.run()
+    finally:
+        harness.close()
+        stop_metrics()
+        stop_profiling()
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 0 if report["consistency_rate"] == 1.0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
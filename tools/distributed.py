@@ -0,0 +1,518 @@
+"""
+Distributed load runs: one coordinator, many agents.
+
+Agents connect to the coordinator over TCP ("host:port") or a Unix socket
+("unix:/path/to.sock"). The coordinator measures every agent's clock
+offset, hands out the workload definition, starts all agents at the same
+instant, pulls their mergeable latency histograms back and produces one
+combined report.
+
+Protocol: newline-delimited JSON messages.
+    agent -> coordinator: hello, clock, ready, progress, result
+    coordinator -> agent: clock, workload, start, stop
+
+Usage:
+    python -m tools.distributed coordinator --listen 0.0.0.0:7700 --agents 3 \\
+        --operation get_booking=8,create_booking=2 --duration 60 --processes 4
+    python -m tools.distributed agent --connect coordinator-host:7700
+    python -m tools.distributed local --agents 3 --operation ping --requests 300
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+
+from tools.cli import configure_logging
+from tools.driver import LoadDriver, build_report, format_report, merge_results, print_progress
+from tools.workloads import parse_weights
+
+logger = logging.getLogger(__name__)
+
+CLOCK_SYNC_ROUNDS = 5
+
+
+def parse_address(text):
+    """
+    Parse a coordinator address.
+
+    Args:
+        text: "host:port" or "unix:/path/to.sock"
+
+    Returns:
+        Tuple (socket family, address)
+    """
+    if text.startswith("unix:"):
+        return socket.AF_UNIX, text[len("unix:"):]
+    host, _, port = text.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class Connection:
+    """
+    A socket exchanging newline-delimited JSON messages.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._reader = sock.makefile("rb")
+        self._send_lock = threading.Lock()
+
+    def send(self, message):
+        """Send one message (thread-safe)."""
+        data = json.dumps(message).encode() + b"\n"
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def receive(self):
+        """
+        Block until the next message arrives.
+
+        Returns:
+            Message dictionary, or None when the peer closed the connection
+        """
+        line = self._reader.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def close(self):
+        try:
+            self._reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def split_requests(total, parts):
+    """
+    Split a request count as evenly as possible.
+
+    Args:
+        total: Total number of requests (or None for duration-based runs)
+        parts: Number of shares
+
+    Returns:
+        List with one share per part
+    """
+    if total is None:
+        return [None] * parts
+    return [total // parts + (1 if index < total % parts else 0) for index in range(parts)]
+
+
+class Coordinator:
+    """
+    Distributes a workload to agents and merges their results.
+    """
+
+    def __init__(self, address, expected_agents, workload, start_delay_s=2.0,
+                 connect_timeout_s=120):
+        """
+        Initialize the coordinator.
+
+        Args:
+            address: Listen address, "host:port" or "unix:/path"
+            expected_agents: Number of agents to wait for before starting
+            workload: Dictionary with weights, processes, concurrency,
+                      requests (total), duration_s and base_url
+            start_delay_s: Lead time between the start message and the start
+            connect_timeout_s: Seconds to wait for all agents to connect
+        """
+        self.address = address
+        self.expected_agents = expected_agents
+        self.workload = workload
+        self.start_delay_s = start_delay_s
+        self.connect_timeout_s = connect_timeout_s
+        self.agents = []
+        self._server = None
+
+    def listen(self):
+        """
+        Bind the listening socket.
+
+        Returns:
+            The bound address (useful with port 0)
+        """
+        family, address = parse_address(self.address)
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_UNIX:
+            if os.path.exists(address):
+                os.unlink(address)
+        else:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(address)
+        self._server.listen(self.expected_agents)
+        bound = self._server.getsockname()
+        if family == socket.AF_UNIX:
+            return f"unix:{bound}"
+        return f"{bound[0]}:{bound[1]}"
+
+    def run(self, on_progress=None):
+        """
+        Wait for agents, run the workload on all of them and merge results.
+
+        Args:
+            on_progress: Optional callable(elapsed_s, completed, errors)
+
+        Returns:
+            Report dictionary (driver report plus per-agent breakdown)
+        """
+        if self._server is None:
+            self.listen()
+        try:
+            self._accept_agents()
+            for agent in self.agents:
+                agent["offset_s"] = self._measure_clock_offset(agent["connection"])
+            self._distribute_workload()
+            return self._start_and_collect(on_progress)
+        finally:
+            for agent in self.agents:
+                agent["connection"].close()
+            self._server.close()
+
+    def _accept_agents(self):
+        """Accept connections until every expected agent said hello."""
+        self._server.settimeout(self.connect_timeout_s)
+        while len(self.agents) < self.expected_agents:
+            try:
+                sock, _ = self._server.accept()
+            except socket.timeout:
+                raise TimeoutError(
+                    f"Only {len(self.agents)}/{self.expected_agents} agents connected"
+                )
+            sock.settimeout(None)
+            connection = Connection(sock)
+            hello = connection.receive()
+            if not hello or hello.get("type") != "hello":
+                connection.close()
+                continue
+            name = hello.get("agent") or f"agent-{len(self.agents)}"
+            self.agents.append({"name": name, "connection": connection})
+            logger.info(f"Agent {name} connected ({len(self.agents)}/{self.expected_agents})")
+
+    @staticmethod
+    def _measure_clock_offset(connection):
+        """
+        Estimate agent clock minus coordinator clock (NTP style, best RTT wins).
+        """
+        best_rtt, best_offset = None, 0.0
+        for _ in range(CLOCK_SYNC_ROUNDS):
+            sent = time.time()
+            connection.send({"type": "clock"})
+            reply = connection.receive()
+            received = time.time()
+            rtt = received - sent
+            if best_rtt is None or rtt < best_rtt:
+                best_rtt = rtt
+                best_offset = reply["time"] - (sent + received) / 2
+        return best_offset
+
+    def _distribute_workload(self):
+        """Send each agent its share of the workload and wait until ready."""
+        shares = split_requests(self.workload.get("requests"), len(self.agents))
+        for agent, share in zip(self.agents, shares):
+            agent["connection"].send({"type": "workload",
+                                      "config": dict(self.workload, requests=share)})
+        for agent in self.agents:
+            reply = agent["connection"].receive()
+            if not reply or reply.get("type") != "ready":
+                raise RuntimeError(f"Agent {agent['name']} did not accept the workload: {reply}")
+
+    def _start_and_collect(self, on_progress):
+        """Start all agents at the same instant and gather their results."""
+        start_at = time.time() + self.start_delay_s
+        for agent in self.agents:
+            agent["connection"].send({"type": "start", "start_at": start_at + agent["offset_s"]})
+
+        messages = queue.Queue()
+        for index, agent in enumerate(self.agents):
+            threading.Thread(target=self._read_agent, args=(index, agent, messages),
+                             daemon=True).start()
+
+        progress = {}
+        results = {}
+        interrupted = False
+        try:
+            while len(results) < len(self.agents):
+                index, message = messages.get()
+                if message is None:
+                    results[index] = {"error": f"Agent {self.agents[index]['name']} disconnected"}
+                elif message["type"] == "progress":
+                    progress[index] = (message["completed"], message["errors"])
+                elif message["type"] == "result":
+                    results[index] = message["report"]
+                if on_progress is not None:
+                    on_progress(max(time.time() - start_at, 0.0),
+                                sum(c for c, _ in progress.values()),
+                                sum(e for _, e in progress.values()))
+        except KeyboardInterrupt:
+            interrupted = True
+            logger.warning("Interrupted, stopping agents")
+            for agent in self.agents:
+                agent["connection"].send({"type": "stop"})
+            while len(results) < len(self.agents):
+                index, message = messages.get()
+                if message is None or message["type"] == "result":
+                    results[index] = message["report"] if message else {"error": "disconnected"}
+
+        return self._combine(results, time.time() - start_at, interrupted)
+
+    @staticmethod
+    def _read_agent(index, agent, messages):
+        """Forward one agent's messages to the shared queue."""
+        while True:
+            try:
+                message = agent["connection"].receive()
+            except (OSError, ValueError):
+                message = None
+            messages.put((index, message))
+            if message is None or message["type"] == "result":
+                return
+
+    def _combine(self, results, elapsed_s, interrupted):
+        """Merge agent reports into one combined report."""
+        shards = []
+        per_agent = {}
+        for index, report in results.items():
+            name = self.agents[index]["name"]
+            if "error" in report:
+                shards.append(report)
+                per_agent[name] = {"error": report["error"]}
+                continue
+            shards.append({
+                "histograms": report["histograms"],
+                "statuses": report["statuses"],
+                "completed": report["requests"],
+                "errors": report["errors"]
+            })
+            per_agent[name] = {
+                "requests": report["requests"],
+                "throughput_rps": report["throughput_rps"],
+                "errors": report["errors"],
+                "clock_offset_ms": self.agents[index]["offset_s"] * 1000,
+                "start_lag_ms": report.get("start_lag_ms")
+            }
+
+        combined = build_report(merge_results(shards), elapsed_s,
+                                interrupted or any(r.get("interrupted") for r in results.values()))
+        combined["agents"] = per_agent
+        return combined
+
+
+class Agent:
+    """
+    Runs the workload it receives from a coordinator.
+    """
+
+    def __init__(self, address, name=None, connect_timeout_s=60):
+        """
+        Initialize the agent.
+
+        Args:
+            address: Coordinator address, "host:port" or "unix:/path"
+            name: Agent name shown in reports (default: host-pid)
+            connect_timeout_s: Seconds to keep retrying the connection
+        """
+        self.address = address
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.connect_timeout_s = connect_timeout_s
+        self._driver = None
+
+    def _connect(self):
+        family, address = parse_address(self.address)
+        deadline = time.monotonic() + self.connect_timeout_s
+        while True:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.connect(address)
+                return Connection(sock)
+            except OSError:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+    def run(self):
+        """
+        Serve one coordinator session.
+
+        Returns:
+            The local report that was sent to the coordinator (or None)
+        """
+        connection = self._connect()
+        connection.send({"type": "hello", "agent": self.name})
+        config = None
+        try:
+            while True:
+                message = connection.receive()
+                if message is None:
+                    return None
+                if message.get("type") == "clock":
+                    connection.send({"type": "clock", "time": time.time()})
+                elif message.get("type") == "workload":
+                    config = message["config"]
+                    connection.send({"type": "ready"})
+                elif message.get("type") == "start":
+                    if config is None:
+                        report = {"error": "Agent got start before a workload"}
+                    else:
+                        report = self._run_workload(connection, config, message["start_at"])
+                    connection.send({"type": "result", "report": report})
+                    return report
+        finally:
+            connection.close()
+
+    def _run_workload(self, connection, config, start_at):
+        """Wait for the synchronized start, then drive the load locally."""
+        self._driver = LoadDriver(
+            config["weights"],
+            processes=config.get("processes"),
+            concurrency=config.get("concurrency", 16),
+            requests=config.get("requests"),
+            duration_s=config.get("duration_s"),
+            base_url=config.get("base_url")
+        )
+
+        # Listen for "stop" while the driver runs
+        def watch_for_stop():
+            while True:
+                try:
+                    message = connection.receive()
+                except (OSError, ValueError):
+                    return
+                if message is None or message.get("type") == "stop":
+                    self._driver.stop()
+                    return
+        threading.Thread(target=watch_for_stop, daemon=True).start()
+
+        delay = start_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        start_lag_ms = (time.time() - start_at) * 1000
+
+        def forward_progress(elapsed_s, completed, errors):
+            connection.send({"type": "progress", "completed": completed, "errors": errors})
+
+        report = self._driver.run(on_progress=forward_progress)
+        report["start_lag_ms"] = start_lag_ms
+        return report
+
+
+def run_local(agents, workload, on_progress=None):
+    """
+    Run a coordinator and several agents on localhost.
+
+    Args:
+        agents: Number of agents to start (threads in this process)
+        workload: Workload dictionary (see Coordinator)
+        on_progress: Optional callable(elapsed_s, completed, errors)
+
+    Returns:
+        Combined report
+    """
+    coordinator = Coordinator("127.0.0.1:0", agents, workload, start_delay_s=1.0)
+    address = coordinator.listen()
+    threads = [threading.Thread(target=Agent(address, name=f"local-{index}").run, daemon=True)
+               for index in range(agents)]
+    for thread in threads:
+        thread.start()
+    report = coordinator.run(on_progress=on_progress)
+    for thread in threads:
+        thread.join(10)
+    return report
+
+
+def format_agents(report):
+    """
+    Render the per-agent breakdown of a combined report.
+    """
+    lines = [f"{'agent':<28} {'requests':>10} {'req/s':>10} {'errors':>8} "
+             f"{'offset ms':>10} {'lag ms':>8}"]
+    for name, agent in report["agents"].items():
+        if "error" in agent:
+            lines.append(f"{name:<28} FAILED: {agent['error']}")
+            continue
+        lag = agent["start_lag_ms"]
+        lines.append(
+            f"{name:<28} {agent['requests']:>10} {agent['throughput_rps']:>10.1f} "
+            f"{agent['errors']:>8} {agent['clock_offset_ms']:>10.2f} "
+            f"{lag if lag is not None else float('nan'):>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Distributed load runs.")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    workload_parent = argparse.ArgumentParser(add_help=False)
+    workload_parent.add_argument("--operation", type=parse_weights,
+                                 default=parse_weights("get_booking"),
+                                 help="Operation or weighted mix, e.g. get_booking=8,create_booking=2")
+    workload_parent.add_argument("--processes", type=int, default=1,
+                                 help="Worker processes per agent")
+    workload_parent.add_argument("--concurrency", type=int, default=16,
+                                 help="Threads per worker process")
+    workload_parent.add_argument("--requests", type=int, help="Total requests across all agents")
+    workload_parent.add_argument("--duration", type=float, help="Run duration in seconds")
+    workload_parent.add_argument("--base-url", help="Target base URL")
+    workload_parent.add_argument("--json", dest="json_path", help="Write the combined report")
+
+    coordinator_parser = subparsers.add_parser("coordinator", parents=[workload_parent],
+                                               help="Distribute a workload to agents")
+    coordinator_parser.add_argument("--listen", default="0.0.0.0:7700",
+                                    help="host:port or unix:/path")
+    coordinator_parser.add_argument("--agents", type=int, required=True,
+                                    help="Number of agents to wait for")
+
+    agent_parser = subparsers.add_parser("agent", help="Run workloads for a coordinator")
+    agent_parser.add_argument("--connect", required=True, help="host:port or unix:/path")
+    agent_parser.add_argument("--name", help="Agent name shown in reports")
+
+    local_parser = subparsers.add_parser("local", parents=[workload_parent],
+                                         help="Coordinator plus agents on localhost")
+    local_parser.add_argument("--agents", type=int, default=2, help="Number of local agents")
+
+    for subparser in (coordinator_parser, agent_parser, local_parser):
+        subparser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+
+    if args.mode == "agent":
+        Agent(args.connect, name=args.name).run()
+        return 0
+
+    workload = {
+        "weights": args.operation,
+        "processes": args.processes,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "duration_s": args.duration if args.duration or args.requests else 30,
+        "base_url": args.base_url
+    }
+    if args.mode == "local":
+        report = run_local(args.agents, workload, on_progress=print_progress)
+    else:
+        report = Coordinator(args.listen, args.agents, workload).run(on_progress=print_progress)
+    sys.stderr.write("\n")
+    print(format_report(report))
+    print()
+    print(format_agents(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if report["worker_errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
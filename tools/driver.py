@@ -0,0 +1,413 @@
+"""
+Multi-process load driver.
+
+Shards a workload across N worker processes so JSON and TLS work is not
+limited by a single GIL. Every process runs a pool of threads on one
+pooled httpx client; per-process latency histograms and counters are
+merged losslessly in the parent, which prints live aggregate progress.
+Ctrl-C stops the workers cleanly and still reports what was measured.
+
+Usage:
+    python -m tools.driver --operation get_booking --processes 8 --concurrency 32 --duration 60
+    python -m tools.driver --operation get_booking=8,create_booking=2 --requests 100000 \\
+        --base-url http://localhost:3001
+"""
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+
+from infra.stats import LatencyHistogram
+from tools.cli import configure_logging
+from tools.workloads import (OperationPicker, OperationStats, Session, TemplateSession, build_apis,
+                             parse_weights)
+
+logger = logging.getLogger(__name__)
+
+# Seconds workers get to report after Ctrl-C before they are terminated
+SHUTDOWN_GRACE_S = 10
+
+
+def run_worker(config, stop_event, progress=None):
+    """
+    Run one shard of the workload in the current process.
+
+    Args:
+        config: Dictionary with weights, concurrency, requests (per shard or
+                None), duration_s (or None), base_url, progress_interval and
+                corpus_size (send prebuilt request templates when set)
+        stop_event: Event that ends the shard early when set
+        progress: Optional callable(completed, errors) called periodically
+
+    Returns:
+        Dictionary with serialized histograms, statuses, completed, errors
+        and elapsed_s
+    """
+    concurrency = config["concurrency"]
+    booking_api, auth_api, ping_api, client = build_apis(config.get("base_url"), concurrency)
+    quota = config.get("requests")
+    tickets = itertools.count()
+    start = time.monotonic()
+    deadline = start + config["duration_s"] if config.get("duration_s") else None
+
+    def load_loop(stats):
+        if config.get("corpus_size"):
+            session = TemplateSession(booking_api, auth_api, ping_api,
+                                      corpus_size=config["corpus_size"])
+        else:
+            session = Session(booking_api, auth_api, ping_api)
+        picker = OperationPicker(config["weights"])
+        while not stop_event.is_set():
+            if quota is not None and next(tickets) >= quota:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            operation = picker.pick()
+            try:
+                response, latency_ms = session.run(operation)
+                stats.record(operation, str(response.status_code), latency_ms)
+            except Exception as e:
+                stats.record(operation, type(e).__name__, None)
+
+    thread_stats = [OperationStats() for _ in range(concurrency)]
+    threads = [threading.Thread(target=load_loop, args=(stats,), daemon=True)
+               for stats in thread_stats]
+    for thread in threads:
+        thread.start()
+
+    interval = config.get("progress_interval", 1.0)
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(interval)
+            if progress is not None:
+                progress(sum(s.completed for s in thread_stats),
+                         sum(s.errors for s in thread_stats))
+    client.close()
+
+    merged = OperationStats()
+    for stats in thread_stats:
+        merged.merge(stats)
+
+    result = merged.to_dict()
+    result["elapsed_s"] = time.monotonic() - start
+    return result
+
+
+def _process_main(worker_index, config, stop_event, result_queue):
+    """Entry point of a worker process."""
+    # The parent owns Ctrl-C and tells workers to stop via stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging(config.get("verbose", False))
+
+    def report_progress(completed, errors):
+        result_queue.put(("progress", worker_index, (completed, errors)))
+
+    try:
+        result = run_worker(config, stop_event, report_progress)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    result_queue.put(("result", worker_index, result))
+
+
+def merge_results(results):
+    """
+    Merge worker results losslessly.
+
+    Args:
+        results: Iterable of dictionaries returned by run_worker
+
+    Returns:
+        Dictionary with LatencyHistogram objects per operation, statuses,
+        completed, errors and worker_errors
+    """
+    merged = {"histograms": {}, "statuses": {}, "completed": 0, "errors": 0,
+              "worker_errors": []}
+    for result in results:
+        if "error" in result:
+            merged["worker_errors"].append(result["error"])
+            continue
+        for operation, data in result["histograms"].items():
+            histogram = LatencyHistogram.from_dict(data)
+            if operation in merged["histograms"]:
+                merged["histograms"][operation].merge(histogram)
+            else:
+                merged["histograms"][operation] = histogram
+        for operation, counts in result["statuses"].items():
+            target = merged["statuses"].setdefault(operation, {})
+            for status, count in counts.items():
+                target[status] = target.get(status, 0) + count
+        merged["completed"] += result["completed"]
+        merged["errors"] += result["errors"]
+    return merged
+
+
+def build_report(merged, elapsed_s, interrupted=False):
+    """
+    Turn merged worker results into a load report.
+
+    Args:
+        merged: Dictionary returned by merge_results
+        elapsed_s: Wall-clock duration of the run
+        interrupted: Whether the run was stopped early
+
+    Returns:
+        JSON serializable report dictionary
+    """
+    combined = LatencyHistogram()
+    for histogram in merged["histograms"].values():
+        combined.merge(histogram)
+
+    completed = merged["completed"]
+    return {
+        "elapsed_s": elapsed_s,
+        "interrupted": interrupted,
+        "requests": completed,
+        "throughput_rps": completed / elapsed_s if elapsed_s else 0.0,
+        "errors": merged["errors"],
+        "error_rate": merged["errors"] / completed if completed else 0.0,
+        "statuses": merged["statuses"],
+        "latency_ms": {
+            **{op: h.summary() for op, h in merged["histograms"].items()},
+            "all": combined.summary()
+        },
+        "histograms": {op: h.to_dict() for op, h in merged["histograms"].items()},
+        "worker_errors": merged["worker_errors"]
+    }
+
+
+def format_report(report):
+    """
+    Render a load report as text.
+
+    Args:
+        report: Dictionary returned by build_report
+
+    Returns:
+        Multi-line string
+    """
+    lines = [
+        f"{report['requests']} requests in {report['elapsed_s']:.1f}s "
+        f"= {report['throughput_rps']:.1f} req/s, "
+        f"errors {report['errors']} ({report['error_rate']:.2%})"
+        + (" [interrupted]" if report["interrupted"] else ""),
+        "",
+        f"{'operation':<24} {'count':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  statuses"
+    ]
+    for operation, summary in report["latency_ms"].items():
+        if not summary["count"]:
+            continue
+        statuses = report["statuses"].get(operation, {})
+        status_text = ", ".join(f"{key}:{value}" for key, value in sorted(statuses.items()))
+        lines.append(
+            f"{operation:<24} {summary['count']:>8} {summary['p50']:>8.1f} "
+            f"{summary['p90']:>8.1f} {summary['p99']:>8.1f} {summary['max']:>8.1f}  {status_text}"
+        )
+    for error in report["worker_errors"]:
+        lines.append(f"WORKER FAILED: {error}")
+    return "\n".join(lines)
+
+
+class LoadDriver:
+    """
+    Runs a workload across a pool of worker processes.
+    """
+
+    def __init__(self, weights, processes=None, concurrency=16, requests=None,
+                 duration_s=None, base_url=None, progress_interval=1.0, verbose=False,
+                 corpus_size=None):
+        """
+        Initialize the driver.
+
+        Args:
+            weights: Dictionary mapping operation name to weight
+            processes: Number of worker processes (default: CPU count)
+            concurrency: Threads per worker process
+            requests: Total number of requests (split across workers)
+            duration_s: Run duration in seconds (used when requests is None)
+            base_url: Target base URL (default: BaseApi default)
+            progress_interval: Seconds between progress updates
+            verbose: Keep per-request logging enabled in the workers
+            corpus_size: Send prebuilt request templates from a corpus of
+                         this many payloads per write operation (optional)
+        """
+        if requests is None and duration_s is None:
+            raise ValueError("Either requests or duration_s must be set")
+
+        self.weights = weights
+        self.processes = processes or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration_s = duration_s
+        self.base_url = base_url
+        self.progress_interval = progress_interval
+        self.verbose = verbose
+        self.corpus_size = corpus_size
+        self._stop_event = None
+
+    def stop(self):
+        """
+        Ask a running driver to stop its workers and report early.
+        """
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def _shard_configs(self):
+        """Split the workload into one config per worker process."""
+        configs = []
+        for index in range(self.processes):
+            shard_requests = None
+            if self.requests is not None:
+                shard_requests = self.requests // self.processes
+                if index < self.requests % self.processes:
+                    shard_requests += 1
+            configs.append({
+                "weights": self.weights,
+                "concurrency": self.concurrency,
+                "requests": shard_requests,
+                "duration_s": self.duration_s,
+                "base_url": self.base_url,
+                "progress_interval": self.progress_interval,
+                "verbose": self.verbose,
+                "corpus_size": self.corpus_size
+            })
+        return configs
+
+    def run(self, on_progress=None):
+        """
+        Start the workers, follow their progress and merge their results.
+
+        Args:
+            on_progress: Optional callable(elapsed_s, completed, errors)
+
+        Returns:
+            Report dictionary (see build_report)
+        """
+        # Workers start from a fresh interpreter: a forked child could inherit
+        # locks held by other threads of the parent (logging, agent sockets)
+        context = multiprocessing.get_context("spawn")
+        stop_event = self._stop_event = context.Event()
+        result_queue = context.Queue()
+        processes = [
+            context.Process(target=_process_main, args=(index, config, stop_event, result_queue),
+                            name=f"load-worker-{index}", daemon=True)
+            for index, config in enumerate(self._shard_configs())
+        ]
+
+        start = time.monotonic()
+        for process in processes:
+            process.start()
+
+        progress = {}
+        results = {}
+        interrupted = False
+        try:
+            self._collect(processes, result_queue, progress, results, start, on_progress)
+            interrupted = stop_event.is_set()
+        except KeyboardInterrupt:
+            interrupted = True
+            logger.warning("Interrupted, waiting for workers to report")
+            stop_event.set()
+            try:
+                self._collect(processes, result_queue, progress, results, start, on_progress,
+                              timeout_s=SHUTDOWN_GRACE_S)
+            except KeyboardInterrupt:
+                pass
+        finally:
+            stop_event.set()
+            for process in processes:
+                process.join(1)
+                if process.is_alive():
+                    process.terminate()
+
+        elapsed_s = time.monotonic() - start
+        return build_report(merge_results(results.values()), elapsed_s, interrupted)
+
+    def _collect(self, processes, result_queue, progress, results, start, on_progress,
+                 timeout_s=None):
+        """Read worker messages until every worker reported or time runs out."""
+        deadline = time.monotonic() + timeout_s if timeout_s is not None else None
+        last_update = 0.0
+        while len(results) < len(processes):
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            try:
+                kind, index, payload = result_queue.get(timeout=self.progress_interval)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes):
+                    # Drain whatever the dead workers managed to send
+                    if result_queue.empty():
+                        return
+                continue
+
+            if kind == "progress":
+                progress[index] = payload
+            else:
+                results[index] = payload
+                if "error" not in payload:
+                    progress[index] = (payload["completed"], payload["errors"])
+
+            now = time.monotonic()
+            if on_progress is not None and (now - last_update >= self.progress_interval
+                                            or len(results) == len(processes)):
+                last_update = now
+                on_progress(now - start,
+                            sum(c for c, _ in progress.values()),
+                            sum(e for _, e in progress.values()))
+
+
+def print_progress(elapsed_s, completed, errors):
+    """
+    Print a single, continuously updated progress line to stderr.
+    """
+    rate = completed / elapsed_s if elapsed_s else 0.0
+    sys.stderr.write(f"\r{elapsed_s:7.1f}s  requests={completed:<10} "
+                     f"rate={rate:>9.1f}/s  errors={errors:<8}")
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Multi-process load driver.")
+    parser.add_argument("--operation", type=parse_weights, default=parse_weights("get_booking"),
+                        help="Operation or weighted mix, e.g. get_booking=8,create_booking=2")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Threads per process")
+    parser.add_argument("--requests", type=int, help="Total number of requests")
+    parser.add_argument("--duration", type=float, help="Run duration in seconds (default: 30)")
+    parser.add_argument("--base-url", help="Target base URL")
+    parser.add_argument("--corpus", type=int, dest="corpus_size",
+                        help="Send prebuilt request templates from N payloads per write operation")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    duration_s = args.duration if args.duration or args.requests else 30
+
+    driver = LoadDriver(args.operation, processes=args.processes, concurrency=args.concurrency,
+                        requests=args.requests, duration_s=duration_s,
+                        base_url=args.base_url, verbose=args.verbose,
+                        corpus_size=args.corpus_size)
+    report = driver.run(on_progress=print_progress)
+    sys.stderr.write("\n")
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if report["worker_errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
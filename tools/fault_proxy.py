@@ -0,0 +1,53 @@
+"""
+Run the fault-injecting proxy standalone.
+
+Point any client or load tool at the proxy URL (--base-url) and script
+faults in a JSON or YAML rules file; see scenarios/faults_degraded.json.
+
+Usage:
+    python -m tools.fault_proxy --rules scenarios/faults_degraded.json --port 8080
+    python -m tools.driver --base-url http://127.0.0.1:8080 --operation get_booking --duration 60
+"""
+import argparse
+import logging
+import time
+
+from infra.base_api import BASE_URL_ENV, default_base_url
+from infra.fault_proxy import FaultProxy
+from tools.cli import configure_logging
+from tools.scenario import load_document
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Fault- and latency-injecting proxy.")
+    parser.add_argument("--target", default=default_base_url(),
+                        help=f"Base URL to forward to (default: ${BASE_URL_ENV} or the public API)")
+    parser.add_argument("--rules", help="JSON/YAML file with a list of fault rules")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--seed", type=int, help="Seed for probabilities and latency draws")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    rules = load_document(args.rules)["rules"] if args.rules else []
+    proxy = FaultProxy(args.target, rules=rules, host=args.host, port=args.port, seed=args.seed)
+    proxy.start()
+    logger.info(f"Proxying {proxy.url} -> {args.target} with {len(proxy.rules)} rules, Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+    logger.info(f"Forwarded {proxy.forwarded} requests, injected {proxy.injected}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
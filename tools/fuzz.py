@@ -0,0 +1,574 @@
+"""
+Property-based fuzzing of booking payloads.
+
+Every case starts from a valid booking (utils.test_data) and applies one
+to three random mutations: wrong types, missing keys, unicode, huge
+numbers, date edge cases, long strings and unexpected keys. Cases run
+concurrently through BookingApi and each response is classified as 2xx,
+4xx, 5xx, timeout or error (the connection failed: the server crashed or
+dropped it). Every 5xx and error case is shrunk to a minimal reproducer
+by repeatedly removing keys and simplifying values for as long as the
+server still fails the same way.
+
+A case is fully determined by its seed ("<run seed>-<index>"), so a run
+is reproduced with the same --seed and a single case with --replay-seed.
+Failures and their reproducers are written to the --findings file (JSON
+lines), which --replay re-runs.
+
+Usage:
+    python -m tools.fuzz --cases 5000 --concurrency 16
+    python -m tools.fuzz --seed 1234 --duration 60 --findings fuzz-findings.jsonl
+    python -m tools.fuzz --replay fuzz-findings.jsonl
+"""
+import argparse
+import copy
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from itertools import count
+
+import httpx
+
+from tools.cli import configure_logging
+from tools.workloads import build_apis
+from utils.test_data import generate_booking_data
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("create_booking", "update_booking")
+
+# Outcomes that are shrunk to a minimal reproducer
+FAILURE_OUTCOMES = ("5xx", "error")
+
+# Fields mutations pick from, nested ones as dotted paths
+FIELDS = ("firstname", "lastname", "totalprice", "depositpaid", "bookingdates",
+          "bookingdates.checkin", "bookingdates.checkout", "additionalneeds")
+STRING_FIELDS = ("firstname", "lastname", "additionalneeds")
+DATE_FIELDS = ("bookingdates.checkin", "bookingdates.checkout")
+
+TYPE_VALUES = (None, True, False, 0, -1, 3.14, "", "123", "true", [], [1, "a"], {}, {"a": 1})
+UNICODE_VALUES = ("Zoë", "Ñandú", "名前", "Ελληνικά", "עברית", "\u202eevil", "a\u200bb",
+                  "\u0000", "\ufeff", "😀" * 16, "é" * 8, "\ud800")
+HUGE_NUMBERS = (2 ** 31, 2 ** 63, -2 ** 63 - 1, 10 ** 100, 1e308, -1e308, 1e-300,
+                -1, float("inf"), float("-inf"), float("nan"))
+DATE_VALUES = ("2024-02-29", "2023-02-29", "2024-02-30", "2024-13-01", "2024-00-10",
+               "0000-00-00", "0001-01-01", "9999-12-31", "1970-01-01", "", "not-a-date",
+               "2024/01/01", "01-01-2024", "2024-01-01T25:61:00Z", 20240101)
+LONG_STRING_LENGTHS = (256, 4096, 65536)
+
+# Dates of the unmutated bookings, fixed so a seed gives the same case every day
+BASE_DATE = date(2030, 1, 1)
+
+
+def _get_parent(payload, path):
+    """Get the dictionary holding a dotted path and the last key, or (None, key)."""
+    *parents, key = path.split(".")
+    node = payload
+    for name in parents:
+        node = node.get(name) if isinstance(node, dict) else None
+    return (node if isinstance(node, dict) else None), key
+
+
+def _set_field(payload, path, value):
+    parent, key = _get_parent(payload, path)
+    if parent is None:
+        return False
+    parent[key] = value
+    return True
+
+
+def mutate_type(payload, rng):
+    """Give a field a value of another type."""
+    return _set_field(payload, rng.choice(FIELDS), copy.deepcopy(rng.choice(TYPE_VALUES)))
+
+
+def mutate_missing(payload, rng):
+    """Remove a required field."""
+    parent, key = _get_parent(payload, rng.choice(FIELDS))
+    if parent is None or key not in parent:
+        return False
+    del parent[key]
+    return True
+
+
+def mutate_unicode(payload, rng):
+    """Put unusual unicode into a string field."""
+    if rng.random() < 0.5:
+        value = rng.choice(UNICODE_VALUES)
+    else:
+        value = "".join(chr(rng.randint(0x80, 0x2FFFF)) for _ in range(rng.randint(1, 32)))
+        value = value.encode("utf-8", "replace").decode("utf-8", "replace")
+    return _set_field(payload, rng.choice(STRING_FIELDS), value)
+
+
+def mutate_huge_number(payload, rng):
+    """Set the price to an extreme number."""
+    return _set_field(payload, "totalprice", rng.choice(HUGE_NUMBERS))
+
+
+def mutate_date(payload, rng):
+    """Use an invalid or edge-case date, or check out before checking in."""
+    if rng.random() < 0.2:
+        parent, _ = _get_parent(payload, "bookingdates.checkin")
+        if parent is None or "checkin" not in parent or "checkout" not in parent:
+            return False
+        parent["checkin"], parent["checkout"] = parent["checkout"], parent["checkin"]
+        return True
+    return _set_field(payload, rng.choice(DATE_FIELDS), rng.choice(DATE_VALUES))
+
+
+def mutate_long_string(payload, rng):
+    """Make a string field very long."""
+    return _set_field(payload, rng.choice(STRING_FIELDS),
+                      rng.choice("AZaz09") * rng.choice(LONG_STRING_LENGTHS))
+
+
+def mutate_extra_key(payload, rng):
+    """Add a key the API does not know."""
+    parent = payload if rng.random() < 0.7 else payload.get("bookingdates")
+    if not isinstance(parent, dict):
+        return False
+    parent[rng.choice(("id", "bookingid", "__proto__", "admin", "x" * 64, ""))] = copy.deepcopy(
+        rng.choice(TYPE_VALUES + HUGE_NUMBERS[:3]))
+    return True
+
+
+MUTATIONS = {
+    "type": mutate_type,
+    "missing": mutate_missing,
+    "unicode": mutate_unicode,
+    "huge_number": mutate_huge_number,
+    "date": mutate_date,
+    "long_string": mutate_long_string,
+    "extra_key": mutate_extra_key
+}
+
+
+def generate_case(seed, max_mutations=3):
+    """
+    Generate one fuzz case.
+
+    Args:
+        seed: Case seed; the same seed always gives the same case
+        max_mutations: Most mutations applied to the valid booking
+
+    Returns:
+        Dictionary with seed, mutations (names) and payload
+    """
+    rng = random.Random(seed)
+    checkin = BASE_DATE + timedelta(days=rng.randint(0, 365))
+    payload = generate_booking_data(checkin=checkin.isoformat(),
+                                    checkout=(checkin + timedelta(days=rng.randint(1, 14))).isoformat(),
+                                    rng=rng)
+    applied = []
+    for _ in range(rng.randint(1, max_mutations)):
+        name = rng.choice(sorted(MUTATIONS))
+        if MUTATIONS[name](payload, rng):
+            applied.append(name)
+    return {"seed": seed, "mutations": applied, "payload": payload}
+
+
+def classify(status=None, error=None):
+    """
+    Classify the outcome of a request.
+
+    Args:
+        status: HTTP status code (if a response arrived)
+        error: Exception raised instead (if any)
+
+    Returns:
+        "2xx", "3xx", "4xx", "5xx", "timeout" or "error"
+    """
+    if error is not None:
+        return "timeout" if isinstance(error, httpx.TimeoutException) else "error"
+    return f"{status // 100}xx"
+
+
+def shrink_candidates(value):
+    """
+    Yield simpler variants of a JSON value, the most drastic first.
+
+    Args:
+        value: Payload or part of it
+
+    Yields:
+        Variants with a key or element removed, or a value simplified
+    """
+    if isinstance(value, dict):
+        for key in value:
+            yield {k: v for k, v in value.items() if k != key}
+        for key, item in value.items():
+            for candidate in shrink_candidates(item):
+                yield {**value, key: candidate}
+    elif isinstance(value, list):
+        for index in range(len(value)):
+            yield value[:index] + value[index + 1:]
+        for index, item in enumerate(value):
+            for candidate in shrink_candidates(item):
+                yield value[:index] + [candidate] + value[index + 1:]
+    elif isinstance(value, str):
+        if value:
+            yield ""
+        if len(value) > 1:
+            yield value[:len(value) // 2]
+            yield value[len(value) // 2:]
+    elif isinstance(value, bool) or value is None:
+        return
+    elif isinstance(value, (int, float)):
+        if value != 0:
+            yield 0
+        if isinstance(value, float) and not math.isfinite(value):
+            yield 1.0
+        elif abs(value) > 1:
+            yield value // 2 if isinstance(value, int) else value / 2
+
+
+def shrink(payload, still_fails, max_attempts=200):
+    """
+    Shrink a failing payload (greedy delta debugging).
+
+    Takes the first simpler variant that still fails and starts over from
+    it, until no variant fails or the attempts run out.
+
+    Args:
+        payload: Failing payload
+        still_fails: Callable(payload) telling whether a variant fails the same way
+        max_attempts: Most variants to try
+
+    Returns:
+        Tuple (smallest failing payload, attempts used)
+    """
+    current = payload
+    attempts = 0
+    improved = True
+    while improved and attempts < max_attempts:
+        improved = False
+        for candidate in shrink_candidates(current):
+            attempts += 1
+            if still_fails(candidate):
+                current = candidate
+                improved = True
+                break
+            if attempts >= max_attempts:
+                break
+    return current, attempts
+
+
+class Fuzzer:
+    """
+    Runs fuzz cases concurrently and shrinks the failures.
+    """
+
+    def __init__(self, booking_api, auth_api=None, operation="create_booking", seed=None,
+                 concurrency=8, max_mutations=3, max_shrink=10, shrink_attempts=200):
+        """
+        Args:
+            booking_api: BookingApi the cases are sent through
+            auth_api: AuthApi for the update_booking token
+            operation: create_booking or update_booking
+            seed: Run seed (default: random, reported so the run can be repeated)
+            concurrency: Cases in flight at once
+            max_mutations: Most mutations per case
+            max_shrink: Most distinct failures to shrink
+            shrink_attempts: Most requests spent shrinking one failure
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}', expected one of {OPERATIONS}")
+        self.booking_api = booking_api
+        self.auth_api = auth_api
+        self.operation = operation
+        self.seed = seed if seed is not None else random.randrange(10 ** 9)
+        self.concurrency = concurrency
+        self.max_mutations = max_mutations
+        self.max_shrink = max_shrink
+        self.shrink_attempts = shrink_attempts
+        self._booking_id = None
+        self._token = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Stop a running fuzz session after the cases in flight."""
+        self._stop_event.set()
+
+    def _prepare(self):
+        if self.operation != "update_booking" or self._booking_id is not None:
+            return
+        response = self.booking_api.create_booking(generate_booking_data())
+        self._booking_id = response.json()["bookingid"]
+        self._token = self.auth_api.create_token().json()["token"]
+
+    def send(self, payload):
+        """
+        Send one payload.
+
+        Returns:
+            Tuple (outcome, status) where status is the HTTP status code,
+            or the exception class name if no response arrived
+        """
+        try:
+            if self.operation == "create_booking":
+                response = self.booking_api.create_booking(payload)
+            else:
+                response = self.booking_api.update_booking(self._booking_id, payload, self._token)
+        except httpx.HTTPError as e:
+            return classify(error=e), type(e).__name__
+        return classify(response.status_code), response.status_code
+
+    def run_case(self, seed):
+        """
+        Generate and send one case.
+
+        Args:
+            seed: Case seed
+
+        Returns:
+            Case dictionary plus outcome, status and latency_ms
+        """
+        case = generate_case(seed, self.max_mutations)
+        start = time.perf_counter()
+        case["outcome"], case["status"] = self.send(case["payload"])
+        case["latency_ms"] = (time.perf_counter() - start) * 1000
+        return case
+
+    def shrink_case(self, case):
+        """
+        Shrink a failing case to a minimal reproducer.
+
+        Args:
+            case: Case dictionary returned by run_case
+
+        Returns:
+            Dictionary with payload, outcome, status and attempts
+        """
+        def still_fails(payload):
+            return self.send(payload) == (case["outcome"], case["status"])
+
+        payload, attempts = shrink(case["payload"], still_fails, self.shrink_attempts)
+        return {"payload": payload, "outcome": case["outcome"], "status": case["status"],
+                "attempts": attempts}
+
+    def run(self, cases=None, duration_s=None, seeds=None, on_progress=None):
+        """
+        Run a fuzz session.
+
+        Args:
+            cases: Number of cases (when neither seeds nor duration_s limit the run)
+            duration_s: Seconds to run for
+            seeds: Explicit case seeds to run instead of generated ones
+            on_progress: Optional callable(done, outcomes) called every 100 cases
+
+        Returns:
+            Report dictionary with seed, cases, elapsed_s, cases_per_minute,
+            outcomes, by_mutation, failures (with reproducers) and interrupted
+        """
+        self._prepare()
+        if seeds is not None:
+            seed_iter = iter(seeds)
+        else:
+            limit = cases if cases is not None or duration_s is not None else 1000
+            seed_iter = (f"{self.seed}-{index}" for index in
+                         (range(limit) if limit is not None else count()))
+        outcomes = Counter()
+        by_mutation = {}
+        failures = []
+        done = 0
+        interrupted = False
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = set()
+            try:
+                while not self._stop_event.is_set():
+                    if duration_s is not None and time.monotonic() - start >= duration_s:
+                        break
+                    while len(pending) < self.concurrency * 2:
+                        seed = next(seed_iter, None)
+                        if seed is None:
+                            break
+                        pending.add(executor.submit(self.run_case, seed))
+                    if not pending:
+                        break
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        case = future.result()
+                        done += 1
+                        outcomes[case["outcome"]] += 1
+                        for name in set(case["mutations"]) or {"none"}:
+                            by_mutation.setdefault(name, Counter())[case["outcome"]] += 1
+                        if case["outcome"] in FAILURE_OUTCOMES:
+                            failures.append(case)
+                        if on_progress is not None and done % 100 == 0:
+                            on_progress(done, outcomes)
+            except KeyboardInterrupt:
+                logger.warning("Interrupted, shrinking the failures found so far")
+                interrupted = True
+            self._stop_event.set()
+            for future in pending:
+                future.cancel()
+        elapsed_s = time.monotonic() - start
+
+        # Shrink one case per distinct failure signature
+        shrunk = set()
+        for case in failures:
+            signature = (case["outcome"], case["status"], tuple(sorted(case["mutations"])))
+            if signature in shrunk or len(shrunk) >= self.max_shrink:
+                continue
+            shrunk.add(signature)
+            case["reproducer"] = self.shrink_case(case)
+
+        return {
+            "seed": self.seed,
+            "operation": self.operation,
+            "cases": done,
+            "elapsed_s": elapsed_s,
+            "cases_per_minute": done / elapsed_s * 60 if elapsed_s else 0.0,
+            "outcomes": dict(outcomes),
+            "by_mutation": {name: dict(counts) for name, counts in sorted(by_mutation.items())},
+            "failures": failures,
+            "interrupted": interrupted
+        }
+
+
+def save_findings(report, path):
+    """
+    Append a run's failures to a findings file (JSON lines).
+
+    Args:
+        report: Dictionary returned by Fuzzer.run
+        path: Findings file path
+
+    Returns:
+        Number of findings written
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        for case in report["failures"]:
+            f.write(json.dumps({"run_seed": report["seed"], "operation": report["operation"],
+                                **case}) + "\n")
+    return len(report["failures"])
+
+
+def load_seeds(path):
+    """
+    Read the case seeds recorded in a findings file.
+
+    Args:
+        path: Findings file written by save_findings
+
+    Returns:
+        Dictionary mapping the operation each finding was fuzzed with to
+        its case seeds, without duplicates
+    """
+    seeds = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                finding = json.loads(line)
+                operation_seeds = seeds.setdefault(finding["operation"], [])
+                if finding["seed"] not in operation_seeds:
+                    operation_seeds.append(finding["seed"])
+    return seeds
+
+
+def format_report(report):
+    """
+    Format a fuzz report.
+
+    Args:
+        report: Dictionary returned by Fuzzer.run
+
+    Returns:
+        Multi-line string
+    """
+    outcome_names = sorted({name for counts in report["by_mutation"].values() for name in counts})
+    lines = [
+        f"Fuzzed {report['operation']}: {report['cases']} cases in {report['elapsed_s']:.1f}s "
+        f"({report['cases_per_minute']:.0f}/min), seed {report['seed']}"
+        + (" - interrupted" if report["interrupted"] else ""),
+        "  ".join(f"{name}={count}" for name, count in sorted(report["outcomes"].items())),
+        "",
+        f"{'mutation':<14}" + "".join(f"{name:>9}" for name in outcome_names)
+    ]
+    for name, counts in report["by_mutation"].items():
+        lines.append(f"{name:<14}" + "".join(f"{counts.get(outcome, 0):>9}"
+                                             for outcome in outcome_names))
+    reproducers = {}
+    for case in report["failures"]:
+        if "reproducer" in case:
+            reproducer = case["reproducer"]
+            key = (str(reproducer["status"]), json.dumps(reproducer["payload"]))
+            reproducers.setdefault(key, []).append(case["seed"])
+    if reproducers:
+        lines.append("")
+        lines.append(f"{len(report['failures'])} failures, minimal reproducers:")
+        for (status, payload), seeds in reproducers.items():
+            lines.append(f"  {status}: {payload[:200]}  (seeds {', '.join(seeds)})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Fuzz booking payloads.")
+    parser.add_argument("--cases", type=int, help="Number of cases (default: 1000)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead")
+    parser.add_argument("--seed", type=int, help="Run seed (default: random)")
+    parser.add_argument("--replay-seed", action="append", dest="replay_seeds",
+                        help="Run only this case seed, e.g. 1234-56 (repeatable)")
+    parser.add_argument("--replay", dest="replay_path",
+                        help="Re-run every case recorded in a findings file")
+    parser.add_argument("--operation", choices=OPERATIONS, default="create_booking")
+    parser.add_argument("--concurrency", type=int, default=8, help="Cases in flight at once")
+    parser.add_argument("--max-mutations", type=int, default=3, help="Most mutations per case")
+    parser.add_argument("--max-shrink", type=int, default=10,
+                        help="Most distinct failures to shrink")
+    parser.add_argument("--findings", dest="findings_path",
+                        help="Append failures and reproducers to this JSON lines file")
+    parser.add_argument("--base-url", help="Target base URL")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    # Operation -> seeds to replay (None: generate new cases); findings are
+    # replayed with the operation they were found with
+    runs = {args.operation: None}
+    if args.replay_seeds or args.replay_path:
+        runs = {args.operation: args.replay_seeds} if args.replay_seeds else {}
+        if args.replay_path:
+            for operation, seeds in load_seeds(args.replay_path).items():
+                runs[operation] = list(dict.fromkeys((runs.get(operation) or []) + seeds))
+    booking_api, auth_api, _, client = build_apis(args.base_url, args.concurrency)
+    reports = []
+    try:
+        for operation, seeds in runs.items():
+            fuzzer = Fuzzer(booking_api, auth_api, operation=operation, seed=args.seed,
+                            concurrency=args.concurrency, max_mutations=args.max_mutations,
+                            max_shrink=args.max_shrink)
+            logger.info(f"Fuzzing {operation} with seed {fuzzer.seed}")
+            reports.append(fuzzer.run(cases=args.cases, duration_s=args.duration, seeds=seeds,
+                                      on_progress=lambda done, outcomes: logger.info(
+                                          f"{done} cases: {dict(outcomes)}")))
+    finally:
+        client.close()
+    print("\n\n".join(format_report(report) for report in reports))
+
+    for report in reports:
+        if args.findings_path and report["failures"]:
+            count = save_findings(report, args.findings_path)
+            logger.info(f"Wrote {count} findings to {args.findings_path}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports[0] if len(reports) == 1 else reports, f, indent=2)
+
+    return 1 if any(report["failures"] for report in reports) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
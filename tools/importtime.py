@@ -0,0 +1,151 @@
+"""
+Import-time (cold start) measurement of the client packages.
+
+Runs a fresh interpreter with `python -X importtime -c "import ..."` and
+parses its report. The cold start cost of a set of imports is the summed
+self time of every module they load that a bare interpreter does not
+(`python -X importtime -c pass`). Each measurement is repeated and the
+per-module minimum is kept, which filters out scheduling noise.
+
+Usage:
+    python -m tools.importtime
+    python -m tools.importtime logic.booking_api tools.scenario --top 15
+    python -m tools.importtime --budget-ms 40 --forbid httpx
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a test module or xdist worker imports before sending its first request
+DEFAULT_MODULES = ("logic.auth_api", "logic.booking_api", "logic.ping_api", "utils.test_data")
+
+
+def parse_importtime(text):
+    """
+    Parse the stderr of `python -X importtime`.
+
+    Args:
+        text: Report text
+
+    Returns:
+        Dictionary mapping module name to (self_us, cumulative_us), in
+        import order
+    """
+    timings = {}
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        timings.setdefault(fields[2].strip(), (int(fields[0]), int(fields[1])))
+    return timings
+
+
+def _run_importtime(statement):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+def measure_imports(modules=DEFAULT_MODULES, runs=5):
+    """
+    Measure the cold start cost of importing some modules.
+
+    Args:
+        modules: Module names imported together in a fresh interpreter
+        runs: Measurements; the per-module minimum is kept
+
+    Returns:
+        Dictionary with modules, total_ms (summed self time of the
+        modules added by the imports) and loaded ({module: self_ms},
+        slowest first)
+    """
+    baseline = set(_run_importtime("pass"))
+    loaded = {}
+    for _ in range(runs):
+        for module, (self_us, _) in _run_importtime(f"import {', '.join(modules)}").items():
+            if module not in baseline:
+                loaded[module] = min(loaded.get(module, self_us), self_us)
+    ordered = dict(sorted(((module, self_us / 1000) for module, self_us in loaded.items()),
+                          key=lambda item: item[1], reverse=True))
+    return {
+        "modules": list(modules),
+        "total_ms": sum(ordered.values()),
+        "loaded": ordered
+    }
+
+
+def check_budget(report, budget_ms=None, forbidden=()):
+    """
+    Check an import measurement against a budget.
+
+    Args:
+        report: Dictionary returned by measure_imports
+        budget_ms: Maximum total_ms (optional)
+        forbidden: Top-level packages that must not be loaded (e.g. httpx)
+
+    Returns:
+        List of violation messages, empty if within budget
+    """
+    violations = []
+    if budget_ms is not None and report["total_ms"] > budget_ms:
+        violations.append(f"importing {', '.join(report['modules'])} took "
+                          f"{report['total_ms']:.1f}ms, budget {budget_ms}ms")
+    for package in forbidden:
+        loaded = [module for module in report["loaded"]
+                  if module == package or module.startswith(package + ".")]
+        if loaded:
+            violations.append(f"{package} is imported eagerly ({len(loaded)} modules)")
+    return violations
+
+
+def format_report(report, top=10):
+    """
+    Format an import measurement with its slowest modules.
+
+    Args:
+        report: Dictionary returned by measure_imports
+        top: Number of modules to list
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"import {', '.join(report['modules'])}: {report['total_ms']:.1f}ms, "
+             f"{len(report['loaded'])} modules loaded"]
+    for module, self_ms in list(report["loaded"].items())[:top]:
+        lines.append(f"{self_ms:>9.2f}ms  {module}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Measure the import time of project modules.")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES),
+                        help="Modules to import together (default: the API clients)")
+    parser.add_argument("--runs", type=int, default=5, help="Measurements, the minimum is kept")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="Exit with 1 above this total")
+    parser.add_argument("--forbid", action="append", default=[],
+                        help="Package that must not be imported (repeatable)")
+    args = parser.parse_args(argv)
+
+    report = measure_imports(args.modules, args.runs)
+    print(format_report(report, args.top))
+    violations = check_budget(report, args.budget_ms, args.forbid)
+    for violation in violations:
+        print(f"OVER BUDGET {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,305 @@
+"""
+Corpus-driven injection scanner with round-trip fidelity checks.
+
+Streams a payload corpus (XSS, SQL injection, template injection, unicode
+normalization, ...) from disk line by line. Each payload is put into one
+booking field, sent with create_booking and read back with get_booking,
+with bounded concurrency. The stored value is then compared with the sent
+one in batches, giving one outcome per payload and field:
+
+    intact        stored exactly as sent
+    escaped       stored HTML-, URL- or backslash-escaped
+    normalized    stored as a unicode normalization (NFC/NFD/NFKC/NFKD) of it
+    mutated       stored changed in some other way (stripped, truncated, ...)
+    rejected      create_booking answered 4xx
+    server_error  create_booking answered 5xx or the connection failed
+    missing       created, but the field could not be read back
+
+Only one batch is held in memory at a time, and every result is appended
+to the --output file (JSON lines) as soon as its batch is compared, so
+corpora of any size can be scanned.
+
+Corpus format: one "<class><TAB><payload>" per line; a payload that is a
+valid JSON string ("...") is decoded first; # starts a comment line.
+
+Usage:
+    python -m tools.injection_scan corpora/injection.txt
+    python -m tools.injection_scan big-corpus.txt --fields firstname,additionalneeds \\
+        --concurrency 16 --output scan-results.jsonl --cleanup
+"""
+import argparse
+import html
+import json
+import logging
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import unquote
+
+import httpx
+
+from tools.cli import configure_logging
+from tools.consistency import parse_list
+from tools.workloads import build_apis
+from utils.test_data import generate_booking_data
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_FIELDS = ("firstname", "lastname", "additionalneeds")
+
+OUTCOMES = ("intact", "escaped", "normalized", "mutated", "rejected", "server_error", "missing")
+
+NORMALIZATION_FORMS = ("NFC", "NFD", "NFKC", "NFKD")
+
+
+def iter_corpus(path):
+    """
+    Stream corpus entries from disk.
+
+    Args:
+        path: Corpus file path
+
+    Yields:
+        Dictionary with line (number), class and payload
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            payload_class, separator, payload = line.partition("\t")
+            if not separator:
+                payload_class, payload = "uncategorized", line
+            if len(payload) > 1 and payload.startswith('"') and payload.endswith('"'):
+                try:
+                    payload = json.loads(payload)
+                except json.JSONDecodeError:
+                    pass  # a payload that merely starts and ends with quotes
+            yield {"line": line_number, "class": payload_class, "payload": payload}
+
+
+def compare(sent, stored):
+    """
+    Classify how a stored value relates to the sent one.
+
+    Args:
+        sent: Value sent with create_booking
+        stored: Value returned by get_booking
+
+    Returns:
+        "intact", "escaped", "normalized" or "mutated"
+    """
+    if stored == sent:
+        return "intact"
+    if not isinstance(stored, str):
+        return "mutated"
+    if (html.unescape(stored) == sent or unquote(stored) == sent
+            or stored in (json.dumps(sent)[1:-1], sent.encode("unicode_escape").decode("ascii"))):
+        return "escaped"
+    if any(unicodedata.normalize(form, sent) == stored for form in NORMALIZATION_FORMS):
+        return "normalized"
+    return "mutated"
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class InjectionScanner:
+    """
+    Pushes corpus payloads through create/get and records what the API stores.
+    """
+
+    def __init__(self, booking_api, fields=PAYLOAD_FIELDS, concurrency=8, batch_size=200,
+                 token=None):
+        """
+        Args:
+            booking_api: BookingApi used for every request
+            fields: Booking fields each payload is tried in
+            concurrency: Round-trips in flight at once
+            batch_size: Probes compared and written per batch
+            token: Auth token; if given, probe bookings are deleted afterwards
+        """
+        self.booking_api = booking_api
+        self.fields = tuple(fields)
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.token = token
+
+    def probe(self, entry, field):
+        """
+        Create a booking with the payload in one field and read it back.
+
+        Args:
+            entry: Corpus entry from iter_corpus
+            field: Booking field to put the payload in
+
+        Returns:
+            Dictionary with the entry, field, status and stored value (the
+            outcome is filled in by compare_batch)
+        """
+        result = {"line": entry["line"], "class": entry["class"], "field": field,
+                  "sent": entry["payload"], "status": None, "stored": None, "found": False}
+        booking_data = generate_booking_data()
+        booking_data[field] = entry["payload"]
+        try:
+            response = self.booking_api.create_booking(booking_data)
+            result["status"] = response.status_code
+            if response.status_code >= 400:
+                return result
+            booking_id = response.json()["bookingid"]
+            stored = self.booking_api.get_booking(booking_id)
+            if stored.status_code == 200:
+                body = stored.json()
+                result["found"] = field in body
+                result["stored"] = body.get(field)
+            if self.token is not None:
+                self.booking_api.delete_booking(booking_id, self.token)
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            result["error"] = type(e).__name__
+        return result
+
+    @staticmethod
+    def compare_batch(results):
+        """
+        Give every probe of a batch its outcome.
+
+        Args:
+            results: Probe dictionaries returned by probe
+
+        Returns:
+            The same dictionaries, with "outcome" set
+        """
+        for result in results:
+            status = result["status"]
+            if status is None or status >= 500:
+                result["outcome"] = "server_error"
+            elif status >= 400:
+                result["outcome"] = "rejected"
+            elif not result["found"]:
+                result["outcome"] = "missing"
+            else:
+                result["outcome"] = compare(result["sent"], result["stored"])
+        return results
+
+    def scan(self, entries, output=None, on_batch=None):
+        """
+        Scan a stream of corpus entries.
+
+        Args:
+            entries: Iterable of corpus entries (e.g. iter_corpus(path))
+            output: Writable text file receiving one JSON line per probe (optional)
+            on_batch: Optional callable(probes_done, summary) after every batch
+
+        Returns:
+            Report dictionary with entries, probes, elapsed_s, summary
+            ({class: {field: {outcome: count}}}) and interrupted
+        """
+        summary = {}
+        entries_done = 0
+        probes_done = 0
+        interrupted = False
+        start = time.monotonic()
+        probes = ((entry, field) for entry in entries for field in self.fields)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                for batch in batched(probes, self.batch_size):
+                    results = self.compare_batch(
+                        list(executor.map(lambda probe: self.probe(*probe), batch)))
+                    for result in results:
+                        counts = summary.setdefault(result["class"], {}).setdefault(
+                            result["field"], dict.fromkeys(OUTCOMES, 0))
+                        counts[result["outcome"]] += 1
+                        if output is not None:
+                            if result["outcome"] == "intact":
+                                result.pop("stored")
+                            output.write(json.dumps(result) + "\n")
+                    if output is not None:
+                        output.flush()
+                    probes_done += len(results)
+                    entries_done = probes_done // len(self.fields)
+                    if on_batch is not None:
+                        on_batch(probes_done, summary)
+            except KeyboardInterrupt:
+                logger.warning("Interrupted, reporting the batches compared so far")
+                interrupted = True
+
+        return {
+            "entries": entries_done,
+            "probes": probes_done,
+            "fields": list(self.fields),
+            "elapsed_s": time.monotonic() - start,
+            "summary": summary,
+            "interrupted": interrupted
+        }
+
+
+def format_report(report):
+    """
+    Format a scan report as a class x field table of outcomes.
+
+    Args:
+        report: Dictionary returned by InjectionScanner.scan
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"Scanned {report['entries']} payloads x {len(report['fields'])} fields "
+             f"({report['probes']} round-trips) in {report['elapsed_s']:.1f}s"
+             + (" - interrupted" if report["interrupted"] else ""),
+             f"{'class':<12}{'field':<17}" + "".join(f"{outcome:>13}" for outcome in OUTCOMES)]
+    for payload_class, fields in sorted(report["summary"].items()):
+        for field, counts in fields.items():
+            lines.append(f"{payload_class:<12}{field:<17}"
+                         + "".join(f"{counts[outcome]:>13}" for outcome in OUTCOMES))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Scan how the API stores injection payloads.")
+    parser.add_argument("corpus", help="Payload corpus file (<class><TAB><payload> per line)")
+    parser.add_argument("--fields", type=parse_list, default=list(PAYLOAD_FIELDS),
+                        help="Comma separated booking fields to try every payload in")
+    parser.add_argument("--concurrency", type=int, default=8, help="Round-trips in flight at once")
+    parser.add_argument("--batch-size", type=int, default=200, help="Probes compared per batch")
+    parser.add_argument("--output", help="Append every result to this JSON lines file")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the probe bookings")
+    parser.add_argument("--base-url", help="Target base URL")
+    parser.add_argument("--json", dest="json_path", help="Write the summary report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    booking_api, auth_api, _, client = build_apis(args.base_url, args.concurrency)
+    token = auth_api.create_token().json()["token"] if args.cleanup else None
+    scanner = InjectionScanner(booking_api, fields=args.fields, concurrency=args.concurrency,
+                               batch_size=args.batch_size, token=token)
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+    try:
+        report = scanner.scan(iter_corpus(args.corpus), output=output,
+                              on_batch=lambda done, _: logger.info(f"{done} round-trips compared"))
+    finally:
+        if output is not None:
+            output.close()
+        client.close()
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,306 @@
+"""
+Latency vs. payload size sweep.
+
+Sends bookings of growing size (1KB up to tens of MB by default) through
+BookingApi.create_booking or update_booking. Bodies are BookingStreams:
+the padded JSON is generated chunk by chunk while it is uploaded, so the
+client never holds a whole body in memory (--materialize builds the full
+bytes first, for comparison). Every size bucket reports latency, upload
+throughput, the client's peak memory and the statuses seen, and the
+sweep names the first size that failed: where the API or the client
+falls over.
+
+Usage:
+    python -m tools.payload_sweep
+    python -m tools.payload_sweep --sizes 1KB,1MB,16MB,64MB --operation update_booking --repeats 3
+    python -m tools.payload_sweep --chunked --json payload-sweep.json
+"""
+import argparse
+import json
+import logging
+import time
+import tracemalloc
+from collections import Counter
+
+import httpx
+
+from infra.metrics import is_error_status
+from infra.stats import summarize_latencies
+from logic.auth_api import AuthApi
+from logic.booking_api import BookingApi
+from tools.cli import configure_logging
+from tools.consistency import parse_list
+from utils.test_data import BookingStream, generate_booking_data
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = "1KB,10KB,100KB,1MB,4MB,16MB,32MB"
+
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+OPERATIONS = ("create_booking", "update_booking")
+
+
+def parse_size(text):
+    """
+    Parse a size such as 512, 10KB or 1.5MB (binary units).
+
+    Args:
+        text: Size with an optional B/KB/MB/GB suffix
+
+    Returns:
+        Size in bytes
+    """
+    value = text.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(value)
+
+
+def format_size(size_bytes):
+    """Format a byte count with the largest fitting binary unit."""
+    for unit in ("GB", "MB", "KB"):
+        if size_bytes >= SIZE_UNITS[unit]:
+            return f"{size_bytes / SIZE_UNITS[unit]:g}{unit}"
+    return f"{size_bytes}B"
+
+
+class PayloadSweep:
+    """
+    Measures one operation over a range of body sizes.
+    """
+
+    def __init__(self, booking_api, auth_api, sizes, operation="create_booking", repeats=5,
+                 chunk_size=65536, chunked=False, materialize=False, stop_after_failure=True):
+        """
+        Args:
+            booking_api: BookingApi used for the measured requests
+            auth_api: AuthApi used for the update_booking token
+            sizes: Body sizes in bytes, measured in ascending order
+            operation: create_booking or update_booking
+            repeats: Timed requests per size
+            chunk_size: Bytes per streamed chunk
+            chunked: Send with chunked transfer encoding instead of Content-Length
+            materialize: Build the whole body in memory before sending
+            stop_after_failure: Skip larger sizes once every request of a size failed
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}', expected one of {OPERATIONS}")
+        self.booking_api = booking_api
+        self.auth_api = auth_api
+        self.sizes = sorted(sizes)
+        self.operation = operation
+        self.repeats = repeats
+        self.chunk_size = chunk_size
+        self.chunked = chunked
+        self.materialize = materialize
+        self.stop_after_failure = stop_after_failure
+        self._booking_id = None
+        self._token = None
+
+    def _prepare(self):
+        """Create the booking and token update_booking needs."""
+        if self.operation != "update_booking" or self._booking_id is not None:
+            return
+        response = self.booking_api.create_booking(generate_booking_data())
+        self._booking_id = response.json()["bookingid"]
+        self._token = self.auth_api.create_token().json()["token"]
+
+    def _body(self, size_bytes):
+        stream = BookingStream(size_bytes, chunk_size=self.chunk_size)
+        if self.materialize:
+            return b"".join(stream)
+        return iter(stream) if self.chunked else stream
+
+    def _send(self, size_bytes):
+        """
+        Send one request.
+
+        Returns:
+            Tuple (status, latency_ms) where status is the HTTP status code
+            as a string or the exception class name
+        """
+        start = time.perf_counter()
+        try:
+            # The body is built inside the timed window: generating it is
+            # part of what the client pays for a large upload
+            body = self._body(size_bytes)
+            if self.operation == "create_booking":
+                response = self.booking_api.create_booking(body)
+            else:
+                response = self.booking_api.update_booking(self._booking_id, body, self._token)
+            status = str(response.status_code)
+        except (httpx.HTTPError, MemoryError) as e:
+            status = type(e).__name__
+        return status, (time.perf_counter() - start) * 1000
+
+    def measure(self, size_bytes):
+        """
+        Measure one size bucket.
+
+        The first request runs under tracemalloc to find the client's peak
+        memory and is not timed; the following `repeats` requests are.
+
+        Args:
+            size_bytes: Body size in bytes
+
+        Returns:
+            Dictionary with size, requests, errors, statuses, latency_ms,
+            throughput_mb_s, requests_per_s and client_peak_mb
+        """
+        tracemalloc.start()
+        try:
+            first_status, _ = self._send(size_bytes)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        statuses = Counter([first_status])
+        latencies = []
+        for _ in range(self.repeats):
+            status, latency_ms = self._send(size_bytes)
+            statuses[status] += 1
+            if not is_error_status(status):
+                latencies.append(latency_ms)
+
+        errors = sum(count for status, count in statuses.items() if is_error_status(status))
+        busy_s = sum(latencies) / 1000
+        return {
+            "size_bytes": size_bytes,
+            "size": format_size(size_bytes),
+            "requests": self.repeats + 1,
+            "errors": errors,
+            "statuses": dict(statuses),
+            "latency_ms": summarize_latencies(latencies),
+            "throughput_mb_s": size_bytes * len(latencies) / busy_s / 1e6 if busy_s else 0.0,
+            "requests_per_s": len(latencies) / busy_s if busy_s else 0.0,
+            "client_peak_mb": peak / 1e6
+        }
+
+    def run(self, on_size=None):
+        """
+        Sweep all sizes.
+
+        Args:
+            on_size: Optional callable(result) called after every size
+
+        Returns:
+            Report dictionary with the settings, per-size results,
+            first_failing_size and interrupted
+        """
+        self._prepare()
+        results = []
+        interrupted = False
+        try:
+            for size_bytes in self.sizes:
+                result = self.measure(size_bytes)
+                results.append(result)
+                if on_size is not None:
+                    on_size(result)
+                if self.stop_after_failure and result["errors"] == result["requests"]:
+                    logger.warning(f"Every request of {result['size']} failed, stopping the sweep")
+                    break
+        except KeyboardInterrupt:
+            logger.warning("Interrupted, reporting the sizes measured so far")
+            interrupted = True
+
+        failing = next((result for result in results if result["errors"]), None)
+        return {
+            "operation": self.operation,
+            "transfer": "materialized" if self.materialize else ("chunked" if self.chunked
+                                                                 else "streamed"),
+            "repeats": self.repeats,
+            "results": results,
+            "first_failing_size": failing["size"] if failing else None,
+            "interrupted": interrupted
+        }
+
+
+def format_result(result):
+    """Format one size bucket as a table row."""
+    latency = result["latency_ms"]
+
+    def ms(name):
+        value = latency.get(name)
+        return f"{value:.1f}" if value is not None else "-"
+
+    statuses = ",".join(f"{status}x{count}" for status, count in sorted(result["statuses"].items()))
+    return (f"{result['size']:>8}{ms('p50'):>10}{ms('p99'):>10}{result['throughput_mb_s']:>9.2f}"
+            f"{result['requests_per_s']:>8.1f}{result['client_peak_mb']:>10.2f}  {statuses}")
+
+
+RESULT_HEADER = f"{'size':>8}{'p50':>10}{'p99':>10}{'MB/s':>9}{'req/s':>8}{'client MB':>10}  statuses"
+
+
+def format_report(report):
+    """
+    Format a sweep report.
+
+    Args:
+        report: Dictionary returned by PayloadSweep.run
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"Payload sweep: {report['operation']}, {report['transfer']} bodies, "
+             f"{report['repeats']} timed requests per size"
+             + (" - interrupted" if report["interrupted"] else ""),
+             RESULT_HEADER]
+    lines += [format_result(result) for result in report["results"]]
+    if report["first_failing_size"]:
+        lines.append(f"First failing size: {report['first_failing_size']}")
+    else:
+        lines.append("No size failed")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Measure latency and throughput by payload size.")
+    parser.add_argument("--sizes", type=lambda text: parse_list(text, parse_size),
+                        default=parse_list(DEFAULT_SIZES, parse_size),
+                        help=f"Comma separated body sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--operation", choices=OPERATIONS, default="create_booking")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed requests per size")
+    parser.add_argument("--chunk-size", type=parse_size, default=65536,
+                        help="Streamed chunk size, e.g. 64KB")
+    transfer = parser.add_mutually_exclusive_group()
+    transfer.add_argument("--chunked", action="store_true",
+                          help="Use chunked transfer encoding instead of Content-Length")
+    transfer.add_argument("--materialize", action="store_true",
+                          help="Build every body in memory before sending it")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Request timeout in seconds")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="Measure larger sizes even after a size failed completely")
+    parser.add_argument("--base-url", help="Target base URL")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    kwargs = {"base_url": args.base_url} if args.base_url else {}
+    timeouts = {"POST /booking": args.timeout, "PUT /booking/{id}": args.timeout}
+    with httpx.Client() as client:
+        sweep = PayloadSweep(BookingApi(client=client, timeouts=timeouts, **kwargs),
+                             AuthApi(client=client, **kwargs), args.sizes,
+                             operation=args.operation, repeats=args.repeats,
+                             chunk_size=args.chunk_size, chunked=args.chunked,
+                             materialize=args.materialize,
+                             stop_after_failure=not args.keep_going)
+        print(RESULT_HEADER)
+        report = sweep.run(on_size=lambda result: print(format_result(result), flush=True))
+    print()
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if report["first_failing_size"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,480 @@
+"""
+Trace-driven replay of access logs.
+
+Reads a timestamped access log as a stream and turns every line into the
+matching BookingApi/AuthApi/PingApi call, keeping the original gaps
+between requests, divided by a speed factor (1x, 10x, ... or "max" for as
+fast as possible).
+
+Booking IDs in the log belong to the production data, so they are
+rewritten: the first time an original ID shows up it is mapped to a
+booking created during the replay (the next replayed POST in log order
+that no ID has claimed yet, waiting for its result if it is still in
+flight, or else a fresh one created on the spot, outside the
+measurements). Later lines with the same ID go to the same booking, so
+reads after a replayed DELETE see a 404 as they did in production.
+
+Log formats (detected per line):
+    JSON lines    {"timestamp": "2024-05-01T12:00:00.123Z" or epoch seconds,
+                   "method": "PUT", "path": "/booking/12", "status": 200,
+                   "body": {...}}                       (status, body optional)
+    Combined/common log format
+                  1.2.3.4 - - [01/May/2024:12:00:00 +0000] "GET /booking/12 HTTP/1.1" 200 512 ...
+
+Usage:
+    python -m tools.replay access.log --speed 10
+    python -m tools.replay access.jsonl --speed max --concurrency 32 --json replay.json
+"""
+import argparse
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+import httpx
+
+from infra.base_api import endpoint_template
+from infra.metrics import is_error_status
+from infra.stats import LatencyHistogram
+from tools.cli import (add_metrics_arguments, add_profiling_arguments, configure_logging,
+                       start_metrics, start_profiling)
+from tools.workloads import build_apis
+from utils.test_data import generate_booking_data, generate_partial_booking_data
+
+logger = logging.getLogger(__name__)
+
+# Routes the replayer knows how to map onto API calls
+REPLAYABLE_ROUTES = ("POST /auth", "GET /ping", "GET /booking", "GET /booking/{id}",
+                     "POST /booking", "PUT /booking/{id}", "PATCH /booking/{id}",
+                     "DELETE /booking/{id}")
+
+CLF_PATTERN = re.compile(
+    r'^\S+ \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+)[^"]*" (?P<status>\d{3}|-)')
+CLF_TIME_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+
+
+def parse_timestamp(value):
+    """
+    Convert a log timestamp to epoch seconds.
+
+    Args:
+        value: Epoch seconds (number) or an ISO 8601 string
+
+    Returns:
+        Float epoch seconds
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def parse_line(line):
+    """
+    Parse one access log line.
+
+    Args:
+        line: JSON object or combined/common log format line
+
+    Returns:
+        Dictionary with timestamp, method, path, status (or None) and
+        body (or None); None for lines that are not requests
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        data = json.loads(line)
+        return {
+            "timestamp": parse_timestamp(data["timestamp"]),
+            "method": data["method"].upper(),
+            "path": data["path"],
+            "status": int(data["status"]) if data.get("status") is not None else None,
+            "body": data.get("body")
+        }
+    match = CLF_PATTERN.match(line)
+    if match is None:
+        return None
+    return {
+        "timestamp": datetime.strptime(match["time"], CLF_TIME_FORMAT).timestamp(),
+        "method": match["method"],
+        "path": match["path"],
+        "status": int(match["status"]) if match["status"] != "-" else None,
+        "body": None
+    }
+
+
+def iter_log(path):
+    """
+    Stream the requests of an access log.
+
+    Args:
+        path: Log file path
+
+    Yields:
+        Dictionaries returned by parse_line (unparsable lines are skipped)
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            try:
+                entry = parse_line(line)
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Skipping line {line_number}: {e}")
+                continue
+            if entry is not None:
+                yield entry
+
+
+def parse_speed(text):
+    """
+    Parse a speed factor such as 1, 10x or max.
+
+    Returns:
+        Float factor, 0 meaning as fast as possible
+    """
+    text = text.strip().lower()
+    if text in ("max", "asap", "0"):
+        return 0.0
+    speed = float(text.rstrip("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive (or 'max')")
+    return speed
+
+
+class IdMapper:
+    """
+    Maps booking IDs of the log onto bookings created during the replay.
+    Used from the dispatch loop only, so IDs are claimed in log order.
+    """
+
+    def __init__(self, booking_api):
+        """
+        Args:
+            booking_api: BookingApi used to create bookings on demand
+        """
+        self.booking_api = booking_api
+        self.mapping = {}
+        self.created_on_demand = 0
+        self._unclaimed = deque()
+
+    def expect_created(self):
+        """
+        Register a replayed POST before it is sent.
+
+        Returns:
+            Future to complete with the created booking ID (None if the
+            POST failed); the next unknown ID claims it
+        """
+        future = Future()
+        self._unclaimed.append(future)
+        return future
+
+    def resolve(self, original_id):
+        """
+        Get the replay booking ID for an original ID.
+
+        Args:
+            original_id: Booking ID from the log
+
+        Returns:
+            Booking ID to use in the replayed request
+        """
+        if original_id in self.mapping:
+            return self.mapping[original_id]
+        while self._unclaimed:
+            booking_id = self._unclaimed.popleft().result()
+            if booking_id is not None:
+                self.mapping[original_id] = booking_id
+                return booking_id
+        # Not timed: this stands in for data that existed before the log started
+        booking_id = self.booking_api.create_booking(generate_booking_data()).json()["bookingid"]
+        self.created_on_demand += 1
+        self.mapping[original_id] = booking_id
+        return booking_id
+
+
+class Replayer:
+    """
+    Replays an access log against the API.
+    """
+
+    def __init__(self, booking_api, auth_api, ping_api, speed=1.0, concurrency=16):
+        """
+        Args:
+            booking_api: BookingApi for /booking requests
+            auth_api: AuthApi for /auth requests and the write token
+            ping_api: PingApi for /ping requests
+            speed: Speed factor (2.0 = twice as fast); 0 replays as fast as possible
+            concurrency: Most requests in flight at once
+        """
+        self.booking_api = booking_api
+        self.auth_api = auth_api
+        self.ping_api = ping_api
+        self.speed = speed
+        self.concurrency = concurrency
+        self.ids = IdMapper(booking_api)
+        self._token = None
+        self._token_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.histograms = {}
+        self.statuses = {}
+        self.status_matches = Counter()
+        self.skipped = Counter()
+        self.max_lag_ms = 0.0
+
+    def stop(self):
+        """Stop replaying after the requests in flight."""
+        self._stop_event.set()
+
+    def _get_token(self):
+        with self._token_lock:
+            if self._token is None:
+                self._token = self.auth_api.create_token().json()["token"]
+            return self._token
+
+    def _call(self, entry, route):
+        """
+        Map a log entry onto an API call. Runs in the dispatch loop, so the
+        ID lookups follow the log order.
+
+        Returns:
+            Callable sending the request (the ID and token lookups happen
+            before timing starts)
+        """
+        method, path, body = entry["method"], entry["path"], entry["body"]
+        if route == "POST /auth":
+            credentials = body or {}
+            return lambda: self.auth_api.create_token(credentials.get("username"),
+                                                      credentials.get("password"))
+        if route == "GET /ping":
+            return self.ping_api.health_check
+        if route == "GET /booking":
+            if "?" in path:
+                return lambda: self.booking_api.send_request("GET", path)
+            return self.booking_api.get_all_bookings
+        if route == "POST /booking":
+            return lambda: self.booking_api.create_booking(body or generate_booking_data())
+
+        booking_id = self.ids.resolve(path.split("?", 1)[0].rstrip("/").rsplit("/", 1)[1])
+        if route == "GET /booking/{id}":
+            return lambda: self.booking_api.get_booking(booking_id)
+        token = self._get_token()
+        if route == "PUT /booking/{id}":
+            return lambda: self.booking_api.update_booking(
+                booking_id, body or generate_booking_data(), token)
+        if route == "PATCH /booking/{id}":
+            return lambda: self.booking_api.partial_update_booking(
+                booking_id, body or generate_partial_booking_data("firstname"), token)
+        return lambda: self.booking_api.delete_booking(booking_id, token)
+
+    def _prepare(self, entry, route):
+        """
+        Build the call for a log entry, or count it as skipped.
+
+        Returns:
+            Tuple (call, created) where created is the Future of a replayed
+            POST's booking ID (else None); None if the setup failed
+        """
+        created = self.ids.expect_created() if route == "POST /booking" else None
+        try:
+            return self._call(entry, route), created
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            logger.warning(f"Could not prepare {route}: {e}")
+            if created is not None:
+                created.set_result(None)
+            with self._stats_lock:
+                self.skipped["setup failed"] += 1
+            return None
+
+    def replay_entry(self, entry, route, call, created=None):
+        """
+        Send one log entry and record its latency under the original route.
+
+        Args:
+            entry: Dictionary returned by parse_line
+            route: Route key of the entry, e.g. "GET /booking/{id}"
+            call: Callable returned by _call
+            created: Future to complete with the booking ID of a POST
+        """
+        booking_id = None
+        try:
+            start = time.perf_counter()
+            try:
+                response = call()
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                response = None
+                status = type(e).__name__
+            latency_ms = (time.perf_counter() - start) * 1000
+            if created is not None and response is not None and response.status_code == 200:
+                try:
+                    booking_id = response.json()["bookingid"]
+                except (ValueError, KeyError):
+                    pass
+        finally:
+            if created is not None:
+                created.set_result(booking_id)
+
+        with self._stats_lock:
+            self.histograms.setdefault(route, LatencyHistogram()).record(latency_ms)
+            self.statuses.setdefault(route, Counter())[status] += 1
+            if entry["status"] is not None:
+                self.status_matches[(route, status == str(entry["status"]))] += 1
+
+    def run(self, entries):
+        """
+        Replay a stream of log entries.
+
+        Args:
+            entries: Iterable of parsed entries in log order (e.g. iter_log(path))
+
+        Returns:
+            Report dictionary with speed, requests, elapsed_s, log_span_s,
+            max_lag_ms, endpoints, skipped, created_on_demand and interrupted
+        """
+        first_timestamp = None
+        last_timestamp = None
+        requests = 0
+        interrupted = False
+        start = time.monotonic()
+
+        def run_entry(entry, route, call, created):
+            try:
+                self.replay_entry(entry, route, call, created)
+            finally:
+                self._slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                for entry in entries:
+                    if self._stop_event.is_set():
+                        break
+                    route = f"{entry['method']} {endpoint_template(entry['path'])}"
+                    if route not in REPLAYABLE_ROUTES:
+                        self.skipped[route] += 1
+                        continue
+                    if first_timestamp is None:
+                        first_timestamp = entry["timestamp"]
+                    last_timestamp = entry["timestamp"]
+                    if self.speed:
+                        due = start + (entry["timestamp"] - first_timestamp) / self.speed
+                        if self._stop_event.wait(max(due - time.monotonic(), 0)):
+                            break
+                    prepared = self._prepare(entry, route)
+                    if prepared is None:
+                        continue
+                    self._slots.acquire()
+                    if self.speed:
+                        self.max_lag_ms = max(self.max_lag_ms, (time.monotonic() - due) * 1000)
+                    executor.submit(run_entry, entry, route, *prepared)
+                    requests += 1
+            except KeyboardInterrupt:
+                logger.warning("Interrupted, waiting for the requests in flight")
+                interrupted = True
+
+        endpoints = {}
+        for route, histogram in sorted(self.histograms.items()):
+            statuses = self.statuses[route]
+            matched = self.status_matches[(route, True)]
+            compared = matched + self.status_matches[(route, False)]
+            endpoints[route] = {
+                "requests": histogram.count,
+                "errors": sum(count for status, count in statuses.items() if is_error_status(status)),
+                "statuses": dict(statuses),
+                "status_match_rate": matched / compared if compared else None,
+                "latency_ms": histogram.summary()
+            }
+        return {
+            "speed": self.speed or "max",
+            "requests": requests,
+            "elapsed_s": time.monotonic() - start,
+            "log_span_s": (last_timestamp - first_timestamp) if first_timestamp is not None else 0.0,
+            "max_lag_ms": self.max_lag_ms,
+            "endpoints": endpoints,
+            "skipped": dict(self.skipped),
+            "created_on_demand": self.ids.created_on_demand,
+            "interrupted": interrupted
+        }
+
+
+def format_report(report):
+    """
+    Format a replay report.
+
+    Args:
+        report: Dictionary returned by Replayer.run
+
+    Returns:
+        Multi-line string
+    """
+    speed = report["speed"] if report["speed"] == "max" else f"{report['speed']:g}x"
+    lines = [
+        f"Replayed {report['requests']} requests spanning {report['log_span_s']:.1f}s of log "
+        f"in {report['elapsed_s']:.1f}s (speed {speed}, max lag {report['max_lag_ms']:.0f}ms)"
+        + (" - interrupted" if report["interrupted"] else ""),
+        f"{'endpoint':<24}{'count':>8}{'err%':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'match':>7}"
+    ]
+    for route, endpoint in report["endpoints"].items():
+        latency = endpoint["latency_ms"]
+
+        def ms(name):
+            value = latency.get(name)
+            return f"{value:.1f}" if value is not None else "-"
+
+        match = endpoint["status_match_rate"]
+        lines.append(f"{route:<24}{endpoint['requests']:>8}"
+                     f"{endpoint['errors'] / endpoint['requests'] * 100:>6.1f}%"
+                     f"{ms('p50'):>9}{ms('p90'):>9}{ms('p99'):>9}{ms('max'):>9}"
+                     f"{f'{match:.0%}' if match is not None else '-':>7}")
+    if report["skipped"]:
+        lines.append("Skipped: " + ", ".join(f"{route} x{count}"
+                                             for route, count in report["skipped"].items()))
+    if report["created_on_demand"]:
+        lines.append(f"{report['created_on_demand']} bookings created for IDs from before the log")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Replay an access log against the API.")
+    parser.add_argument("log", help="Access log (JSON lines or combined log format)")
+    parser.add_argument("--speed", type=parse_speed, default=1.0,
+                        help="Speed factor, e.g. 1, 10x, or max for as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=16, help="Most requests in flight")
+    parser.add_argument("--base-url", help="Target base URL")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    add_metrics_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    booking_api, auth_api, ping_api, client = build_apis(args.base_url, args.concurrency)
+    replayer = Replayer(booking_api, auth_api, ping_api, speed=args.speed,
+                        concurrency=args.concurrency)
+    stop_metrics = start_metrics(args)
+    stop_profiling = start_profiling(args)
+    try:
+        report = replayer.run(iter_log(args.log))
+    finally:
+        stop_metrics()
+        stop_profiling()
+        client.close()
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
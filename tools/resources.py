@@ -0,0 +1,139 @@
+"""
+Client-process resource sampling.
+
+Reads memory, file descriptor and socket usage of the current process.
+Linux values come from /proc; on other platforms the values that cannot
+be determined are reported as None.
+"""
+import os
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# /proc/net/tcp state code for an established connection
+TCP_ESTABLISHED = "01"
+
+
+def rss_kb():
+    """
+    Get the current resident set size of this process.
+
+    Returns:
+        RSS in KiB, or peak RSS where the current value is unavailable
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+    # ru_maxrss is the peak (KiB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _fd_dir():
+    """Directory listing this process' open file descriptors, if any."""
+    for path in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+def open_fd_count():
+    """
+    Count open file descriptors of this process.
+
+    Returns:
+        Number of open descriptors, or None if unsupported
+    """
+    path = _fd_dir()
+    if path is None:
+        return None
+    try:
+        return len(os.listdir(path))
+    except OSError:
+        return None
+
+
+def socket_inodes():
+    """
+    Collect inode numbers of all sockets owned by this process.
+
+    Returns:
+        Set of inode strings, or None if unsupported
+    """
+    if not os.path.isdir("/proc/self/fd"):
+        return None
+
+    inodes = set()
+    for name in os.listdir("/proc/self/fd"):
+        try:
+            target = os.readlink(f"/proc/self/fd/{name}")
+        except OSError:
+            continue
+        if target.startswith("socket:["):
+            inodes.add(target[8:-1])
+    return inodes
+
+
+def tcp_connection_count(inodes=None):
+    """
+    Count established TCP connections owned by this process.
+
+    Args:
+        inodes: Socket inodes of this process (default: read them)
+
+    Returns:
+        Number of established IPv4/IPv6 connections, or None if unsupported
+    """
+    if inodes is None:
+        inodes = socket_inodes()
+    if inodes is None:
+        return None
+
+    count = 0
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)  # header
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == TCP_ESTABLISHED and fields[9] in inodes:
+                        count += 1
+        except OSError:
+            continue
+    return count
+
+
+def sample_process():
+    """
+    Take one resource sample of the current process.
+
+    Returns:
+        Dictionary with traced_kb, traced_peak_kb, rss_kb, open_fds,
+        sockets and tcp_connections (None where unavailable)
+    """
+    if tracemalloc.is_tracing():
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        traced_kb, traced_peak_kb = traced // 1024, traced_peak // 1024
+    else:
+        traced_kb = traced_peak_kb = None
+
+    inodes = socket_inodes()
+    return {
+        "traced_kb": traced_kb,
+        "traced_peak_kb": traced_peak_kb,
+        "rss_kb": rss_kb(),
+        "open_fds": open_fd_count(),
+        "sockets": len(inodes) if inodes is not None else None,
+        "tcp_connections": tcp_connection_count(inodes)
+    }
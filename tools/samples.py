@@ -0,0 +1,104 @@
+"""
+Post-run analysis of a sample store recorded with --samples.
+
+Usage:
+    python -m tools.samples run-samples
+    python -m tools.samples run-samples --bucket 10 --endpoint "GET /booking/{id}"
+    python -m tools.samples run-samples --csv samples.csv
+"""
+import argparse
+import json
+import os
+import sys
+
+from infra.samples import META_FILE, SampleStore
+
+
+def _ms(value):
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def format_endpoints(groups):
+    """
+    Format SampleStore.group_by_endpoint() as a table.
+
+    Args:
+        groups: Dictionary returned by group_by_endpoint
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"{'endpoint':<26}{'count':>10}{'err%':>7}{'p50':>9}{'p90':>9}{'p99':>9}"
+             f"{'max':>9}{'MB':>9}"]
+    for endpoint, group in sorted(groups.items(), key=lambda item: -item[1]["count"]):
+        latency = group["latency_ms"]
+        lines.append(f"{endpoint:<26}{group['count']:>10}"
+                     f"{group['errors'] / group['count'] * 100:>6.1f}%"
+                     f"{_ms(latency.get('p50')):>9}{_ms(latency.get('p90')):>9}"
+                     f"{_ms(latency.get('p99')):>9}{_ms(latency.get('max')):>9}"
+                     f"{group['bytes'] / 1e6:>9.2f}")
+    return "\n".join(lines)
+
+
+def format_buckets(buckets):
+    """
+    Format SampleStore.time_buckets() as a table.
+
+    Args:
+        buckets: List returned by time_buckets
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"{'start_s':>9}{'count':>10}{'rps':>10}{'errors':>8}{'p50':>9}{'p99':>9}"]
+    for bucket in buckets:
+        latency = bucket["latency_ms"]
+        lines.append(f"{bucket['start_s']:>9.0f}{bucket['count']:>10}{bucket['rps']:>10.1f}"
+                     f"{bucket['errors']:>8}{_ms(latency.get('p50')):>9}{_ms(latency.get('p99')):>9}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Analyse a recorded sample store.")
+    parser.add_argument("directory", help="Sample store directory")
+    parser.add_argument("--endpoint", help="Only this endpoint, e.g. 'GET /booking/{id}'")
+    parser.add_argument("--bucket", type=float, help="Also show time buckets of this many seconds")
+    parser.add_argument("--csv", dest="csv_path", help="Export all samples to CSV")
+    parser.add_argument("--json", dest="json_path", help="Write the analysis as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.directory, META_FILE)):
+        parser.error(f"{args.directory} is not a sample store")
+
+    with SampleStore(args.directory) as store:
+        analysis = {
+            "samples": len(store),
+            "percentiles_ms": store.percentiles(endpoint=args.endpoint),
+            "endpoints": store.group_by_endpoint()
+        }
+        if args.bucket:
+            analysis["buckets"] = store.time_buckets(args.bucket, endpoint=args.endpoint)
+        if args.csv_path:
+            rows = store.to_csv(args.csv_path)
+            sys.stderr.write(f"Exported {rows} samples to {args.csv_path}\n")
+
+    scope = args.endpoint or "all endpoints"
+    print(f"{analysis['samples']} samples; {scope}: " + "  ".join(
+        f"{name}={_ms(value)}ms" for name, value in analysis["percentiles_ms"].items()))
+    print()
+    print(format_endpoints(analysis["endpoints"]))
+    if args.bucket:
+        print()
+        print(format_buckets(analysis["buckets"]))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(analysis, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,499 @@
+"""
+Declarative weighted workload scenarios.
+
+A scenario file (JSON or YAML) describes a realistic traffic mix:
+weighted operations, think times, ramp stages, data dependencies between
+operations of the same virtual user and per-operation SLOs. The runner
+executes it with one thread per virtual user on top of the logic/ API
+classes.
+
+Example (YAML):
+    name: browse-heavy
+    stages:                      # users ramp linearly to each target
+      - {duration: 30, users: 20}
+      - {duration: 120, users: 20}
+      - {duration: 15, users: 0}
+    think_time: [0.5, 2.0]       # default seconds between operations
+    operations:
+      get_booking:
+        weight: 70
+        slo: {p95_ms: 800, max_error_rate: 0.01}
+      create_booking: {weight: 15}
+      update_booking: {weight: 5}    # updates a booking created earlier in the session
+      delete_booking: {weight: 3}
+      create_token: {every: 60}      # periodic, once a minute per user
+
+Usage:
+    python -m tools.scenario scenarios/crud_mix.yaml --base-url http://localhost:3001
+    python -m tools.scenario scenarios/crud_mix.yaml --hedge 95 --max-hedge-rate 0.05
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+from infra.hedging import HedgingPolicy, format_hedging
+from infra.metrics import is_error_status
+from infra.samples import SampleStore
+from tools.cli import (add_metrics_arguments, add_profiling_arguments, configure_logging,
+                       start_metrics, start_profiling)
+from tools.driver import build_report, format_report, merge_results, print_progress
+from tools.workloads import (
+    OPERATION_REQUIREMENTS, OPERATIONS, OperationPicker, OperationStats, Session,
+    build_apis
+)
+
+logger = logging.getLogger(__name__)
+
+# What to do when an operation's data dependency is not met yet
+ON_MISSING_POLICIES = ("setup", "skip")
+
+# SLO keys and the report summary field they are checked against
+SLO_LATENCY_KEYS = {
+    "p50_ms": "p50",
+    "p90_ms": "p90",
+    "p95_ms": "p95",
+    "p99_ms": "p99",
+    "max_ms": "max",
+    "mean_ms": "mean"
+}
+SLO_ERROR_RATE_KEY = "max_error_rate"
+
+
+def parse_think_time(value):
+    """
+    Normalize a think time specification.
+
+    Args:
+        value: None, a number of seconds, [min, max] or {"min": .., "max": ..}
+
+    Returns:
+        Tuple (min_s, max_s)
+    """
+    if value is None:
+        return 0.0, 0.0
+    if isinstance(value, (int, float)):
+        return float(value), float(value)
+    if isinstance(value, dict):
+        return float(value.get("min", 0)), float(value.get("max", value.get("min", 0)))
+    low, high = value
+    return float(low), float(high)
+
+
+class OperationSpec:
+    """
+    One operation of a scenario.
+    """
+
+    def __init__(self, name, weight=0.0, think_time=(0.0, 0.0), requires=None, every=None,
+                 slo=None):
+        """
+        Args:
+            name: Operation name (one of workloads.OPERATIONS)
+            weight: Relative weight in the random mix (0 = only periodic)
+            think_time: Tuple (min_s, max_s) slept after the operation
+            requires: Session state the operation depends on
+            every: Run periodically every N seconds per user instead of by weight
+            slo: Dictionary of SLO thresholds (see SLO_LATENCY_KEYS)
+        """
+        self.name = name
+        self.weight = weight
+        self.think_time = think_time
+        self.requires = tuple(requires if requires is not None
+                              else OPERATION_REQUIREMENTS.get(name, ()))
+        self.every = every
+        self.slo = slo or {}
+
+
+class Scenario:
+    """
+    A parsed scenario definition.
+    """
+
+    def __init__(self, name, stages, operations, base_url=None, on_missing="setup", slo=None):
+        """
+        Args:
+            name: Scenario name
+            stages: List of (duration_s, start_users, end_users) tuples
+            operations: Dictionary mapping operation name to OperationSpec
+            base_url: Optional target base URL
+            on_missing: "setup" runs missing dependencies untimed, "skip"
+                        picks another operation instead
+            slo: SLO thresholds applied to all operations combined
+        """
+        self.name = name
+        self.stages = stages
+        self.operations = operations
+        self.base_url = base_url
+        self.on_missing = on_missing
+        self.slo = slo or {}
+
+    @property
+    def duration_s(self):
+        """Total duration of all stages."""
+        return sum(duration for duration, _, _ in self.stages)
+
+    @property
+    def max_users(self):
+        """Highest number of concurrent users in any stage."""
+        return max(max(start, end) for _, start, end in self.stages)
+
+    def users_at(self, elapsed_s):
+        """
+        Get the target number of users at a point in the run.
+
+        Args:
+            elapsed_s: Seconds since the scenario started
+
+        Returns:
+            Number of virtual users (linear ramp within each stage)
+        """
+        for duration, start, end in self.stages:
+            if elapsed_s < duration:
+                return int(round(start + (end - start) * elapsed_s / duration))
+            elapsed_s -= duration
+        return 0
+
+
+def parse_scenario(data):
+    """
+    Validate and parse a scenario dictionary.
+
+    Args:
+        data: Dictionary loaded from a scenario file
+
+    Returns:
+        Scenario
+    """
+    if not data.get("operations"):
+        raise ValueError("Scenario must define at least one operation")
+
+    default_think = parse_think_time(data.get("think_time"))
+    operations = {}
+    for name, spec in data["operations"].items():
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {OPERATIONS}")
+        spec = spec or {}
+        unknown_slo = set(spec.get("slo", {})) - set(SLO_LATENCY_KEYS) - {SLO_ERROR_RATE_KEY}
+        if unknown_slo:
+            raise ValueError(f"Unknown SLO keys for {name}: {sorted(unknown_slo)}")
+        operations[name] = OperationSpec(
+            name,
+            weight=float(spec.get("weight", 0 if "every" in spec else 1)),
+            think_time=(parse_think_time(spec["think_time"]) if "think_time" in spec
+                        else default_think),
+            requires=spec.get("requires"),
+            every=spec.get("every"),
+            slo=spec.get("slo")
+        )
+    if not any(op.weight > 0 for op in operations.values()):
+        raise ValueError("Scenario needs at least one operation with a positive weight")
+
+    if "stages" in data:
+        stages = []
+        previous = 0
+        for stage in data["stages"]:
+            stages.append((float(stage["duration"]), previous, int(stage["users"])))
+            previous = int(stage["users"])
+    elif "users" in data and "duration" in data:
+        users = int(data["users"])
+        stages = [(float(data["duration"]), users, users)]
+    else:
+        raise ValueError("Scenario needs 'stages' or both 'users' and 'duration'")
+
+    on_missing = data.get("on_missing", "setup")
+    if on_missing not in ON_MISSING_POLICIES:
+        raise ValueError(f"on_missing must be one of {ON_MISSING_POLICIES}, got '{on_missing}'")
+
+    return Scenario(data.get("name", "scenario"), stages, operations,
+                    base_url=data.get("base_url"), on_missing=on_missing, slo=data.get("slo"))
+
+
+def load_document(path):
+    """
+    Read a JSON or YAML file.
+
+    Args:
+        path: Path to a .json, .yaml or .yml file
+
+    Returns:
+        The parsed document
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML files need PyYAML: pip install PyYAML")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def load_scenario(path):
+    """
+    Load a scenario file.
+
+    Args:
+        path: Path to a .json, .yaml or .yml file
+
+    Returns:
+        Scenario
+    """
+    scenario = parse_scenario(load_document(path))
+    if scenario.name == "scenario":
+        scenario.name = os.path.splitext(os.path.basename(path))[0]
+    return scenario
+
+
+class ScenarioRunner:
+    """
+    Executes a scenario with one thread per virtual user.
+    """
+
+    def __init__(self, scenario, base_url=None, control_interval_s=0.5, hedging=None):
+        """
+        Args:
+            scenario: Scenario to run
+            base_url: Target base URL (overrides the scenario's base_url)
+            control_interval_s: Seconds between ramp adjustments
+            hedging: HedgingPolicy for the idempotent GETs (optional)
+        """
+        self.scenario = scenario
+        self.base_url = base_url or scenario.base_url
+        self.control_interval_s = control_interval_s
+        self.hedging = hedging
+        self._stop = threading.Event()
+
+    def run(self, on_progress=None):
+        """
+        Run all stages and evaluate the SLOs.
+
+        Args:
+            on_progress: Optional callable(elapsed_s, completed, errors)
+
+        Returns:
+            Driver-style report plus "slo", "scenario", "peak_users" and,
+            with hedging, "hedging"
+        """
+        apis = build_apis(self.base_url, max(self.scenario.max_users, 1), self.hedging)
+        users = []
+        retired = []
+        all_stats = []
+        peak_users = 0
+        interrupted = False
+        start = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                elapsed = time.monotonic() - start
+                if elapsed >= self.scenario.duration_s:
+                    break
+                target = self.scenario.users_at(elapsed)
+                while len(users) < target:
+                    users.append(self._start_user(apis, all_stats))
+                while len(users) > target:
+                    thread, stop_event = users.pop()
+                    stop_event.set()
+                    retired.append((thread, stop_event))
+                peak_users = max(peak_users, len(users))
+                if on_progress is not None:
+                    on_progress(elapsed, sum(s.completed for s in all_stats),
+                                sum(s.errors for s in all_stats))
+                self._stop.wait(self.control_interval_s)
+        except KeyboardInterrupt:
+            interrupted = True
+            logger.warning("Interrupted, stopping virtual users")
+        finally:
+            self._stop.set()
+            for thread, stop_event in users:
+                stop_event.set()
+            # Ramped-down users may still be finishing a request on the
+            # shared client
+            for thread, _ in users + retired:
+                thread.join()
+            if self.hedging is not None:
+                self.hedging.close()
+            apis[-1].close()
+
+        merged = merge_results(stats.to_dict() for stats in all_stats)
+        report = build_report(merged, time.monotonic() - start, interrupted)
+        report["scenario"] = self.scenario.name
+        report["peak_users"] = peak_users
+        report["slo"] = evaluate_slos(self.scenario, report)
+        if self.hedging is not None:
+            report["hedging"] = self.hedging.stats()
+        return report
+
+    def stop(self):
+        """Ask a running scenario to stop early."""
+        self._stop.set()
+
+    def _start_user(self, apis, all_stats):
+        """Start one virtual user thread."""
+        stats = OperationStats()
+        all_stats.append(stats)
+        stop_event = threading.Event()
+        thread = threading.Thread(target=self._user_loop, args=(apis, stats, stop_event),
+                                  daemon=True)
+        thread.start()
+        return thread, stop_event
+
+    def _user_loop(self, apis, stats, stop_event):
+        """Run operations for one virtual user until told to stop."""
+        booking_api, auth_api, ping_api, _ = apis
+        rng = random.Random()
+        session = Session(booking_api, auth_api, ping_api, rng=rng)
+        operations = self.scenario.operations
+        weighted = {name: op.weight for name, op in operations.items() if op.weight > 0}
+        picker = OperationPicker(weighted, rng=rng)
+        # Spread periodic operations so users do not fire them in lockstep
+        now = time.monotonic()
+        next_due = {name: now + op.every * rng.random()
+                    for name, op in operations.items() if op.every}
+
+        while not stop_event.is_set() and not self._stop.is_set():
+            name = self._next_operation(session, picker, next_due, weighted, rng)
+            try:
+                response, latency_ms = session.run(name)
+                stats.record(name, str(response.status_code), latency_ms)
+            except Exception as e:
+                stats.record(name, type(e).__name__, None)
+
+            low, high = operations[name].think_time
+            if high > 0:
+                stop_event.wait(rng.uniform(low, high))
+
+    def _next_operation(self, session, picker, next_due, weighted, rng):
+        """Pick the next operation: due periodic ones first, then by weight."""
+        now = time.monotonic()
+        for name, due in next_due.items():
+            if due <= now:
+                next_due[name] = now + self.scenario.operations[name].every
+                return name
+
+        name = picker.pick()
+        if self.scenario.on_missing == "skip":
+            requires = self.scenario.operations[name].requires
+            if not all(session.has(requirement) for requirement in requires):
+                ready = {
+                    other: weight for other, weight in weighted.items()
+                    if all(session.has(r) for r in self.scenario.operations[other].requires)
+                }
+                if ready:
+                    name = OperationPicker(ready, rng=rng).pick()
+        return name
+
+
+def evaluate_slos(scenario, report):
+    """
+    Check the measured latencies and error rates against the SLOs.
+
+    Args:
+        scenario: Scenario with per-operation (and overall) SLOs
+        report: Report produced by ScenarioRunner.run
+
+    Returns:
+        List of dictionaries with operation, metric, threshold, actual and
+        passed (None when the operation produced no data)
+    """
+    checks = [(name, op.slo) for name, op in scenario.operations.items()]
+    checks.append(("all", scenario.slo))
+
+    results = []
+    for name, slo in checks:
+        for metric, threshold in slo.items():
+            if metric == SLO_ERROR_RATE_KEY:
+                if name == "all":
+                    statuses = {}
+                    for counts in report["statuses"].values():
+                        for status, count in counts.items():
+                            statuses[status] = statuses.get(status, 0) + count
+                else:
+                    statuses = report["statuses"].get(name, {})
+                total = sum(statuses.values())
+                errors = sum(count for status, count in statuses.items() if is_error_status(status))
+                actual = errors / total if total else None
+            else:
+                summary = report["latency_ms"].get(name, {"count": 0})
+                actual = summary.get(SLO_LATENCY_KEYS[metric]) if summary["count"] else None
+            results.append({
+                "operation": name,
+                "metric": metric,
+                "threshold": threshold,
+                "actual": actual,
+                "passed": None if actual is None else actual <= threshold
+            })
+    return results
+
+
+def format_slos(results):
+    """
+    Render SLO results as text.
+    """
+    lines = [f"{'operation':<24} {'slo':<16} {'threshold':>10} {'actual':>10}  result"]
+    for result in results:
+        actual = "-" if result["actual"] is None else f"{result['actual']:.3f}"
+        verdict = {True: "PASS", False: "FAIL", None: "NO DATA"}[result["passed"]]
+        lines.append(f"{result['operation']:<24} {result['metric']:<16} "
+                     f"{result['threshold']:>10} {actual:>10}  {verdict}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Run a declarative load scenario.")
+    parser.add_argument("scenario", help="Scenario file (.json, .yaml or .yml)")
+    parser.add_argument("--base-url", help="Target base URL (overrides the scenario)")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--samples", metavar="DIR",
+                        help="Record every request in a sample store (see tools.samples)")
+    parser.add_argument("--hedge", type=float, metavar="PCT",
+                        help="Hedge slow GETs after this latency percentile, e.g. 95")
+    parser.add_argument("--max-hedge-rate", type=float, default=0.05,
+                        help="Most hedges per request with --hedge (0.05 = 5%% extra load)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    add_metrics_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    scenario = load_scenario(args.scenario)
+    logger.info(f"Running scenario '{scenario.name}' for {scenario.duration_s:.0f}s "
+                f"with up to {scenario.max_users} users")
+
+    store = SampleStore(args.samples).install() if args.samples else None
+    hedging = (HedgingPolicy(percentile=args.hedge, max_hedge_rate=args.max_hedge_rate)
+               if args.hedge else None)
+    stop_metrics = start_metrics(args)
+    stop_profiling = start_profiling(args)
+    try:
+        report = ScenarioRunner(scenario, base_url=args.base_url, hedging=hedging).run(
+            on_progress=None if args.dashboard else print_progress)
+    finally:
+        stop_metrics()
+        stop_profiling()
+        if store is not None:
+            store.close()
+    sys.stderr.write("\n")
+    print(format_report(report))
+    if report["slo"]:
+        print()
+        print(format_slos(report["slo"]))
+    if hedging is not None:
+        print()
+        print(format_hedging(report["hedging"]))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if any(result["passed"] is False for result in report["slo"]) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
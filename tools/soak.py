@@ -0,0 +1,385 @@
+"""
+Soak / endurance mode.
+
+Loops a workload for a configured duration while sampling tracemalloc,
+RSS, open file descriptors, sockets and TCP connections of the client
+process. Alerts when a metric grows monotonically and writes the samples
+as a CSV time series.
+
+Usage:
+    python -m tools.soak --duration 3600 --interval 30 --output soak.csv
+    python -m tools.soak --duration 7200 --pytest tests/test_ping.py tests/test_auth.py
+"""
+import argparse
+import csv
+import json
+import logging
+import threading
+import time
+import tracemalloc
+
+from logic.auth_api import AuthApi
+from logic.booking_api import BookingApi
+from tools.cli import (add_metrics_arguments, add_profiling_arguments, configure_logging,
+                       start_metrics, start_profiling)
+from tools.resources import sample_process
+from utils.test_data import generate_booking_data, generate_partial_booking_data
+
+logger = logging.getLogger(__name__)
+
+# Minimum growth over the detection window before a metric is reported
+DEFAULT_GROWTH_THRESHOLDS = {
+    "traced_kb": 512,
+    "rss_kb": 2048,
+    "open_fds": 2,
+    "sockets": 2,
+    "tcp_connections": 2
+}
+
+SAMPLE_FIELDS = ["elapsed_s", "iterations", "errors", "traced_kb", "traced_peak_kb",
+                 "rss_kb", "open_fds", "sockets", "tcp_connections"]
+
+
+def crud_workload(booking_api=None, auth_api=None):
+    """
+    Build the default soak workload: one full booking lifecycle.
+
+    Args:
+        booking_api: BookingApi to use (default: new instance)
+        auth_api: AuthApi to use (default: new instance)
+
+    Returns:
+        Callable performing create, get, token, patch and delete
+    """
+    booking_api = booking_api or BookingApi()
+    auth_api = auth_api or AuthApi()
+
+    def run_cycle():
+        create_response = booking_api.create_booking(generate_booking_data())
+        booking_id = create_response.json()["bookingid"]
+        booking_api.get_booking(booking_id)
+        token = auth_api.create_token().json()["token"]
+        booking_api.partial_update_booking(
+            booking_id, generate_partial_booking_data("firstname"), token
+        )
+        delete_response = booking_api.delete_booking(booking_id, token)
+        if delete_response.status_code != 201:
+            raise RuntimeError(f"Delete failed with status {delete_response.status_code}")
+
+    return run_cycle
+
+
+def pytest_workload(pytest_args):
+    """
+    Build a workload that runs the test suite in-process.
+
+    Running in-process is what makes leaks in the client layer or in the
+    tests themselves visible across iterations.
+
+    Args:
+        pytest_args: Arguments passed to pytest.main (test paths, -k, ...)
+
+    Returns:
+        Callable running pytest once
+    """
+    import pytest
+
+    def run_suite():
+        exit_code = pytest.main(list(pytest_args) + ["-q", "-p", "no:cacheprovider"])
+        if exit_code not in (0, 5):  # 5 = no tests collected
+            raise RuntimeError(f"pytest exited with code {int(exit_code)}")
+
+    return run_suite
+
+
+def detect_monotonic_growth(values, window, min_growth):
+    """
+    Check whether the last samples of a series only ever went up.
+
+    Args:
+        values: Series of samples (None entries are ignored)
+        window: Number of trailing samples that must be non-decreasing
+        min_growth: Minimum total increase over the window
+
+    Returns:
+        True if the series grew monotonically by at least min_growth
+    """
+    values = [value for value in values if value is not None]
+    if len(values) < window or window < 2:
+        return False
+
+    tail = values[-window:]
+    if any(later < earlier for earlier, later in zip(tail, tail[1:])):
+        return False
+    return tail[-1] - tail[0] >= min_growth
+
+
+class SoakRunner:
+    """
+    Runs a workload repeatedly while sampling client resource usage.
+    """
+
+    def __init__(self, workload=None, duration_s=3600, sample_interval_s=30, workers=1,
+                 growth_window=6, growth_thresholds=None, output_path=None,
+                 tracemalloc_frames=10):
+        """
+        Initialize the soak runner.
+
+        Args:
+            workload: Callable executed in a loop (default: crud_workload())
+            duration_s: Total soak duration in seconds
+            sample_interval_s: Seconds between resource samples
+            workers: Number of threads running the workload concurrently
+            growth_window: Trailing samples checked for monotonic growth
+            growth_thresholds: Per-metric minimum growth that raises an alert
+            output_path: CSV file for the time series (written incrementally)
+            tracemalloc_frames: Stack depth recorded by tracemalloc
+        """
+        self.workload = workload or crud_workload()
+        self.duration_s = duration_s
+        self.sample_interval_s = sample_interval_s
+        self.workers = workers
+        self.growth_window = growth_window
+        self.growth_thresholds = dict(DEFAULT_GROWTH_THRESHOLDS, **(growth_thresholds or {}))
+        self.output_path = output_path
+        self.tracemalloc_frames = tracemalloc_frames
+
+        self.samples = []
+        self.alerts = []
+        self._alerted = set()
+        self._iterations = 0
+        self._errors = 0
+        self._last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self):
+        """
+        Run the soak for the configured duration.
+
+        Returns:
+            Dictionary report with samples, alerts and top allocation growth
+        """
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.tracemalloc_frames)
+        first_snapshot = tracemalloc.take_snapshot()
+
+        csv_file = open(self.output_path, "w", newline="") if self.output_path else None
+        writer = csv.DictWriter(csv_file, fieldnames=SAMPLE_FIELDS) if csv_file else None
+        if writer:
+            writer.writeheader()
+
+        self._start = time.monotonic()
+        sampler = threading.Thread(target=self._sample_loop, args=(writer, csv_file),
+                                   name="soak-sampler", daemon=True)
+        sampler.start()
+        # The first worker is the main thread - pytest.main needs it for signals
+        threads = [threading.Thread(target=self._work_loop, name=f"soak-{i}", daemon=True)
+                   for i in range(1, self.workers)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._work_loop()
+        except KeyboardInterrupt:
+            logger.warning("Soak interrupted, finishing current iterations")
+        finally:
+            self._stop.set()
+            for thread in threads + [sampler]:
+                thread.join()
+            self._take_sample(writer, csv_file)
+            if csv_file:
+                csv_file.close()
+
+        last_snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+
+        return {
+            "duration_s": time.monotonic() - self._start,
+            "iterations": self._iterations,
+            "errors": self._errors,
+            "last_error": self._last_error,
+            "samples": self.samples,
+            "alerts": self.alerts,
+            "top_growth": top_allocation_growth(first_snapshot, last_snapshot)
+        }
+
+    def _work_loop(self):
+        """Run the workload until the soak stops."""
+        while not self._stop.is_set():
+            try:
+                self.workload()
+                with self._lock:
+                    self._iterations += 1
+            except Exception as e:
+                with self._lock:
+                    self._iterations += 1
+                    self._errors += 1
+                    self._last_error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Workload iteration failed: {self._last_error}")
+
+    def _sample_loop(self, writer, csv_file):
+        """Sample on a fixed interval and stop the soak once the duration is up."""
+        self._take_sample(writer, csv_file)
+        while True:
+            remaining = self.duration_s - (time.monotonic() - self._start)
+            if remaining <= 0:
+                self._stop.set()
+                return
+            if self._stop.wait(min(self.sample_interval_s, remaining)):
+                return
+            self._take_sample(writer, csv_file)
+
+    def _take_sample(self, writer, csv_file):
+        """Record one sample, persist it and check for growth."""
+        sample = {"elapsed_s": round(time.monotonic() - self._start, 3)}
+        with self._lock:
+            sample["iterations"] = self._iterations
+            sample["errors"] = self._errors
+        sample.update(sample_process())
+        self.samples.append(sample)
+
+        if writer:
+            writer.writerow(sample)
+            csv_file.flush()
+
+        for metric, threshold in self.growth_thresholds.items():
+            series = [s[metric] for s in self.samples]
+            growing = detect_monotonic_growth(series, self.growth_window, threshold)
+            if growing and metric not in self._alerted:
+                self._alerted.add(metric)
+                alert = {
+                    "metric": metric,
+                    "elapsed_s": sample["elapsed_s"],
+                    "from": series[-self.growth_window],
+                    "to": series[-1]
+                }
+                self.alerts.append(alert)
+                logger.warning(
+                    f"Monotonic growth of {metric}: {alert['from']} -> {alert['to']} "
+                    f"over the last {self.growth_window} samples"
+                )
+            elif not growing:
+                self._alerted.discard(metric)
+
+
+def top_allocation_growth(first_snapshot, last_snapshot, limit=10):
+    """
+    List the source lines whose allocations grew the most.
+
+    Args:
+        first_snapshot: tracemalloc snapshot taken at the start
+        last_snapshot: tracemalloc snapshot taken at the end
+        limit: Number of entries to return
+
+    Returns:
+        List of dictionaries with location, size_diff_kb and count_diff
+    """
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = last_snapshot.filter_traces(ignore).compare_to(
+        first_snapshot.filter_traces(ignore), "lineno"
+    )
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff
+        }
+        for stat in stats[:limit]
+        if stat.size_diff > 0
+    ]
+
+
+def format_report(report):
+    """
+    Render a soak report as text.
+
+    Args:
+        report: Dictionary returned by SoakRunner.run
+
+    Returns:
+        Multi-line string
+    """
+    samples = report["samples"]
+    lines = [
+        f"Soak finished after {report['duration_s']:.0f}s: "
+        f"{report['iterations']} iterations, {report['errors']} errors",
+        "",
+        f"{'metric':<16} {'first':>10} {'last':>10} {'min':>10} {'max':>10} {'per hour':>10}"
+    ]
+    hours = (samples[-1]["elapsed_s"] - samples[0]["elapsed_s"]) / 3600 if samples else 0
+    for metric in SAMPLE_FIELDS[3:]:
+        values = [s[metric] for s in samples if s[metric] is not None]
+        if not values:
+            continue
+        rate = (values[-1] - values[0]) / hours if hours else 0
+        lines.append(
+            f"{metric:<16} {values[0]:>10} {values[-1]:>10} {min(values):>10} "
+            f"{max(values):>10} {rate:>+10.0f}"
+        )
+
+    if report["alerts"]:
+        lines.append("")
+        for alert in report["alerts"]:
+            lines.append(f"ALERT {alert['metric']} grew monotonically "
+                         f"{alert['from']} -> {alert['to']} (at {alert['elapsed_s']:.0f}s)")
+    if report["top_growth"]:
+        lines.append("")
+        lines.append("Top allocation growth:")
+        for entry in report["top_growth"]:
+            lines.append(f"  {entry['size_diff_kb']:>+10.1f} KiB {entry['count_diff']:>+8} "
+                         f"blocks  {entry['location']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Soak the client and track its resource usage.")
+    parser.add_argument("--duration", type=float, default=3600, help="Soak duration in seconds")
+    parser.add_argument("--interval", type=float, default=30, help="Seconds between samples")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent workload threads")
+    parser.add_argument("--window", type=int, default=6,
+                        help="Trailing samples that must grow before alerting")
+    parser.add_argument("--output", help="CSV file for the sampled time series")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--pytest", nargs="+", metavar="PYTEST_ARG",
+                        help="Soak the test suite in-process instead of the CRUD workload")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    add_metrics_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+
+    if args.pytest:
+        if args.workers != 1:
+            parser.error("--pytest runs the suite in-process and supports a single worker")
+        workload = pytest_workload(args.pytest)
+    else:
+        workload = crud_workload()
+
+    runner = SoakRunner(workload=workload, duration_s=args.duration,
+                        sample_interval_s=args.interval, workers=args.workers,
+                        growth_window=args.window, output_path=args.output)
+    stop_metrics = start_metrics(args)
+    stop_profiling = start_profiling(args)
+    try:
+        report = runner.run()
+    finally:
+        stop_metrics()
+        stop_profiling()
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if report["alerts"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,630 @@
+"""
+Warm test runner: a daemon that keeps test processes hot between runs.
+
+A cold `pytest` run of a single test pays for starting the interpreter,
+importing pytest, httpx and every test module, a TLS handshake per client
+and a fresh auth token. The daemon pays that once. It keeps a few worker
+processes that have already collected the suite. Each worker also holds a
+pooled httpx.Client with open connections and caches auth tokens. A
+`run` is executed by an idle worker, and its output streams back to the
+client.
+
+Workers are forked from a supervisor that only imports the standard
+library, so a new worker loads the project fresh. Workers are replaced
+when a .py, .ini or .json file of the project changes, and after
+--max-runs runs. Edits are picked up without restarting the daemon;
+changes to this file need a restart. The daemon keeps the environment it
+was started with (e.g. BOOKER_BASE_URL). Unix only (Unix socket, fork).
+
+Protocol (Unix socket): the client sends one JSON line, {"command": "run",
+"args": [...], "cwd": "..."}, "status" or "stop". A run is answered
+with the raw pytest output followed by a NUL byte and "exit <code>\\n".
+
+Usage:
+    python -m tools.warm_runner serve --workers 2 &
+    python -m tools.warm_runner run tests/test_ping.py
+    python -m tools.warm_runner run tests/test_booking_crud.py -k update -x
+    python -m tools.warm_runner status
+    python -m tools.warm_runner stop
+"""
+import argparse
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager, suppress
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOCKET = os.path.join(PROJECT_ROOT, ".warm_runner.sock")
+
+# Files whose change makes the workers' loaded modules stale
+WATCHED_SUFFIXES = (".py", ".ini", ".json")
+IGNORED_DIRS = {"__pycache__", "venv", "node_modules"}
+
+# restful-booker tokens stay valid well beyond a local iteration session
+DEFAULT_TOKEN_TTL_S = 600
+
+POLL_INTERVAL_S = 0.5
+EXIT_MARKER = b"\0exit "
+INTERNAL_ERROR = 3  # pytest.ExitCode.INTERNAL_ERROR
+NOT_RUNNING = 2
+
+
+def source_snapshot(root=PROJECT_ROOT):
+    """
+    Take the modification times of the project's watched files.
+
+    Args:
+        root: Project directory
+
+    Returns:
+        Dictionary mapping path to mtime in nanoseconds
+    """
+    snapshot = {}
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames
+                       if not name.startswith(".") and name not in IGNORED_DIRS]
+        for filename in filenames:
+            if filename.endswith(WATCHED_SUFFIXES):
+                path = os.path.join(directory, filename)
+                with suppress(FileNotFoundError):
+                    snapshot[path] = os.stat(path).st_mtime_ns
+    return snapshot
+
+
+class TokenCache:
+    """
+    Auth tokens reused by the runs of one worker until they expire.
+    Safe to share between threads.
+    """
+
+    def __init__(self, ttl_s=DEFAULT_TOKEN_TTL_S, clock=time.monotonic):
+        """
+        Args:
+            ttl_s: Seconds a token is reused after it was created
+            clock: Time source in seconds (injectable for tests)
+        """
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self.tokens = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, create):
+        """
+        Return the cached token for key, creating one if needed.
+
+        Args:
+            key: Cache key, e.g. the API base URL
+            create: Callable returning a new token
+
+        Returns:
+            str: Token
+        """
+        with self._lock:
+            cached = self.tokens.get(key)
+            if cached is not None and self.clock() - cached[1] < self.ttl_s:
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+        token = create()
+        with self._lock:
+            self.tokens[key] = (token, self.clock())
+        return token
+
+
+class WarmSession:
+    """
+    State a worker keeps between runs. It is passed to every run as a
+    pytest plugin and exposed as config.warm_session, which the conftest
+    fixtures use for their clients and tokens.
+    """
+
+    def __init__(self, max_connections=10, token_ttl_s=DEFAULT_TOKEN_TTL_S):
+        """
+        Args:
+            max_connections: Size of the shared connection pool
+            token_ttl_s: Seconds a cached auth token is reused
+        """
+        from infra.base_api import create_pooled_client
+
+        self.client = create_pooled_client(max_connections)
+        self.tokens = TokenCache(token_ttl_s)
+        self.runs = 0
+
+    def pytest_configure(self, config):
+        config.warm_session = self
+
+    def fetch_token(self, auth_api):
+        """
+        Return a cached auth token (utils.prefetch.fetch_token replacement).
+
+        Args:
+            auth_api: AuthApi instance
+
+        Returns:
+            str: Valid authentication token
+        """
+        from utils.prefetch import fetch_token
+
+        return self.tokens.get(auth_api.base_url, lambda: fetch_token(auth_api))
+
+
+@contextmanager
+def _redirect_output(fd):
+    """Point stdout and stderr (file descriptors 1 and 2) at fd inside the block."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    try:
+        yield
+    finally:
+        with suppress(OSError):
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for saved_fd in saved:
+            os.close(saved_fd)
+
+
+def _warm_up(session, preload):
+    """Collect the preload paths (importing pytest and the test modules) and open a connection."""
+    import pytest
+    from logic.ping_api import PingApi
+
+    with open(os.devnull, "w") as devnull, _redirect_output(devnull.fileno()):
+        pytest.main(["--collect-only", "-q", "-p", "no:cacheprovider", *preload],
+                    plugins=[session])
+    try:
+        PingApi(client=session.client).health_check()
+    except Exception as e:
+        logger.warning(f"Worker {os.getpid()} could not open a connection: {e}")
+
+
+def _run_job(session, job, conn):
+    """
+    Run pytest for one client with its output sent to conn.
+
+    Returns:
+        int: pytest exit code
+    """
+    import pytest
+
+    cwd = os.getcwd()
+    try:
+        os.chdir(job["cwd"])
+        with _redirect_output(conn.fileno()):
+            # Plugins imported by an earlier run cannot be rewritten again
+            code = int(pytest.main(["-W", "ignore::pytest.PytestAssertRewriteWarning",
+                                    *job["args"]], plugins=[session]))
+    except Exception:
+        code = INTERNAL_ERROR
+        with suppress(OSError):
+            conn.sendall(traceback.format_exc().encode())
+    finally:
+        os.chdir(cwd)
+    session.runs += 1
+    with suppress(OSError):
+        conn.sendall(EXIT_MARKER + f"{code}\n".encode())
+    conn.close()
+    return code
+
+
+def _worker_main(control, options):
+    """Body of a forked worker: warm up, then run the jobs sent over control."""
+    session = WarmSession(options["max_connections"], options["token_ttl_s"])
+    _warm_up(session, options["preload"])
+    control.sendall(b"ready\n")
+    while True:
+        message, fds, _, _ = socket.recv_fds(control, 65536, 1)
+        if not message:
+            return  # the supervisor closed the channel
+        conn = socket.socket(fileno=fds[0])
+        code = _run_job(session, json.loads(message), conn)
+        control.sendall(f"done {code}\n".encode())
+
+
+class _Worker:
+    """Supervisor side of one worker process."""
+
+    def __init__(self, pid, control):
+        self.pid = pid
+        self.control = control
+        self.state = "starting"
+        self.runs = 0
+        self.stale = False
+        self.conn = None
+
+
+class WarmRunner:
+    """
+    Supervisor: accepts clients on a Unix socket and hands their runs to
+    warm worker processes.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, workers=2, preload=("tests",), max_runs=50,
+                 max_connections=10, token_ttl_s=DEFAULT_TOKEN_TTL_S, root=PROJECT_ROOT):
+        """
+        Args:
+            socket_path: Unix socket to listen on
+            workers: Number of warm worker processes (concurrent runs)
+            preload: Paths collected by each worker when it starts
+            max_runs: Runs after which a worker is replaced
+            max_connections: Connection pool size of each worker
+            token_ttl_s: Seconds a cached auth token is reused
+            root: Project directory watched for changes
+        """
+        self.socket_path = socket_path
+        self.worker_count = workers
+        self.max_runs = max_runs
+        self.root = root
+        self.options = {"preload": [os.path.join(root, path) for path in preload],
+                        "max_connections": max_connections, "token_ttl_s": token_ttl_s}
+        self.workers = []
+        self.queue = []
+        self.runs = 0
+        self.respawns = 0
+        self.started_at = None
+        self.server = None
+        self._snapshot = None
+        self._stopping = False
+
+    def serve(self):
+        """
+        Start the workers and serve clients until stopped (stop command,
+        SIGTERM or SIGINT).
+        """
+        self._listen()
+        self._snapshot = source_snapshot(self.root)
+        self.started_at = time.monotonic()
+        signal.signal(signal.SIGTERM, lambda *_: self._request_stop())
+        signal.signal(signal.SIGINT, lambda *_: self._request_stop())
+        for _ in range(self.worker_count):
+            self._spawn()
+        logger.info(f"Warm runner listening on {self.socket_path} "
+                    f"with {self.worker_count} workers (pid {os.getpid()})")
+        next_check = time.monotonic() + 1
+        try:
+            while not self._stopping:
+                sockets = [self.server] + [worker.control for worker in self.workers]
+                readable, _, _ = select.select(sockets, [], [], POLL_INTERVAL_S)
+                for sock in readable:
+                    if sock is self.server:
+                        self._accept()
+                    else:
+                        self._on_worker_message(sock)
+                self._reap()
+                if time.monotonic() >= next_check:
+                    self._check_sources()
+                    next_check = time.monotonic() + 1
+                self._dispatch()
+        finally:
+            self._shutdown()
+
+    def status(self):
+        """
+        Describe the daemon.
+
+        Returns:
+            Dictionary with pid, uptime_s, runs, respawns, queued and the
+            workers' pid, state and runs
+        """
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.monotonic() - self.started_at, 1),
+            "runs": self.runs,
+            "respawns": self.respawns,
+            "queued": len(self.queue),
+            "workers": [{"pid": worker.pid, "state": worker.state, "runs": worker.runs}
+                        for worker in self.workers]
+        }
+
+    def _listen(self):
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)  # left over by a daemon that died
+            else:
+                raise RuntimeError(f"A warm runner is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen(16)
+
+    def _request_stop(self):
+        self._stopping = True
+
+    def _spawn(self):
+        parent_end, child_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            # Keep no copies of the supervisor's sockets: other workers
+            # must see end-of-file when the supervisor closes them
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            for sock in [parent_end, self.server, *(conn for conn, _ in self.queue),
+                         *(worker.control for worker in self.workers),
+                         *(worker.conn for worker in self.workers if worker.conn)]:
+                sock.close()
+            code = 0
+            try:
+                _worker_main(child_end, self.options)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        child_end.close()
+        self.workers.append(_Worker(pid, parent_end))
+
+    def _retire(self, worker, replace=True):
+        self.workers.remove(worker)
+        worker.control.close()  # the worker exits at end-of-file; _reap collects it
+        if replace and not self._stopping:
+            self.respawns += 1
+            self._spawn()
+
+    def _accept(self):
+        conn, _ = self.server.accept()
+        try:
+            conn.settimeout(5)
+            with conn.makefile("rb") as reader:
+                message = json.loads(reader.readline())
+            conn.settimeout(None)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropped a client: {e}")
+            conn.close()
+            return
+        command = message.get("command")
+        if command == "run":
+            job = {"args": message.get("args", []), "cwd": message.get("cwd", self.root)}
+            self.queue.append((conn, job))
+        else:
+            reply = {"status": self.status(), "stop": {"stopping": True}}.get(
+                command, {"error": f"unknown command {command!r}"})
+            with suppress(OSError):
+                conn.sendall(json.dumps(reply).encode() + b"\n")
+            conn.close()
+            if command == "stop":
+                self._request_stop()
+
+    def _on_worker_message(self, control):
+        worker = next(worker for worker in self.workers if worker.control is control)
+        message = control.recv(64).decode()
+        if not message:
+            return  # the worker died; _reap reports and replaces it
+        if message.startswith("done"):
+            worker.conn.close()
+            worker.conn = None
+            worker.runs += 1
+            self.runs += 1
+        worker.state = "idle"
+        if worker.stale or worker.runs >= self.max_runs:
+            self._retire(worker)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = next((worker for worker in self.workers if worker.pid == pid), None)
+            if worker is None:
+                continue  # a retired worker
+            logger.warning(f"Worker {pid} exited unexpectedly (status {status})")
+            if worker.conn is not None:
+                with suppress(OSError):
+                    worker.conn.sendall(b"\nwarm runner: the worker running this session died\n"
+                                        + EXIT_MARKER + f"{INTERNAL_ERROR}\n".encode())
+                worker.conn.close()
+                worker.conn = None
+            self._retire(worker)
+
+    def _check_sources(self):
+        snapshot = source_snapshot(self.root)
+        if snapshot == self._snapshot:
+            return
+        self._snapshot = snapshot
+        logger.info("Project files changed, replacing the workers")
+        for worker in list(self.workers):
+            worker.stale = True
+            if worker.state != "busy":
+                self._retire(worker)
+
+    def _dispatch(self):
+        for worker in self.workers:
+            if not self.queue:
+                return
+            if worker.state != "idle":
+                continue
+            conn, job = self.queue.pop(0)
+            try:
+                socket.send_fds(worker.control, [json.dumps(job).encode()], [conn.fileno()])
+            except OSError:
+                self.queue.insert(0, (conn, job))
+                continue
+            worker.state = "busy"
+            worker.conn = conn
+
+    def _shutdown(self):
+        for conn, _ in self.queue:
+            with suppress(OSError):
+                conn.sendall(b"warm runner stopped\n" + EXIT_MARKER + f"{INTERNAL_ERROR}\n".encode())
+            conn.close()
+        self.queue = []
+        for worker in list(self.workers):
+            if worker.state == "busy":
+                with suppress(ProcessLookupError):
+                    os.kill(worker.pid, signal.SIGTERM)
+            self._retire(worker, replace=False)
+        self.server.close()
+        with suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        deadline_at = time.monotonic() + 5
+        while time.monotonic() < deadline_at:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.05)
+        logger.info(f"Warm runner stopped after {self.runs} runs")
+
+
+def _connect(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    return sock
+
+
+def send_command(command, socket_path=DEFAULT_SOCKET):
+    """
+    Send status or stop to a running daemon.
+
+    Args:
+        command: "status" or "stop"
+        socket_path: Daemon socket
+
+    Returns:
+        Reply dictionary, or None if no daemon is listening
+    """
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    with sock:
+        sock.sendall(json.dumps({"command": command}).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+def run_tests(args, socket_path=DEFAULT_SOCKET, out=None):
+    """
+    Run pytest in a warm worker and stream its output.
+
+    Args:
+        args: pytest arguments (node IDs, -k, -x, ...)
+        socket_path: Daemon socket
+        out: Binary stream the output is written to (default: stdout)
+
+    Returns:
+        int: pytest exit code, or None if no daemon is listening
+    """
+    out = out or sys.stdout.buffer
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    trailer = None
+    with sock:
+        sock.sendall(json.dumps({"command": "run", "args": list(args),
+                                 "cwd": os.getcwd()}).encode() + b"\n")
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            if trailer is None and b"\0" in chunk:
+                chunk, _, trailer = chunk.partition(b"\0")
+                out.write(chunk)
+            elif trailer is None:
+                out.write(chunk)
+            else:
+                trailer += chunk
+            out.flush()
+    if trailer is None or not trailer.startswith(EXIT_MARKER[1:]):
+        out.write(b"\nwarm runner: connection closed before the run finished\n")
+        out.flush()
+        return INTERNAL_ERROR
+    return int(trailer[len(EXIT_MARKER) - 1:])
+
+
+def format_status(status):
+    """
+    Format a status reply.
+
+    Args:
+        status: Dictionary returned by WarmRunner.status
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"warm runner pid {status['pid']}, up {status['uptime_s']:.0f}s, "
+             f"{status['runs']} runs, {status['respawns']} worker respawns, "
+             f"{status['queued']} queued"]
+    for worker in status["workers"]:
+        lines.append(f"  worker {worker['pid']:>7}  {worker['state']:<8}  {worker['runs']} runs")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Keep test processes warm between runs.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket of the daemon")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Start the daemon in the foreground")
+    serve.add_argument("--workers", type=int, default=2, help="Warm worker processes")
+    serve.add_argument("--preload", nargs="*", default=["tests"],
+                       help="Paths each worker collects at start (default: tests)")
+    serve.add_argument("--max-runs", type=int, default=50,
+                       help="Runs after which a worker is replaced")
+    serve.add_argument("--max-connections", type=int, default=10,
+                       help="Connection pool size of each worker")
+    serve.add_argument("--token-ttl", type=float, default=DEFAULT_TOKEN_TTL_S,
+                       help="Seconds a cached auth token is reused")
+    serve.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    run = commands.add_parser("run", help="Run pytest arguments in a warm worker")
+    run.add_argument("pytest_args", nargs=argparse.REMAINDER, help="Arguments passed to pytest")
+    commands.add_parser("status", help="Show the daemon's workers")
+    commands.add_parser("stop", help="Stop the daemon")
+    args = parser.parse_args(argv)
+
+    not_running = (f"No warm runner on {args.socket}; "
+                   f"start one with: python -m tools.warm_runner serve")
+    if args.command == "serve":
+        # Not tools.cli: the supervisor imports nothing from the project,
+        # so that the workers it forks load the current sources
+        logging.basicConfig(level=logging.INFO,
+                            format='%(asctime)s - %(levelname)s - %(message)s')
+        if not args.verbose:
+            for name in ("infra.base_api", "httpx"):
+                logging.getLogger(name).setLevel(logging.WARNING)
+        WarmRunner(args.socket, args.workers, args.preload, args.max_runs,
+                   args.max_connections, args.token_ttl).serve()
+        return 0
+    if args.command == "run":
+        code = run_tests(args.pytest_args, args.socket)
+        if code is None:
+            print(not_running, file=sys.stderr)
+            return NOT_RUNNING
+        return code
+    reply = send_command(args.command, args.socket)
+    if reply is None:
+        print(not_running, file=sys.stderr)
+        return NOT_RUNNING
+    print(format_status(reply) if args.command == "status" else "Warm runner stopping")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,346 @@
+"""
+Shared workload building blocks for the load tools.
+
+A Session is the state of one virtual user: its API clients, the
+bookings it created and its token. Session.run executes one named
+operation, doing any setup it needs (creating a booking to read, getting
+a token) outside the timed section.
+"""
+import random
+import time
+
+from infra.base_api import create_pooled_client
+from infra.metrics import is_error_status
+from infra.stats import LatencyHistogram
+from logic.auth_api import AuthApi
+from logic.booking_api import BookingApi
+from logic.ping_api import PingApi
+from utils.test_data import generate_booking_data, generate_partial_booking_data
+
+OPERATIONS = (
+    "ping",
+    "get_all_bookings",
+    "get_booking",
+    "create_booking",
+    "update_booking",
+    "partial_update_booking",
+    "delete_booking",
+    "create_token"
+)
+
+# Session state each operation depends on ("booking" = one created earlier
+# in the same session). Session.run sets missing state up untimed.
+OPERATION_REQUIREMENTS = {
+    "get_booking": ("booking",),
+    "update_booking": ("booking", "token"),
+    "partial_update_booking": ("booking", "token"),
+    "delete_booking": ("booking", "token")
+}
+
+
+def parse_weights(text):
+    """
+    Parse a weighted operation mix like "get_booking=8,create_booking=2".
+
+    A single operation name without a weight is also accepted.
+
+    Args:
+        text: Comma separated operation[=weight] pairs
+
+    Returns:
+        Dictionary mapping operation name to weight
+    """
+    weights = {}
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {OPERATIONS}")
+        weights[name] = float(weight) if weight else 1.0
+    if not weights or not any(weight > 0 for weight in weights.values()):
+        raise ValueError(f"Operation mix '{text}' has no positive weights")
+    return weights
+
+
+class OperationPicker:
+    """
+    Picks operations at random according to their weights.
+    """
+
+    def __init__(self, weights, rng=None):
+        """
+        Args:
+            weights: Dictionary mapping operation name to weight
+            rng: random.Random instance (default: new unseeded instance)
+        """
+        self.names = [name for name, weight in weights.items() if weight > 0]
+        self.weights = [weights[name] for name in self.names]
+        self.rng = rng or random.Random()
+
+    def pick(self):
+        """Return the next operation name."""
+        if len(self.names) == 1:
+            return self.names[0]
+        return self.rng.choices(self.names, self.weights)[0]
+
+
+class OperationStats:
+    """
+    Per-operation latency histograms and status counters.
+
+    Meant to be owned by a single thread (no locking); merge the
+    instances of all threads when reporting.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.statuses = {}
+        self.completed = 0
+        self.errors = 0
+
+    def record(self, operation, status, latency_ms):
+        """
+        Count one operation outcome.
+
+        Args:
+            operation: Operation name
+            status: HTTP status code as a string, or an exception class name
+            latency_ms: Latency in milliseconds (None if no response)
+        """
+        if latency_ms is not None:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = LatencyHistogram()
+            histogram.record(latency_ms)
+        counts = self.statuses.setdefault(operation, {})
+        counts[status] = counts.get(status, 0) + 1
+        self.completed += 1
+        if is_error_status(status):
+            self.errors += 1
+
+    def merge(self, other):
+        """
+        Add the counts of another OperationStats to this one.
+        """
+        for operation, histogram in other.histograms.items():
+            self.histograms.setdefault(operation, LatencyHistogram()).merge(histogram)
+        for operation, counts in other.statuses.items():
+            target = self.statuses.setdefault(operation, {})
+            for status, count in counts.items():
+                target[status] = target.get(status, 0) + count
+        self.completed += other.completed
+        self.errors += other.errors
+        return self
+
+    def to_dict(self):
+        """
+        Serialize into the shard format accepted by driver.merge_results.
+        """
+        return {
+            "histograms": {op: h.to_dict() for op, h in self.histograms.items()},
+            "statuses": self.statuses,
+            "completed": self.completed,
+            "errors": self.errors
+        }
+
+
+def build_apis(base_url=None, max_connections=100, hedging=None):
+    """
+    Build API clients that share one pooled httpx client.
+
+    Args:
+        base_url: Target base URL (default: BaseApi default)
+        max_connections: Size of the shared connection pool
+        hedging: HedgingPolicy for the idempotent GETs (optional)
+
+    Returns:
+        Tuple (booking_api, auth_api, ping_api, client)
+    """
+    client = create_pooled_client(max_connections)
+    kwargs = {"client": client}
+    if base_url:
+        kwargs["base_url"] = base_url
+    return (BookingApi(hedging=hedging, **kwargs), AuthApi(**kwargs),
+            PingApi(hedging=hedging, **kwargs), client)
+
+
+class Session:
+    """
+    State of one virtual user.
+    """
+
+    def __init__(self, booking_api, auth_api, ping_api, rng=None):
+        """
+        Args:
+            booking_api: BookingApi instance
+            auth_api: AuthApi instance
+            ping_api: PingApi instance
+            rng: random.Random used to pick bookings (default: new instance)
+        """
+        self.booking_api = booking_api
+        self.auth_api = auth_api
+        self.ping_api = ping_api
+        self.rng = rng or random.Random()
+        self.booking_ids = []
+        self.token = None
+
+    def run(self, operation):
+        """
+        Execute one operation and time only its main request.
+
+        Args:
+            operation: One of OPERATIONS
+
+        Returns:
+            Tuple (response, latency_ms)
+        """
+        handler = getattr(self, f"_run_{operation}", None)
+        if handler is None:
+            raise ValueError(f"Unknown operation '{operation}'")
+        return handler()
+
+    def has(self, requirement):
+        """
+        Tell whether the session already holds some state.
+
+        Args:
+            requirement: "booking" or "token"
+        """
+        if requirement == "booking":
+            return bool(self.booking_ids)
+        if requirement == "token":
+            return self.token is not None
+        raise ValueError(f"Unknown requirement '{requirement}'")
+
+    def ensure_token(self):
+        """Get a token if the session has none yet."""
+        if self.token is None:
+            self.token = self.auth_api.create_token().json()["token"]
+        return self.token
+
+    def ensure_booking(self):
+        """Pick one of the session's bookings, creating one if needed."""
+        if not self.booking_ids:
+            response = self.booking_api.create_booking(generate_booking_data())
+            self.booking_ids.append(response.json()["bookingid"])
+        return self.rng.choice(self.booking_ids)
+
+    @staticmethod
+    def _timed(call, *args):
+        start = time.perf_counter()
+        response = call(*args)
+        return response, (time.perf_counter() - start) * 1000
+
+    def _run_ping(self):
+        return self._timed(self.ping_api.health_check)
+
+    def _run_get_all_bookings(self):
+        return self._timed(self.booking_api.get_all_bookings)
+
+    def _run_get_booking(self):
+        booking_id = self.ensure_booking()
+        return self._timed(self.booking_api.get_booking, booking_id)
+
+    def _run_create_booking(self):
+        response, latency_ms = self._timed(self.booking_api.create_booking,
+                                           generate_booking_data())
+        if response.status_code == 200:
+            self.booking_ids.append(response.json()["bookingid"])
+        return response, latency_ms
+
+    def _run_update_booking(self):
+        booking_id = self.ensure_booking()
+        token = self.ensure_token()
+        return self._timed(self.booking_api.update_booking, booking_id,
+                           generate_booking_data(), token)
+
+    def _run_partial_update_booking(self):
+        booking_id = self.ensure_booking()
+        token = self.ensure_token()
+        return self._timed(self.booking_api.partial_update_booking, booking_id,
+                           generate_partial_booking_data("firstname"), token)
+
+    def _run_delete_booking(self):
+        booking_id = self.ensure_booking()
+        token = self.ensure_token()
+        response, latency_ms = self._timed(self.booking_api.delete_booking, booking_id, token)
+        if response.status_code in (200, 201):
+            self.booking_ids.remove(booking_id)
+        return response, latency_ms
+
+    def _run_create_token(self):
+        response, latency_ms = self._timed(self.auth_api.create_token)
+        if response.status_code == 200:
+            self.token = response.json().get("token", self.token)
+        return response, latency_ms
+
+
+class TemplateSession(Session):
+    """
+    Session that sends prebuilt request templates.
+
+    Payloads come from a small corpus generated up front and encoded only
+    once, which keeps client CPU per request low for high-rate runs.
+    """
+
+    def __init__(self, booking_api, auth_api, ping_api, rng=None, corpus_size=16):
+        """
+        Args:
+            booking_api: BookingApi instance
+            auth_api: AuthApi instance
+            ping_api: PingApi instance
+            rng: random.Random used to pick bookings and payloads
+            corpus_size: Number of distinct payloads per write operation
+        """
+        super().__init__(booking_api, auth_api, ping_api, rng)
+        self.templates = {
+            operation: booking_api.booking_template(operation)
+            for operation in ("get_all_bookings", "get_booking", "delete_booking")
+        }
+        self.corpus = {
+            "create_booking": [booking_api.booking_template("create_booking", generate_booking_data())
+                               for _ in range(corpus_size)],
+            "update_booking": [booking_api.booking_template("update_booking", generate_booking_data())
+                               for _ in range(corpus_size)],
+            "partial_update_booking": [
+                booking_api.booking_template("partial_update_booking",
+                                             generate_partial_booking_data("firstname"))
+                for _ in range(corpus_size)
+            ]
+        }
+
+    def _send(self, template, booking_id=None, token=None):
+        return self._timed(self.booking_api.send_template, template, booking_id, token)
+
+    def _run_get_all_bookings(self):
+        return self._send(self.templates["get_all_bookings"])
+
+    def _run_get_booking(self):
+        return self._send(self.templates["get_booking"], self.ensure_booking())
+
+    def _run_create_booking(self):
+        response, latency_ms = self._send(self.rng.choice(self.corpus["create_booking"]))
+        if response.status_code == 200:
+            self.booking_ids.append(response.json()["bookingid"])
+        return response, latency_ms
+
+    def _run_update_booking(self):
+        booking_id = self.ensure_booking()
+        return self._send(self.rng.choice(self.corpus["update_booking"]), booking_id,
+                          self.ensure_token())
+
+    def _run_partial_update_booking(self):
+        booking_id = self.ensure_booking()
+        return self._send(self.rng.choice(self.corpus["partial_update_booking"]), booking_id,
+                          self.ensure_token())
+
+    def _run_delete_booking(self):
+        booking_id = self.ensure_booking()
+        response, latency_ms = self._send(self.templates["delete_booking"], booking_id,
+                                          self.ensure_token())
+        if response.status_code in (200, 201):
+            self.booking_ids.remove(booking_id)
+        return response, latency_ms
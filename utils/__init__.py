@@ -0,0 +1,32 @@
+"""
+Test data generators and setup helpers.
+
+The data generators are loaded on first access (PEP 562 module
+__getattr__), so `import utils` costs nothing until one of them is used:
+
+    from utils import generate_booking_data    # imports utils.test_data only
+"""
+import importlib
+
+# Public name -> module defining it
+_EXPORTS = {
+    "BookingStream": "utils.test_data",
+    "generate_booking_data": "utils.test_data",
+    "generate_partial_booking_data": "utils.test_data",
+    "generate_random_string": "utils.test_data"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,79 @@
+"""
+Background prefetching of test setup calls.
+
+Setup round-trips that do not depend on each other (getting a token,
+creating a booking) can run at the same time. prefetch() starts a call
+on a shared thread pool and returns a Future; join it with .result()
+when the value is needed.
+
+Usage:
+    token_future = prefetch(auth_api.create_token)
+    booking_id = booking_api.create_booking(data).json()["bookingid"]
+    token = token_future.result().json()["token"]
+
+The active deadline (see infra.deadline) is carried into the pool thread.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from infra.deadline import bind
+
+MAX_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="prefetch")
+        return _executor
+
+
+def prefetch(function, *args, **kwargs):
+    """
+    Start a call in the background.
+
+    Args:
+        function: Callable to run
+        *args: Positional arguments for function
+        **kwargs: Keyword arguments for function
+
+    Returns:
+        concurrent.futures.Future with the result (or exception) of the call
+    """
+    return _get_executor().submit(bind(function), *args, **kwargs)
+
+
+def fetch_token(auth_api):
+    """
+    Create an auth token.
+
+    Args:
+        auth_api: AuthApi instance
+
+    Returns:
+        str: Valid authentication token
+    """
+    return auth_api.create_token().json()["token"]
+
+
+def create_booking(booking_api, booking_data):
+    """
+    Create a booking.
+
+    Args:
+        booking_api: BookingApi instance
+        booking_data: Booking payload
+
+    Returns:
+        dict: Contains 'id', 'data', and 'response'
+    """
+    response = booking_api.create_booking(booking_data)
+    return {
+        "id": response.json()["bookingid"],
+        "data": booking_data,
+        "response": response
+    }
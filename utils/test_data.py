@@ -1,19 +1,21 @@
+import json
 import random
 import string
 from datetime import datetime, timedelta
 
 
-def generate_random_string(length=8):
+def generate_random_string(length=8, rng=None):
     """
     Generate a random string of letters.
     
     Args:
         length: Length of the string (default: 8)
+        rng: random.Random instance for reproducible data (default: module random)
         
     Returns:
         Random string of specified length
     """
-    return ''.join(random.choices(string.ascii_letters, k=length))
+    return ''.join((rng or random).choices(string.ascii_letters, k=length))
 
 
 def generate_booking_data(
@@ -23,7 +25,8 @@ def generate_booking_data(
     depositpaid=None,
     checkin=None,
     checkout=None,
-    additionalneeds=None
+    additionalneeds=None,
+    rng=None
 ):
     """
     Generate valid booking data for tests.
@@ -37,20 +40,23 @@ def generate_booking_data(
         checkin: Check-in date (YYYY-MM-DD)
         checkout: Check-out date (YYYY-MM-DD)
         additionalneeds: Additional needs/requests
+        rng: random.Random instance for reproducible data (default: module random)
         
     Returns:
         Dictionary with booking data ready for API
     """
+    rng = rng or random
+    
     # Generate dates if not provided
     today = datetime.now()
     default_checkin = (today + timedelta(days=1)).strftime("%Y-%m-%d")
     default_checkout = (today + timedelta(days=5)).strftime("%Y-%m-%d")
     
     return {
-        "firstname": firstname or generate_random_string(),
-        "lastname": lastname or generate_random_string(),
-        "totalprice": totalprice if totalprice is not None else random.randint(100, 1000),
-        "depositpaid": depositpaid if depositpaid is not None else random.choice([True, False]),
+        "firstname": firstname or generate_random_string(rng=rng),
+        "lastname": lastname or generate_random_string(rng=rng),
+        "totalprice": totalprice if totalprice is not None else rng.randint(100, 1000),
+        "depositpaid": depositpaid if depositpaid is not None else rng.choice([True, False]),
         "bookingdates": {
             "checkin": checkin or default_checkin,
             "checkout": checkout or default_checkout
@@ -85,3 +91,43 @@ def generate_partial_booking_data(field_name, field_value=None):
     generator = field_generators.get(field_name, lambda: generate_random_string())
     return {field_name: generator()}
 
+
+class BookingStream:
+    """
+    Booking request body of an exact size, produced chunk by chunk.
+    
+    The additionalneeds field is padded until the encoded JSON is
+    size_bytes long, so even a body of tens of megabytes is never held in
+    memory. Pass it as the booking data of create_booking/update_booking;
+    iterate over iter(stream) instead to send it chunked.
+    """
+    
+    def __init__(self, size_bytes, chunk_size=65536, **fields):
+        """
+        Args:
+            size_bytes: Total body size in bytes (the bare booking if larger)
+            chunk_size: Bytes per chunk
+            **fields: Booking fields, passed to generate_booking_data
+        """
+        booking = generate_booking_data(**fields)
+        booking["additionalneeds"] = ""
+        encoded = json.dumps(booking, separators=(",", ":")).encode()
+        # Split right before the closing quote of the additionalneeds value
+        split = encoded.index(b'"additionalneeds":""') + len(b'"additionalneeds":"')
+        self.head = encoded[:split]
+        self.tail = encoded[split:]
+        self.padding = max(size_bytes - len(encoded), 0)
+        self.chunk_size = chunk_size
+        self.fields = booking
+    
+    def __len__(self):
+        return len(self.head) + self.padding + len(self.tail)
+    
+    def __iter__(self):
+        yield self.head
+        chunk = b"x" * min(self.chunk_size, self.padding)
+        remaining = self.padding
+        while remaining > 0:
+            yield chunk if remaining >= len(chunk) else chunk[:remaining]
+            remaining -= len(chunk)
+        yield self.tail